@@ -0,0 +1,385 @@
+"""
+Benchmarks of the simulation and control hot paths.
+
+    python benchmarks/run_benchmarks.py run -o results.json
+    python benchmarks/run_benchmarks.py compare baseline.json results.json --threshold 0.2
+
+The scenarios are fixed: net/net_singleinverter.yaml with the bundled omg_grid.Grids.NetworkSingleInverter.fmu.
+Benchmarks without FMU get their inputs from a stand-in model (see standin.py),
+the environment is also benchmarked with the NumpyModel and the different solvers.
+The benchmarks of the environment and the Runner are skipped if the FMU can not be loaded (e.g. PyFMI is missing).
+Run the script from the root folder of the repository.
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from os.path import abspath, dirname, join
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, dirname(abspath(__file__)))
+from standin import StandInModel, OUTPUTS
+
+ROOT = dirname(dirname(abspath(__file__)))
+NET = join(ROOT, 'net', 'net_singleinverter.yaml')
+FMU = join(ROOT, 'omg_grid', 'omg_grid.Grids.NetworkSingleInverter.fmu')
+N_STEPS = 2000
+
+Benchmark = Callable[[], Tuple[Callable[[], None], int]]
+"""Prepares a benchmark and returns the timed function and the number of operations it executes"""
+
+benchmarks = {}  # type: Dict[str, Tuple[Benchmark, bool]]
+
+
+def benchmark(name: str, needs_fmu: bool = False):
+    def register(fun: Benchmark) -> Benchmark:
+        benchmarks[name] = fun, needs_fmu
+        return fun
+
+    return register
+
+
+def trajectory(n: int = N_STEPS) -> np.ndarray:
+    return StandInModel().trajectory(n)
+
+
+@benchmark('transforms')
+def bench_transforms():
+    from openmodelica_microgrid_gym.util import abc_to_dq0, dq0_to_abc, inst_power, inst_reactive
+    data = trajectory()
+    phases = np.arange(len(data)) * 2 * np.pi * 50 * .5e-4
+
+    def run():
+        for x, phase in zip(data, phases):
+            dq0_to_abc(abc_to_dq0(x[3:6], phase), phase)
+            inst_power(x[:3], x[3:6])
+            inst_reactive(x[:3], x[3:6])
+
+    return run, len(data)
+
+
+@benchmark('network.augment')
+def bench_augment():
+    from openmodelica_microgrid_gym.net import Network
+    net = Network.load(NET)
+    assert net.out_vars(False, True) == OUTPUTS
+    data = trajectory()
+
+    def run():
+        net.reset()
+        for k, x in enumerate(data):
+            net.augment(x, k * net.ts)
+
+    return run, len(data)
+
+
+def _controllers():
+    from openmodelica_microgrid_gym.aux_ctl import PI_params, DroopParams, MultiPhaseDQ0PIPIController, \
+        MultiPhaseDQCurrentSourcingController
+    voltage_ctl = MultiPhaseDQ0PIPIController(PI_params(kP=0.025, kI=60, limits=(-30, 30)),
+                                              PI_params(kP=0.012, kI=90, limits=(-1, 1)),
+                                              DroopParams(40000, 0.005, 50),
+                                              DroopParams(1000, 0.002, 230 * np.sqrt(2)),
+                                              ts_sim=.5e-4, name='master')
+    current_ctl = MultiPhaseDQCurrentSourcingController(PI_params(kP=0.005, kI=200, limits=(-1, 1)), ts_sim=.5e-4,
+                                                        name='master')
+    return voltage_ctl, current_ctl
+
+
+@benchmark('controller.voltage')
+def bench_voltage_controller():
+    ctl, _ = _controllers()
+    data = trajectory()
+
+    def run():
+        ctl.reset()
+        for x in data:
+            ctl.prepare(x[3:6], x[:3])
+            ctl.step()
+
+    return run, len(data)
+
+
+@benchmark('controller.current')
+def bench_current_controller():
+    _, ctl = _controllers()
+    data = trajectory()
+    i_ref = np.array([15, 0, 0])
+
+    def run():
+        ctl.reset()
+        for x in data:
+            ctl.prepare(x[3:6], i_ref)
+            ctl.step()
+
+    return run, len(data)
+
+
+@benchmark('history.append')
+def bench_history_append():
+    from openmodelica_microgrid_gym.util import FullHistory
+    data = trajectory()
+    history = FullHistory(OUTPUTS)
+
+    def run():
+        history.reset()
+        for x in data:
+            history.append(x)
+
+    return run, len(data)
+
+
+@benchmark('history.df')
+def bench_history_df():
+    from openmodelica_microgrid_gym.util import FullHistory
+    history = FullHistory(OUTPUTS)
+    history.reset()
+    for x in trajectory(20000):
+        history.append(x)
+
+    def run():
+        _ = history.df
+
+    return run, 1
+
+
+@benchmark('obs_template.fill')
+def bench_obs_template():
+    from openmodelica_microgrid_gym.util import ObsTempl
+    data = trajectory()
+    # the template of a voltage controller: currents, voltages and the static setpoint
+    tmpl = ObsTempl(OUTPUTS, [OUTPUTS[3:6], OUTPUTS[:3], np.zeros(3)], reuse_buffer=True)
+
+    def run():
+        for x in data:
+            tmpl.fill(x)
+
+    return run, len(data)
+
+
+@benchmark('delay_line.shift')
+def bench_delay_line():
+    from openmodelica_microgrid_gym.util import DelayLine
+    data = trajectory()[:, :3]
+    line = DelayLine(5, 3)
+
+    def run():
+        line.clear()
+        for x in data:
+            line.shift(x)
+
+    return run, len(data)
+
+
+@benchmark('delay_line.shift_batch')
+def bench_delay_line_batch():
+    from openmodelica_microgrid_gym.util import DelayLine
+    data = trajectory()[:, :3]
+    line = DelayLine(5, 3)
+
+    def run():
+        line.clear()
+        for k in range(0, len(data), 100):
+            line.shift_batch(data[k:k + 100])
+
+    return run, len(data)
+
+
+@benchmark('limit_load_integral.step')
+def bench_limit_load_integral():
+    from openmodelica_microgrid_gym.aux_ctl.base import LimitLoadIntegral
+    currents = trajectory()[:, 3]
+    integral = LimitLoadIntegral(.5e-4, 50, i_lim=30, i_nom=20)
+
+    def run():
+        integral.reset()
+        for i in currents:
+            integral.step(i)
+
+    return run, len(currents)
+
+
+@benchmark('randproc.sample')
+def bench_randproc():
+    from stochastic.processes import VasicekProcess
+    from openmodelica_microgrid_gym.util import RandProcess
+    gen = RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=28), initial=28, bounds=(11, 45),
+                      ts=.5e-4, horizon=N_STEPS)
+
+    def run():
+        gen.reset()
+        for k in range(1, N_STEPS + 1):
+            gen.sample(k * gen.ts)
+
+    return run, N_STEPS
+
+
+def _env(**kwargs):
+    import gym
+    from openmodelica_microgrid_gym.net import Network
+    kwargs = {'model_path': FMU, **kwargs}
+    return gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', net=Network.load(NET), viz_mode=None,
+                    max_episode_steps=N_STEPS, log_level=logging.WARNING, **kwargs)
+
+
+@benchmark('env.reset', needs_fmu=True)
+def bench_env_reset():
+    env = _env()
+    env.reset()
+
+    def run():
+        for _ in range(20):
+            env.reset()
+
+    return run, 20
+
+
+@benchmark('env.step', needs_fmu=True)
+def bench_env_step():
+    env = _env()
+    action = np.array([.5, -.25, -.25])
+
+    def run():
+        env.reset()
+        for _ in range(N_STEPS):
+            env.step(action)
+
+    return run, N_STEPS
+
+
+@benchmark('runner.episode', needs_fmu=True)
+def bench_runner():
+    from openmodelica_microgrid_gym import Runner
+    from openmodelica_microgrid_gym.agents import StaticControlAgent
+    ctl, _ = _controllers()
+    agent = StaticControlAgent([ctl], {'master': [[f'lc1.inductor{k}.i' for k in '123'],
+                                                  [f'lc1.capacitor{k}.v' for k in '123']]})
+    runner = Runner(agent, _env())
+
+    def run():
+        runner.run(1)
+
+    return run, N_STEPS
+
+
+def _bench_numpy_env_step(method: str) -> Benchmark:
+    def bench():
+        # the NumpyModel simulates the circuit declared in the network configuration
+        env = _env(model_path=NET, solver_method=method)
+        action = np.array([.5, -.25, -.25])
+
+        def run():
+            env.reset()
+            for _ in range(N_STEPS):
+                env.step(action)
+
+        return run, N_STEPS
+
+    return bench
+
+
+for _method in ['LSODA', 'RK4', 'Trapezoidal', 'ExpEuler']:
+    benchmark(f'numpy_env.step[{_method}]')(_bench_numpy_env_step(_method))
+
+
+def fmu_available() -> bool:
+    try:
+        import pyfmi  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def measure(fun: Benchmark, repeat: int) -> Dict[str, float]:
+    run, n_ops = fun()
+    # warm up caches and lazy initialisations
+    run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) / n_ops)
+    return dict(median=statistics.median(times), min=min(times), ops=n_ops, repeat=repeat)
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 5) -> dict:
+    """
+    Executes the benchmarks
+
+    :param names: benchmarks to execute, defaults to all
+    :param repeat: number of timed repetitions
+    :return: results in seconds per operation and meta data of the run
+    """
+    has_fmu = fmu_available()
+    results = {}
+    for name, (fun, needs_fmu) in benchmarks.items():
+        if names and name not in names:
+            continue
+        if needs_fmu and not has_fmu:
+            results[name] = dict(skipped='FMU can not be loaded')
+            continue
+        results[name] = measure(fun, repeat)
+        print(f'{name:28s} {results[name]["median"] * 1e6:12.2f} us/op')
+    meta = dict(date=datetime.now().isoformat(), python=platform.python_version(), numpy=np.__version__,
+                platform=platform.platform(), processor=platform.processor())
+    return dict(meta=meta, results=results)
+
+
+def compare(baseline: dict, results: dict, threshold: float = .2) -> List[str]:
+    """
+    Compares the median times of two runs
+
+    :param baseline: stored results
+    :param results: new results
+    :param threshold: relative slow down that is reported as regression
+    :return: names of the regressed benchmarks
+    """
+    regressions = []
+    for name, new in results['results'].items():
+        old = baseline['results'].get(name, {})
+        if 'median' not in new or 'median' not in old:
+            print(f'{name:28s} {"not comparable":>12s}')
+            continue
+        ratio = new['median'] / old['median']
+        regressed = ratio > 1 + threshold
+        print(f'{name:28s} {old["median"] * 1e6:12.2f} {new["median"] * 1e6:12.2f} us/op {ratio:6.2f}x'
+              + ('  REGRESSION' if regressed else ''))
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of the simulation and control hot paths')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='execute the benchmarks')
+    run.add_argument('-o', '--output', default='benchmark_results.json', help='JSON file of the results')
+    run.add_argument('-b', '--benchmark', action='append', choices=list(benchmarks), help='benchmark to execute')
+    run.add_argument('--repeat', type=int, default=5, help='number of timed repetitions')
+    cmp = commands.add_parser('compare', help='compare results with a baseline')
+    cmp.add_argument('baseline', help='JSON file of the baseline')
+    cmp.add_argument('results', help='JSON file of the new results')
+    cmp.add_argument('--threshold', type=float, default=.2, help='relative slow down reported as regression')
+    args = parser.parse_args(args)
+
+    if args.command == 'run':
+        results = run_benchmarks(args.benchmark, args.repeat)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        results = json.load(f)
+    # non zero exit code to fail CI jobs
+    return 1 if compare(baseline, results, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
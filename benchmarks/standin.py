@@ -0,0 +1,70 @@
+"""
+Small stand-in for the omg_grid.Grids.NetworkSingleInverter FMU used by the benchmarks that do not need an FMU.
+It provides realistic inputs for the network, the controllers and the histories.
+
+The model is a three phase inverter with LC filter and RL load, discretized exactly (zero order hold).
+Its outputs have the names and order of the outputs of net/net_singleinverter.yaml.
+"""
+import numpy as np
+from scipy.linalg import expm
+
+OUTPUTS = [f'lc1.capacitor{k}.v' for k in '123'] + [f'lc1.inductor{k}.i' for k in '123'] + \
+          [f'rl1.inductor{k}.i' for k in '123']
+INPUTS = [f'i1p{k}' for k in '123']
+
+
+class StandInModel:
+    def __init__(self, ts: float = .5e-4, v_dc: float = 1000, l_f: float = 2.3e-3, r_f: float = 0.17,
+                 c_f: float = 10e-6, r_load: float = 20, l_load: float = 1e-3):
+        """
+        :param ts: time step size
+        :param v_dc: DC-link voltage
+        :param l_f: filter inductance
+        :param r_f: resistance of the filter inductance
+        :param c_f: filter capacity
+        :param r_load: load resistance
+        :param l_load: load inductance
+        """
+        # per phase state: capacitor voltage, inductor current, load current
+        a = np.array([[0, 1 / c_f, -1 / c_f],
+                      [-1 / l_f, -r_f / l_f, 0],
+                      [1 / l_load, 0, -r_load / l_load]])
+        b = np.array([0, v_dc / 2 / l_f, 0])
+        # exact discretisation of the continuous system with piecewise constant input
+        m = expm(np.block([[a, b[:, None]], [np.zeros((1, 4))]]) * ts)
+        self.ad, self.bd = m[:3, :3], m[:3, 3]
+        self.ts = ts
+        self.x = np.zeros((3, 3))
+        self.time = 0
+
+    def reset(self):
+        self.x = np.zeros((3, 3))
+        self.time = 0
+
+    @property
+    def obs(self) -> np.ndarray:
+        return self.x.ravel()
+
+    def step(self, modulation: np.ndarray) -> np.ndarray:
+        """
+        Simulates one time step
+
+        :param modulation: modulation indices of the three phases in [-1, 1]
+        :return: outputs, see OUTPUTS
+        """
+        self.x = self.ad @ self.x + np.outer(self.bd, modulation)
+        self.time += self.ts
+        return self.obs
+
+    def trajectory(self, n: int, freq: float = 50, amplitude: float = .65) -> np.ndarray:
+        """
+        Outputs of an open loop run with sinusoidal modulation
+
+        :param n: number of steps
+        :param freq: frequency of the modulation
+        :param amplitude: amplitude of the modulation
+        :return: array of shape (n, 9)
+        """
+        self.reset()
+        phases = 2 * np.pi * np.array([0, -1 / 3, 1 / 3])
+        return np.array([self.step(amplitude * np.sin(2 * np.pi * freq * k * self.ts + phases)) for k in range(n)])
@@ -38,6 +38,9 @@ os.makedirs(save_folder, exist_ok=True)
 
 
 class Reward:
+    # the example reward is a negative control error, used to abort episodes early that can not be safe anymore
+    max_reward = 0
+
     def __init__(self):
         self._idx = None
 
@@ -147,6 +150,7 @@ if __name__ == '__main__':
     # The agent is using the SafeOpt algorithm by F. Berkenkamp (https://arxiv.org/abs/1509.01066) in this example
     # Arguments described above
     # History is used to store results
+    # The tuning state is saved after every episode, an interrupted run continues from the last checkpoint
     agent = SafeOptAgent(mutable_params,
                          abort_reward,
                          j_min,
@@ -157,7 +161,9 @@ if __name__ == '__main__':
                          obs_template=dict(master=[[f'lc1.inductor{k}.i' for k in '123'],
                                                    [f'lc1.capacitor{k}.v' for k in '123'],
                                                    ]),
-                         history=FullHistory()
+                         history=FullHistory(),
+                         checkpoint=os.path.join(save_folder, 'safeopt_checkpoint.npz'),
+                         resume=True
                          )
 
 
@@ -223,7 +229,8 @@ if __name__ == '__main__':
     #####################################
     # Execution of the experiment
     # Using a runner to execute 'num_episodes' different episodes (i.e. SafeOpt iterations)
-    runner = Runner(agent, env)
+    # Episodes are aborted as soon as the parameters can not be classified as safe anymore
+    runner = Runner(agent, env, prune=True)
 
     runner.run(num_episodes, visualise=True)
 
@@ -31,7 +31,7 @@ def load_step(t):
 
 if __name__ == '__main__':
     gen = RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=load), initial=load,
-                      bounds=(lower_bound_load, upper_bound_load))
+                      bounds=(lower_bound_load, upper_bound_load), ts=net.ts)
 
 
     def xylables(fig):
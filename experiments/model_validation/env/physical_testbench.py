@@ -1,9 +1,13 @@
+from concurrent.futures import Future
+from typing import Dict, Optional
+
 import gym
-import paramiko
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from time import strftime, gmtime, sleep
+from time import strftime, gmtime
+
+from experiments.model_validation.env.testbench_transport import TestbenchTransport
 
 
 class TestbenchEnv(gym.Env):
@@ -14,15 +18,17 @@ class TestbenchEnv(gym.Env):
                  DT: float = 1 / 20000, executable_script_name: str = 'my_first_hps', num_steps: int = 1000,
                  kP: float = 0.01, kI: float = 5.0, kPV: float = 0.01, kIV: float = 5.0, ref: float = 10.0,
                  ref2: float = 12, f_nom: float = 50.0, i_limit: float = 25,
-                 i_nominal: float = 15, v_nominal: float = 20, mu=2):
+                 i_nominal: float = 15, v_nominal: float = 20, mu=2, transport: Optional[TestbenchTransport] = None):
 
         """
         Environment to connect the code to an FPGA-Controlled test-bench via SSH.
         Just for demonstration purpose
+
+        :param transport: connection to the testbench, by default a new one is opened to host
         """
 
-        self.ssh = paramiko.SSHClient()
-        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.transport = transport or TestbenchTransport(host, username, password)
+        self._pending = {}  # type: Dict[str, Future]
         self.host = host
         self.username = username
         self.password = password
@@ -44,30 +50,6 @@ class TestbenchEnv(gym.Env):
         self.v_nominal = v_nominal
         self.mu = mu
 
-    @staticmethod
-    def __decode_result(ssh_result):
-        """
-        Methode to decode the data sent from FPGA
-        """
-
-        result = list()
-        for line in ssh_result.read().splitlines():
-
-            temp = line.decode("utf-8").split(",")
-
-            if len(temp) == 31:
-                # temp.pop(-1)  # Drop the last item
-
-                floats = [float(i) for i in temp]
-                # print(floats)
-                result.append(floats)
-            elif len(temp) != 1:
-                print(temp)
-
-        decoded_result = np.array(result)
-
-        return decoded_result
-
     def rew_fun(self, Iabc_meas, Iabc_SP) -> float:
         """
         Defines the reward function for the environment. Uses the observations and setpoints to evaluate the quality of the
@@ -90,45 +72,32 @@ class TestbenchEnv(gym.Env):
 
         return -error.squeeze()
 
+    def _command(self, kP, kI) -> str:
+        return './{} -u 100 -n {} -i {} -f {} -1 {} -2 {} -E'.format(self.executable_script_name,
+                                                                     self.max_episode_steps, self.ref,
+                                                                     self.f_nom, kP, kI)
+
+    def prefetch(self, kP, kI):
+        """
+        Starts the experiment with the given controller parameters in the background.
+        A following reset() with the same parameters uses its result.
+        """
+        command = self._command(kP, kI)
+        self._pending[command] = self.transport.submit(command, self.max_episode_steps)
+
     def reset(self, kP, kI):
-        # toDo: ssh connection not open every episode!
         self.kP = kP
         self.kI = kI
 
-        count_retries = 0
-        connected = False
-
-        # for x in range(10):
-        while not connected and count_retries < 10:
-            count_retries += 1
-            try:
-                print('I Try!')
-                self.ssh.connect(self.host, username=self.username, password=self.password)
-                connected = True
-                # return True
-            except:  # (BadHostKeyException, AuthenticationException,
-                # SSHException, socket.gaierror) as e:
-                # print(e)
-                print('Argh')
-                sleep(1)
-
-        if count_retries == 10:
-            print('SSH connection not possible!')
-
-        str_command = './{} -u 100 -n {} -i {} -f {} -1 {} -2 {} -E'.format(self.executable_script_name,
-                                                                            self.max_episode_steps, self.ref,
-                                                                            self.f_nom, self.kP,
-                                                                            self.kI
-                                                                            )
-
-        ssh_stdin, ssh_stdout, ssh_stderr = self.ssh.exec_command(str_command)
-
-        self.data = self.__decode_result(ssh_stdout)
+        command = self._command(kP, kI)
+        future = self._pending.pop(command, None) or self.transport.submit(command, self.max_episode_steps)
+        self.data, _ = future.result()
 
         self.current_step = 0
         self.done = False
 
-        self.ssh.close()
+    def close(self):
+        self.transport.close()
 
     def step(self):
         """
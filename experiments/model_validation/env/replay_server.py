@@ -0,0 +1,144 @@
+"""
+Local SSH server that stands in for the testbench and replays recorded outputs, e.g. to test the TestbenchTransport
+and the testbench environments without hardware::
+
+    python replay_server.py recording.txt --port 2222
+
+Every command executed over SSH prints the recording. Any username and password is accepted.
+"""
+import argparse
+import logging
+import socket
+import threading
+from typing import Dict, List, Optional, Union
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+
+class _Interface(paramiko.ServerInterface):
+    def __init__(self):
+        self.commands = {}  # type: Dict[int, str]
+        self.requested = threading.Condition()
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        with self.requested:
+            self.commands[channel.get_id()] = command.decode()
+            self.requested.notify_all()
+        return True
+
+
+class ReplayServer:
+    def __init__(self, recording: Union[bytes, Dict[str, bytes]], host: str = '127.0.0.1', port: int = 0,
+                 chunk_size: int = 4096):
+        """
+        Starts the server in background threads
+
+        :param recording: output of every command or mapping of the commands to their outputs.
+            Unknown commands fail with exit status 127.
+        :param host: address the server listens on
+        :param port: port the server listens on, by default a free port is chosen
+        :param chunk_size: the output is sent in chunks of this size like by a running experiment
+        """
+        self.recording = recording
+        self.chunk_size = chunk_size
+        self.commands = []  # type: List[str]
+        """executed commands"""
+        self.connections = 0
+        """number of accepted connections"""
+        self._key = paramiko.RSAKey.generate(2048)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self._socket.listen()
+        self.host, self.port = self._socket.getsockname()
+        self._transports = []  # type: List[paramiko.Transport]
+        self._closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                break
+            self.connections += 1
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self._key)
+            self._transports.append(transport)
+            threading.Thread(target=self._serve, args=(transport,), daemon=True).start()
+
+    def _serve(self, transport: paramiko.Transport):
+        interface = _Interface()
+        try:
+            transport.start_server(server=interface)
+        except paramiko.SSHException as e:
+            logger.warning('SSH negotiation failed: %s', e)
+            return
+        while transport.is_active():
+            channel = transport.accept(.1)
+            if channel is None:
+                continue
+            with interface.requested:
+                interface.requested.wait_for(lambda: channel.get_id() in interface.commands or channel.closed, 10)
+            command = interface.commands.pop(channel.get_id(), None)
+            if command is not None:
+                self._replay(channel, command)
+            channel.close()
+
+    def _output(self, command: str) -> Optional[bytes]:
+        if isinstance(self.recording, bytes):
+            return self.recording
+        return self.recording.get(command)
+
+    def _replay(self, channel: paramiko.Channel, command: str):
+        logger.debug('Replaying "%s"', command)
+        self.commands.append(command)
+        output = self._output(command)
+        if output is None:
+            channel.sendall_stderr(f'{command}: command not found\n'.encode())
+            channel.send_exit_status(127)
+            return
+        for i in range(0, len(output), self.chunk_size):
+            channel.sendall(output[i:i + self.chunk_size])
+        channel.send_exit_status(0)
+
+    def close(self):
+        self._closed = True
+        self._socket.close()
+        for transport in self._transports:
+            transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SSH server replaying a recorded output of the testbench')
+    parser.add_argument('recording', help='file containing the output')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2222)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG)
+    with open(args.recording, 'rb') as f:
+        server = ReplayServer(f.read(), args.host, args.port)
+    print(f'Replaying {args.recording} on {server.host}:{server.port}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.close()
@@ -6,6 +6,8 @@ from openmodelica_microgrid_gym.util import nested_map, dq0_to_abc
 
 
 class Reward:
+    # all rewards are negative control errors, used to abort episodes early that can not be safe anymore
+    max_reward = 0
 
     def __init__(self, i_limit: float = 15, i_nominal: float = 10, v_limit: float = 500,
                  v_nominal: float = 230 * np.sqrt(2), mu_c: float = 1, mu_v: float = 1, max_episode_steps: float = 1000,
@@ -0,0 +1,214 @@
+"""
+SSH connection to the FPGA controlled testbench.
+The connection is opened once and reused for all experiments. The measurements are decoded while they are received
+and the command of the next experiment can be sent while the result of the previous one is finalized.
+"""
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import SimpleQueue
+from time import sleep
+from typing import List, Optional, Tuple
+
+import numpy as np
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+
+class LineDecoder:
+    def __init__(self, n_rows: int, n_cols: int = 31, n_obs_cols: int = 9):
+        """
+        Decodes the CSV lines printed by the testbench into preallocated arrays while the output is received.
+        Lines with n_cols values are measurements, lines with n_obs_cols values are observer outputs,
+        lines without commas are messages and ignored.
+
+        :param n_rows: expected number of measurements, the arrays grow if more are received
+        :param n_cols: number of values of a measurement
+        :param n_obs_cols: number of values of an observer output
+        """
+        self.n_cols, self.n_obs_cols = n_cols, n_obs_cols
+        self._buffers = {n_cols: np.empty((n_rows, n_cols)), n_obs_cols: np.empty((n_rows, n_obs_cols))}
+        self._n = {n_cols: 0, n_obs_cols: 0}
+        self._rest = b''
+
+    def feed(self, chunk: bytes):
+        """
+        Decodes all complete lines, an incomplete last line is kept until the next chunk arrives
+        """
+        lines = (self._rest + chunk).split(b'\n')
+        self._rest = lines.pop()
+        self._decode(lines)
+
+    def close(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decodes the remaining line
+
+        :return: measurements and observer outputs
+        """
+        self._decode([self._rest])
+        self._rest = b''
+        return self.data, self.obs
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._buffers[self.n_cols][:self._n[self.n_cols]]
+
+    @property
+    def obs(self) -> np.ndarray:
+        return self._buffers[self.n_obs_cols][:self._n[self.n_obs_cols]]
+
+    def _decode(self, lines: List[bytes]):
+        rows = {self.n_cols: [], self.n_obs_cols: []}
+        for line in lines:
+            line = line.rstrip(b'\r')
+            n = line.count(b',') + 1
+            if n in rows:
+                rows[n].append(line)
+            elif n != 1:
+                logger.warning('Unexpected line of the testbench: %s', line)
+        for n_cols, lines_ in rows.items():
+            if lines_:
+                self._append(n_cols, lines_)
+
+    def _append(self, n_cols: int, lines: List[bytes]):
+        # all lines of a chunk are parsed at once
+        values = np.array(b','.join(lines).split(b','), dtype=float).reshape(-1, n_cols)
+        buffer, n = self._buffers[n_cols], self._n[n_cols]
+        if n + len(values) > len(buffer):
+            grown = np.empty((max(2 * len(buffer), n + len(values)), n_cols))
+            grown[:n] = buffer[:n]
+            self._buffers[n_cols] = buffer = grown
+        buffer[n:n + len(values)] = values
+        self._n[n_cols] = n + len(values)
+
+
+class TestbenchTransport:
+    def __init__(self, host: str = '131.234.172.139', username: str = 'root', password: str = 'omg', port: int = 22,
+                 max_retries: int = 10, retry_delay: float = 1, chunk_size: int = 1 << 16, n_cols: int = 31,
+                 n_obs_cols: int = 9):
+        """
+        Persistent SSH connection that executes the experiments on the testbench one after another
+
+        :param host: address of the testbench
+        :param username: SSH user
+        :param password: SSH password
+        :param port: SSH port
+        :param max_retries: number of connection attempts
+        :param retry_delay: delay after the first failed connection attempt in s, it grows linearly with the attempts
+        :param chunk_size: maximum number of bytes read from the output at once
+        :param n_cols: number of values of a measurement, see LineDecoder
+        :param n_obs_cols: number of values of an observer output, see LineDecoder
+        """
+        self.host, self.port = host, port
+        self.username, self.password = username, password
+        self.max_retries, self.retry_delay = max_retries, retry_delay
+        self.chunk_size = chunk_size
+        self.n_cols, self.n_obs_cols = n_cols, n_obs_cols
+        self._client = None  # type: Optional[paramiko.SSHClient]
+        # the testbench executes one experiment at a time, the single thread keeps the submission order
+        self._io_executor = ThreadPoolExecutor(1)
+        # the received output is decoded in a second thread while the next command is already sent
+        self._decode_executor = ThreadPoolExecutor(1)
+
+    def connect(self) -> paramiko.SSHClient:
+        """
+        Returns the open connection or reconnects
+
+        :raises ConnectionError: if no connection could be established
+        """
+        if self._client is not None and self._client.get_transport() is not None \
+                and self._client.get_transport().is_active():
+            return self._client
+
+        for attempt in range(1, self.max_retries + 1):
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            try:
+                client.connect(self.host, port=self.port, username=self.username, password=self.password)
+            except (paramiko.SSHException, OSError) as e:
+                logger.warning('Connection attempt %d to %s failed: %s', attempt, self.host, e)
+                client.close()
+                if attempt == self.max_retries:
+                    raise ConnectionError(f'SSH connection to {self.host} not possible') from e
+                sleep(self.retry_delay * attempt)
+            else:
+                self._client = client
+                return client
+
+    def submit(self, command: str, n_rows: int) -> 'Future[Tuple[np.ndarray, np.ndarray]]':
+        """
+        Executes a command on the testbench in the background.
+        The experiments are executed in the order they were submitted.
+
+        :param command: command executed on the testbench
+        :param n_rows: expected number of measurements
+        :return: future of the measurements and observer outputs, see LineDecoder
+        """
+        chunks = SimpleQueue()
+        io_future = self._io_executor.submit(self._receive, command, chunks)
+        return self._decode_executor.submit(self._decode, command, n_rows, chunks, io_future)
+
+    def run(self, command: str, n_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Executes a command on the testbench and waits for the result, see submit()
+        """
+        return self.submit(command, n_rows).result()
+
+    def _receive(self, command: str, chunks: SimpleQueue) -> Tuple[int, bytes]:
+        """
+        Executes the command and puts the received chunks of the output into the queue, None marks the end
+
+        :return: exit status and error output of the command
+        """
+        logger.debug('Executing "%s"', command)
+        try:
+            channel = self.connect().get_transport().open_session()
+            channel.exec_command(command)
+            while True:
+                chunk = channel.recv(self.chunk_size)
+                if not chunk:
+                    break
+                chunks.put(chunk)
+            status = channel.recv_exit_status()
+            stderr = b''
+            while channel.recv_stderr_ready():
+                stderr += channel.recv_stderr(self.chunk_size)
+            channel.close()
+        except paramiko.SSHException:
+            # reconnect on the next experiment
+            self.close_connection()
+            raise
+        finally:
+            chunks.put(None)
+        return status, stderr
+
+    def _decode(self, command: str, n_rows: int, chunks: SimpleQueue,
+                io_future: 'Future[Tuple[int, bytes]]') -> Tuple[np.ndarray, np.ndarray]:
+        decoder = LineDecoder(n_rows, self.n_cols, self.n_obs_cols)
+        for chunk in iter(chunks.get, None):
+            decoder.feed(chunk)
+        # raises the errors of the connection
+        status, stderr = io_future.result()
+        data, obs = decoder.close()
+        if status != 0:
+            raise RuntimeError(f'"{command}" failed with exit status {status}: {stderr.decode(errors="replace")}')
+        return data, obs
+
+    def close_connection(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def close(self):
+        """
+        Waits for the submitted experiments and closes the connection
+        """
+        self._io_executor.shutdown()
+        self._decode_executor.shutdown()
+        self.close_connection()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,14 +1,13 @@
-from socket import socket
+from concurrent.futures import Future
+from typing import Dict, Optional
 
 import gym
-import paramiko
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from time import strftime, gmtime, sleep
-
-from paramiko import BadHostKeyException, AuthenticationException, SSHException
+from time import strftime, gmtime
 
+from experiments.model_validation.env.testbench_transport import TestbenchTransport
 from openmodelica_microgrid_gym.util import dq0_to_abc
 
 
@@ -21,15 +20,18 @@ class TestbenchEnvVoltage(gym.Env):
                  DT: float = 1/20000, executable_script_name: str = 'my_first_hps' ,num_steps: int = 1000,
                  kP: float = 0.052346, kI: float = 15.4072 , kPV: float = 0.018619 , kIV: float = 10.0,
                  ref: float = 10.0, ref2: float =12, f_nom: float = 50.0, i_limit: float = 16,
-                 i_nominal: float = 12, v_nominal: float = 20, v_limit = 30, mu=2):
+                 i_nominal: float = 12, v_nominal: float = 20, v_limit = 30, mu=2,
+                 transport: Optional[TestbenchTransport] = None):
 
         """
                 Environment to connect the code to an FPGA-Controlled test-bench via SSH for votage controll.
                 Just for demonstration purpose - different
+
+                :param transport: connection to the testbench, by default a new one is opened to host
         """
 
-        self.ssh = paramiko.SSHClient()
-        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.transport = transport or TestbenchTransport(host, username, password)
+        self._pending = {}  # type: Dict[str, Future]
 
         self.host = host
         self.username = username
@@ -54,58 +56,6 @@ class TestbenchEnvVoltage(gym.Env):
         self.v_limit = v_limit
         self.mu = mu
 
-    @staticmethod
-    def __decode_result(ssh_result):
-
-        result = list()
-        resultObs = list()
-        for line in ssh_result.read().splitlines():
-
-            temp = line.decode("utf-8").split(",")
-
-            if len(temp) == 31:
-                #temp.pop(-1)  # Drop the last item
-
-                floats = [float(i) for i in temp]
-                # print(floats)
-                result.append(floats)
-            elif len(temp) == 9:
-                # print(temp)
-                floatsObs = [float(i) for i in temp]
-                # print(floatsObs)
-                resultObs.append(floatsObs)
-                # count=count+1
-            elif len(temp) != 1:
-                print(temp)
-
-        N = (len(result))
-        decoded_result = np.array(result)
-
-        return [decoded_result, np.array(resultObs)]
-
-    @staticmethod
-    def __decode_result_obs(ssh_result):
-
-
-        resultObs = list()
-        for line in ssh_result.read().splitlines():
-
-            temp = line.decode("utf-8").split(",")
-
-            if len(temp) == 9:
-                # print(temp)
-                floatsObs = [float(i) for i in temp]
-                # print(floatsObs)
-                resultObs.append(floatsObs)
-                # count=count+1
-            elif len(temp) != 1:
-                print(temp)
-
-        N = (len(resultObs))
-        decoded_result = np.array(resultObs)
-
-        return decoded_result
-
     def rew_fun(self, vabc_meas, vsp_abc) -> float:
         """
         Defines the reward function for the environment. Uses the observations and setpoints to evaluate the quality of the
@@ -134,57 +84,50 @@ class TestbenchEnvVoltage(gym.Env):
 
         return -error.squeeze()
 
-    #def reset(self, kP, kI, kPv, kIv):
-    def reset(self, kPv, kIv):
-        # toDo: ssh connection not open every episode!
-        #self.kP = kP
-        #self.kI = kI
-        self.kPV = kPv
-        self.kIV = kIv
-
-        #self.ssh.connect(self.host, username=self.username, password=self.password)
-
-        count_retries = 0
-        connected = False
-
-        #for x in range(10):
-        while not connected and count_retries < 10:
-            count_retries+=1
-            try:
-                print('I Try!')
-                self.ssh.connect(self.host, username=self.username, password=self.password)
-                connected =  True
-                # return True
-            except:  # (BadHostKeyException, AuthenticationException,
-                # SSHException, socket.gaierror) as e:
-                # print(e)
-                print('Argh')
-                sleep(1)
-
-        if count_retries == 10:
-            print('SSH FUCKED UP!')
+    def _command(self, kP, kI, kPv, kIv) -> str:
+        return './{} -u 100 -n {} -v {} -f {} -1 {} -2 {} -4 {} -5 {} -L -E'.format(self.executable_script_name,
+                                                                                   self.max_episode_steps,
+                                                                                   self.v_nominal, self.f_nom,
+                                                                                   kP, kI, kPv, kIv)
 
-        # toDo: get SP and kP/I from agent?
-        # str_command = './{} {} {} {} {} {}'.format(self.executable_script_name, self.max_episode_steps, self.kP, self.kI,
-        #                                           self.i_ref, self.f_nom)
+    def _command4D(self, kP, kI, kPv, kIv) -> str:
+        return './{} {} {} {} {} {} {} {} {} {}'.format(self.executable_script_name, self.max_episode_steps,
+                                                        int(self.max_episode_steps / 3 - 220),
+                                                        int(self.max_episode_steps * 2 / 3 - 520),
+                                                        kP, kI, kPv, kIv, self.v_nominal, self.f_nom)
 
-        str_command = './{} -u 100 -n {} -v {} -f {} -1 {} -2 {} -4 {} -5 {} -L -E'.format(self.executable_script_name,
-                                                                                           self.max_episode_steps,
-                                                                                           self.v_nominal, self.f_nom,
-                                                                                           self.kP, self.kI, self.kPV,
-                                                                                           self.kIV
-                                                                                           )
-
-        ssh_stdin, ssh_stdout, ssh_stderr = self.ssh.exec_command(str_command)
-
-        self.data, self.data_obs = self.__decode_result(ssh_stdout)
-        # self.data_obs = self.__decode_result_obs(ssh_stdout)
+    def _run(self, command: str):
+        future = self._pending.pop(command, None) or self.transport.submit(command, self.max_episode_steps)
+        self.data, self.data_obs = future.result()
 
         self.current_step = 0
         self.done = False
 
-        self.ssh.close()
+    def prefetch(self, kPv, kIv):
+        """
+        Starts the experiment with the given controller parameters in the background.
+        A following reset() with the same parameters uses its result.
+        """
+        command = self._command(self.kP, self.kI, kPv, kIv)
+        self._pending[command] = self.transport.submit(command, self.max_episode_steps)
+
+    def prefetch4D(self, kP, kI, kPv, kIv):
+        """
+        Like prefetch() for reset4D()
+        """
+        command = self._command4D(kP, kI, kPv, kIv)
+        self._pending[command] = self.transport.submit(command, self.max_episode_steps)
+
+    #def reset(self, kP, kI, kPv, kIv):
+    def reset(self, kPv, kIv):
+        #self.kP = kP
+        #self.kI = kI
+        self.kPV = kPv
+        self.kIV = kIv
+        self._run(self._command(self.kP, self.kI, kPv, kIv))
 
+    def close(self):
+        self.transport.close()
 
     def rew_fun4D(self, vabc_meas, vsp_abc, iabc_meas, iabc_SP) -> float:
         """
@@ -218,53 +161,11 @@ class TestbenchEnvVoltage(gym.Env):
         return -error.squeeze()
 
     def reset4D(self, kP, kI, kPv, kIv):
-        # toDo: ssh connection not open every episode!
         self.kP = kP
         self.kI = kI
         self.kPV = kPv
         self.kIV = kIv
-
-        # self.ssh.connect(self.host, username=self.username, password=self.password)
-
-        count_retries = 0
-        connected = False
-
-        # for x in range(10):
-        while not connected and count_retries < 10:
-            count_retries += 1
-            try:
-                print('I Try!')
-                self.ssh.connect(self.host, username=self.username, password=self.password)
-                connected = True
-                # return True
-            except:  # (BadHostKeyException, AuthenticationException,
-                # SSHException, socket.gaierror) as e:
-                # print(e)
-                print('Argh')
-                sleep(1)
-
-        if count_retries == 10:
-            print('SSH FUCKED UP!')
-
-            # toDo: get SP and kP/I from agent?
-            # str_command = './{} {} {} {} {} {}'.format(self.executable_script_name, self.max_episode_steps, self.kP, self.kI,
-            #                                           self.i_ref, self.f_nom)
-
-        str_command = './{} {} {} {} {} {} {} {} {} {}'.format(self.executable_script_name, self.max_episode_steps,
-                                                                   np.int(self.max_episode_steps / 3 - 220),
-                                                                   np.int(self.max_episode_steps * 2 / 3 - 520),
-                                                                   self.kP, self.kI, self.kPV, self.kIV,
-                                                                   self.v_nominal, self.f_nom)
-
-        ssh_stdin, ssh_stdout, ssh_stderr = self.ssh.exec_command(str_command)
-
-        self.data, self.data_obs = self.__decode_result(ssh_stdout)
-            # self.data_obs = self.__decode_result_obs(ssh_stdout)
-
-        self.current_step = 0
-        self.done = False
-
-        self.ssh.close()
+        self._run(self._command4D(kP, kI, kPv, kIv))
 
     def step(self):
         """
@@ -9,9 +9,7 @@ import logging
 import os
 from distutils.util import strtobool
 from functools import partial
-from itertools import product
 from itertools import tee
-from multiprocessing import Pool
 from os.path import isfile
 
 import GPy
@@ -23,6 +21,7 @@ import pandas as pd
 import seaborn as sns
 
 from openmodelica_microgrid_gym.env.plotmanager import PlotManager
+from openmodelica_microgrid_gym.execution.sweep import Sweep, grid
 from experiments.model_validation.env.rewards import Reward
 from openmodelica_microgrid_gym.net import Network
 
@@ -322,16 +321,18 @@ def run_experiment(len_kp, len_ki):
         return agent.unsafe
 
 
+def sweep_experiment(resources, len_kp, len_ki):
+    return dict(unsafe=bool(run_experiment(len_kp, len_ki)))
+
+
 if __name__ == '__main__':
     print(lengthscale_vec_kP, lengthscale_vec_kI)
-    with Pool(5) as p:
-        is_unsafe = p.starmap(run_experiment, product(lengthscale_vec_kP, lengthscale_vec_kI))
-
-    safe_vec = np.empty([len(lengthscale_vec_kP), len(lengthscale_vec_kI)])
+    # results are stored as soon as a point is finished, completed points are skipped on a restart
+    sweep = Sweep(sweep_experiment, grid(len_kp=lengthscale_vec_kP, len_ki=lengthscale_vec_kI),
+                  save_folder + '/lengthscale_sweep.h5', n_workers=5)
+    results = sweep.run()
 
-    for ((kk, ls_kP), (ii, ls_IP)), unsafe in zip(product(enumerate(lengthscale_vec_kP), enumerate(lengthscale_vec_kI)),
-                                                  is_unsafe):
-        safe_vec[kk, ii] = int(not unsafe)
+    safe_vec = (~results.pivot(index='len_kp', columns='len_ki', values='unsafe').astype(bool)).astype(int).to_numpy()
 
     df = pd.DataFrame(safe_vec, index=[f'{i:.3f}' for i in lengthscale_vec_kP],
                       columns=[f'{i:.2f}' for i in lengthscale_vec_kI])
@@ -1,14 +1,25 @@
-from os import listdir, walk, chdir
-from os.path import join, basename, isdir
-from shutil import copytree
-from tempfile import TemporaryDirectory
-from tkinter.filedialog import askopenfilenames, Tk, asksaveasfilename
-from zipfile import ZipFile
-import xml.etree.ElementTree as ET
+"""
+Merges FMUs of the same model compiled for different platforms into a single FMU containing all binaries.
+
+    python merge_fmus.py linux.fmu windows.fmu -o merged.fmu
+
+Without arguments, the FMUs and the output file are selected by file dialogs.
+The FMUs are extracted in parallel into the FMU cache (see openmodelica_microgrid_gym.env.fmu_cache),
+hence FMUs that were already loaded or merged before are not extracted again.
+"""
+import argparse
 import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from os import listdir, walk
+from os.path import join, isdir, relpath
+from typing import List, Optional
+from zipfile import ZipFile, ZIP_DEFLATED
 
 from more_itertools import collapse
 
+from openmodelica_microgrid_gym.env.fmu_cache import FMUCache
+
 
 def get_fmu_key(path):
     """some identifier to derive a unique identifier from the fmu"""
@@ -18,54 +29,73 @@ def get_fmu_key(path):
     s += ET.tostring(root.find('ModelStructure')).decode('utf-8')
 
     # replace all floats
-    s = re.sub('"[-+]?(\d+([.,]\d*)?|[.,]\d+)([eE][-+]?\d+)?"', lambda f: str(float(f[0][1:-1])), s)
+    s = re.sub(r'"[-+]?(\d+([.,]\d*)?|[.,]\d+)([eE][-+]?\d+)?"', lambda f: str(float(f[0][1:-1])), s)
     return s
 
 
-def copy_binaries(wd, fmus, binaries):
-    primary = basename(fmus[0])
-    for fmu, binaries_ in zip(fmus[1:], binaries[1:]):
-        for binary in binaries_:
-            copytree(join(wd, basename(fmu), 'binaries', binary), join(wd, primary, 'binaries', binary))
+def _add_folder(zip_obj: ZipFile, folder: str, root: str):
+    for folder_name, _, filenames in walk(folder):
+        for filename in filenames:
+            path = join(folder_name, filename)
+            zip_obj.write(path, relpath(path, root))
 
 
-if __name__ == '__main__':
-    tk = Tk()
-    tk.withdraw()
-
-    fmus = askopenfilenames(title='Select FMUs to merge', filetypes=['Functional\u00A0Mockup\u00A0Unit {*.fmu}'])
+def merge_fmus(fmus: List[str], output: str, cache: Optional[FMUCache] = None, n_workers: Optional[int] = None):
+    """
+    Merges the binaries of several FMUs into a new FMU
 
+    :param fmus: FMU files, the first one is the primary FMU whose files are all copied
+    :param output: merged FMU file
+    :param cache: cache the FMUs are extracted to
+    :param n_workers: number of threads extracting the FMUs
+    """
     if len(fmus) < 2:
         raise ValueError('Please select multiple FMUs')
+    cache = cache or FMUCache()
+
+    # unpack fmus to the cache
+    with ThreadPoolExecutor(n_workers) as pool:
+        folders = list(pool.map(cache.extract, fmus))
+    # add all subdirectories of "binaries" in the zip files
+    binaries = [[f for f in listdir(join(folder, 'binaries')) if isdir(join(folder, 'binaries', f))]
+                for folder in folders]
+
+    # check if all fmus provide different binaries (binary/*)
+    if len(set(collapse(binaries))) != len(list(collapse(binaries))):
+        raise ValueError(f'The provided binary folders are not unique: {list(zip(fmus, binaries))}')
 
-    # create tmp directory
-    with TemporaryDirectory() as dir:
-        # unpack fmus to tmp directory
-        binaries = []
-        for fmu in fmus:
-            with ZipFile(fmu, 'r') as z:
-                z.extractall(join(dir, basename(fmu)))
-            # add all subdirectories of "binaries" in the zip files
-            binaries.append(list(filter(lambda f: not isdir(f), listdir(join(dir, basename(fmu), "binaries")))))
-
-        # check if all fmus provide different binaries (binary/*)
-        if len(set(collapse(binaries))) != len(list(collapse(binaries))):
-            raise ValueError(f'The provided binary folders are not unique: {list(zip(fmus, binaries))}')
-
-        # check if their xmls are sufficiently similar
-        if len(set([get_fmu_key(join(dir, basename(fmu))) for fmu in fmus])) > 1:
-            raise ValueError('The FMUs appear to be generated from different model files.' +
-                             str([get_fmu_key(join(dir, basename(fmu))) for fmu in fmus]))
-
-        # copy content of binary folder from secondary fmus to the folder of the primary
-        copy_binaries(dir, fmus, binaries)
-
-        # change the working directory into the primary fmu folder which we want to package
-        chdir(join(dir, basename(fmus[0])))
-        # zip the primary folder, delete tempfolder
-        with ZipFile(asksaveasfilename(filetypes=['Functional\u00A0Mockup\u00A0Unit {*.fmu}']), 'w') as zipObj:
-            # Iterate over all the files in directory
-            for folderName, subfolders, filenames in walk('.'):
-                for filename in filenames:
-                    # Add file to zip
-                    zipObj.write(join(folderName, filename))
+    # check if their xmls are sufficiently similar
+    keys = [get_fmu_key(folder) for folder in folders]
+    if len(set(keys)) > 1:
+        raise ValueError('The FMUs appear to be generated from different model files.' + str(keys))
+
+    # zip the primary folder and the binary folders of the secondary fmus, the cache is not modified
+    with ZipFile(output, 'w', ZIP_DEFLATED) as zip_obj:
+        _add_folder(zip_obj, folders[0], folders[0])
+        for folder, binaries_ in zip(folders[1:], binaries[1:]):
+            for binary in binaries_:
+                _add_folder(zip_obj, join(folder, 'binaries', binary), folder)
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Merge FMUs of the same model compiled for different platforms')
+    parser.add_argument('fmus', nargs='*', help='FMUs to merge, the first one is the primary FMU')
+    parser.add_argument('-o', '--output', help='merged FMU')
+    parser.add_argument('--cache-dir', help='folder of the FMU cache')
+    parser.add_argument('--workers', type=int, help='number of threads extracting the FMUs')
+    args = parser.parse_args(args)
+
+    fmus, output = args.fmus, args.output
+    if not fmus or output is None:
+        from tkinter.filedialog import askopenfilenames, Tk, asksaveasfilename
+        tk = Tk()
+        tk.withdraw()
+        fmus = fmus or askopenfilenames(title='Select FMUs to merge',
+                                        filetypes=['Functional\u00A0Mockup\u00A0Unit {*.fmu}'])
+        output = output or asksaveasfilename(filetypes=['Functional\u00A0Mockup\u00A0Unit {*.fmu}'])
+
+    merge_fmus(list(fmus), output, FMUCache(args.cache_dir), args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,16 @@ import logging
 
 from gym.envs.registration import register
 
-from openmodelica_microgrid_gym.agents import Agent
-from openmodelica_microgrid_gym.env import ModelicaEnv
-from openmodelica_microgrid_gym.execution import Runner
+from openmodelica_microgrid_gym.util.lazy import lazy_attributes
 
 __all__ = ['Agent', 'Runner']
 __version__ = '0.4.0'
 
+# the classes are imported on first access to keep the import of the package fast
+__getattr__, __dir__ = lazy_attributes(__name__, {'Agent': '.agents',
+                                                  'ModelicaEnv': '.env',
+                                                  'Runner': '.execution'})
+
 register(
     id='ModelicaEnv_test-v1',
     entry_point='openmodelica_microgrid_gym.env:ModelicaEnv',
@@ -1,5 +1,8 @@
-from openmodelica_microgrid_gym.agents.agent import Agent
-from openmodelica_microgrid_gym.agents.safeopt import SafeOptAgent
-from openmodelica_microgrid_gym.agents.staticctrl import StaticControlAgent
+from openmodelica_microgrid_gym.util.lazy import lazy_attributes
 
 __all__ = ['Agent', 'SafeOptAgent', 'StaticControlAgent']
+
+# SafeOptAgent requires GPy and safeopt, which are only imported on first access
+__getattr__, __dir__ = lazy_attributes(__name__, {'Agent': '.agent',
+                                                  'SafeOptAgent': '.safeopt',
+                                                  'StaticControlAgent': '.staticctrl'})
@@ -1,14 +1,17 @@
-from typing import List, Union
+from typing import List, Union, Optional, TYPE_CHECKING
 
 import numpy as np
-from matplotlib.figure import Figure
 
-from openmodelica_microgrid_gym.env import ModelicaEnv
 from openmodelica_microgrid_gym.util import EmptyHistory
 
+if TYPE_CHECKING:
+    # only used for annotations, importing them is slow
+    from matplotlib.figure import Figure
+    from openmodelica_microgrid_gym.env import ModelicaEnv
+
 
 class Agent:
-    def __init__(self, obs_varnames: List[str] = None, history: EmptyHistory = None, env: ModelicaEnv = None):
+    def __init__(self, obs_varnames: List[str] = None, history: EmptyHistory = None, env: 'ModelicaEnv' = None):
         """
         Abstract base class for all Agents. The agent can act on the environment and observe its result.
         This class is aims to wrap the whole learning process into a class to simplify the implementation.
@@ -70,7 +73,7 @@ class Agent:
         """
         return np.empty(0)
 
-    def render(self) -> Figure:
+    def render(self) -> 'Figure':
         """
         Visualisation of the agent, e.g. its learning state or similar
         """
@@ -82,6 +85,15 @@ class Agent:
         """
         pass
 
+    @property
+    def return_threshold(self) -> Optional[float]:
+        """
+        Episode return below which the current parameters are classified as unsafe.
+        Allows runners to abort episodes early that can no longer reach it.
+        None if there is no such threshold.
+        """
+        return None
+
     @property
     def has_improved(self) -> bool:
         """
@@ -0,0 +1,241 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+from GPy.kern import Kern
+from scipy.linalg import solve_triangular, cho_solve
+
+
+def chol_update(L: np.ndarray, x: np.ndarray, downdate: bool = False):
+    """
+    In-place rank-one update of a lower Cholesky factor, such that afterwards L L^T = L_old L_old^T ± x x^T.
+    Costs O(n^2) instead of O(n^3) for a new factorisation.
+
+    :param L: lower triangular Cholesky factor, will be modified
+    :param x: vector of the rank-one modification
+    :param downdate: if True, x x^T is subtracted instead of added
+    """
+    sign = -1 if downdate else 1
+    x = np.array(x, dtype=float)
+    n = len(x)
+    for k in range(n):
+        r = np.sqrt(L[k, k] ** 2 + sign * x[k] ** 2)
+        if not np.isfinite(r) or r <= 0:
+            raise np.linalg.LinAlgError('matrix is not positive definite after the downdate')
+        c, s = r / L[k, k], x[k] / L[k, k]
+        L[k, k] = r
+        if k + 1 < n:
+            L[k + 1:, k] = (L[k + 1:, k] + sign * s * x[k + 1:]) / c
+            x[k + 1:] = c * x[k + 1:] - s * L[k + 1:, k]
+
+
+class IncrementalGP:
+    def __init__(self, X: np.ndarray, Y: np.ndarray, kernel: Kern, noise_var: float = 1.,
+                 max_active: Optional[int] = None, cache_size: int = 8):
+        """
+        Gaussian process regression with zero mean and fixed hyperparameters,
+        that can be used by safeopt instead of GPy.models.GPRegression.
+
+        Adding data points (the common case in SafeOpt) appends the new rows to the Cholesky factor of the
+        kernel matrix instead of factorising it again. Removing the last data points (like safeopt does for
+        temporary data points) simply truncates the factor.
+
+        If max_active is set and the data set grows beyond it, the GP switches to the deterministic training
+        conditional (DTC) sparse approximation using the first max_active data points as inducing inputs.
+        From then on, every new data point only causes a rank-one update of a max_active x max_active factor.
+
+        Cross covariances between test points and the training data are cached, because safeopt evaluates
+        the same safe set multiple times per optimisation step.
+        Only newly added training points need to be evaluated for a cached test set.
+
+        :param X: 2d array of inputs
+        :param Y: 2d array of outputs with one column
+        :param kernel: GPy kernel used to calculate the covariances
+        :param noise_var: variance of the observation noise
+        :param max_active: maximum number of data points conditioned on exactly. If None, the GP is always exact.
+        :param cache_size: number of test sets whose cross covariances are cached
+        """
+        self.kern = kernel
+        self.noise_var = noise_var
+        self.max_active = max_active
+        self.cache_size = cache_size
+
+        self._X = np.empty((0, kernel.input_dim))
+        self._Y = np.empty((0, 1))
+        self._cache = OrderedDict()
+
+        # exact GP: Cholesky factor of K + noise_var * I
+        self._L = np.empty((0, 0))
+        # sparse GP: inducing inputs, Cholesky factors of K_zz and A = noise_var * K_zz + K_zx K_xz, b = K_zx y
+        self._Z = None  # type: Optional[np.ndarray]
+        self._Lzz = None
+        self._La = None
+        self._b = None
+        self._alpha = None
+
+        self.set_XY(X, Y)
+
+    @property
+    def input_dim(self) -> int:
+        return self.kern.input_dim
+
+    @property
+    def X(self) -> np.ndarray:
+        return self._X
+
+    @property
+    def Y(self) -> np.ndarray:
+        return self._Y
+
+    @property
+    def is_sparse(self) -> bool:
+        """
+        True if the GP uses the sparse approximation
+        """
+        return self._Z is not None
+
+    def set_XY(self, X: np.ndarray, Y: np.ndarray):
+        """
+        Sets the data of the GP.
+        If the new data extends or truncates the current data, the factorisation is updated incrementally.
+
+        :param X: 2d array of inputs
+        :param Y: 2d array of outputs with one column
+        """
+        X, Y = np.atleast_2d(X).astype(float), np.atleast_2d(Y).astype(float)
+        n, n_new = len(self._X), len(X)
+        if n_new >= n and np.array_equal(X[:n], self._X) and np.array_equal(Y[:n], self._Y):
+            self._append(X[n:], Y[n:])
+        elif n_new < n and np.array_equal(X, self._X[:n_new]) and np.array_equal(Y, self._Y[:n_new]):
+            self._truncate(n_new)
+        else:
+            self._refit(X, Y)
+
+    def _refit(self, X: np.ndarray, Y: np.ndarray):
+        self._X, self._Y = np.empty((0, self.input_dim)), np.empty((0, 1))
+        self._L = np.empty((0, 0))
+        self._Z = self._Lzz = self._La = self._b = None
+        self._cache.clear()
+        self._append(X, Y)
+
+    def _append(self, X: np.ndarray, Y: np.ndarray):
+        if not len(X):
+            return
+        n = len(self._X)
+        self._X, self._Y = np.vstack([self._X, X]), np.vstack([self._Y, Y])
+
+        if self.is_sparse:
+            for x, y in zip(X, Y):
+                kz = self.kern.K(self._Z, x[None, :])[:, 0]
+                chol_update(self._La, kz)
+                self._b += kz * y
+        elif self.max_active is not None and len(self._X) > self.max_active:
+            self._sparsify()
+        elif n == 0:
+            # LAPACK rejects the empty factor in old scipy versions
+            self._L = np.linalg.cholesky(self.kern.K(X) + self.noise_var * np.eye(len(X)))
+        else:
+            # block Cholesky append: [[L, 0], [L21, L22]]
+            L21 = solve_triangular(self._L, self.kern.K(self._X[:n], X), lower=True).T
+            K22 = self.kern.K(X) + self.noise_var * np.eye(len(X))
+            L22 = np.linalg.cholesky(K22 - L21 @ L21.T)
+            L = np.zeros((len(self._X), len(self._X)))
+            L[:n, :n] = self._L
+            L[n:, :n] = L21
+            L[n:, n:] = L22
+            self._L = L
+        self._update_alpha()
+
+    def _truncate(self, n: int):
+        if self.is_sparse:
+            if n <= self.max_active:
+                self._refit(self._X[:n], self._Y[:n])
+                return
+            for x, y in zip(self._X[n:], self._Y[n:]):
+                kz = self.kern.K(self._Z, x[None, :])[:, 0]
+                chol_update(self._La, kz, downdate=True)
+                self._b -= kz * y
+        else:
+            self._L = self._L[:n, :n]
+            # drop the cached covariances of removed points, as other points might be appended at their positions
+            for key, (Kxs, Kdiag) in self._cache.items():
+                self._cache[key] = Kxs[:, :n], Kdiag
+        self._X, self._Y = self._X[:n], self._Y[:n]
+        self._update_alpha()
+
+    def _sparsify(self):
+        """
+        Switches to the sparse approximation using the first max_active data points as inducing inputs
+        """
+        self._Z = self._X[:self.max_active].copy()
+        Kzz = self.kern.K(self._Z)
+        self._Lzz = np.linalg.cholesky(Kzz + 1e-8 * np.mean(np.diag(Kzz)) * np.eye(len(Kzz)))
+        Kzx = self.kern.K(self._Z, self._X)
+        self._La = np.linalg.cholesky(self.noise_var * Kzz + Kzx @ Kzx.T)
+        self._b = (Kzx @ self._Y)[:, 0]
+        self._L = np.empty((0, 0))
+        self._cache.clear()
+
+    def _update_alpha(self):
+        if self.is_sparse:
+            self._alpha = cho_solve((self._La, True), self._b)
+        elif len(self._X):
+            self._alpha = cho_solve((self._L, True), self._Y[:, 0])
+        else:
+            self._alpha = np.empty(0)
+
+    def _cross_cov(self, Xnew: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cross covariance of the test points with the training data (or the inducing inputs) and the prior variances.
+        Cached results are extended by the columns of data points added since they were computed.
+        """
+        key = (Xnew.shape, Xnew.tobytes())
+        basis = self._Z if self.is_sparse else self._X
+        if key in self._cache:
+            Kxs, Kdiag = self._cache.pop(key)
+            if Kxs.shape[1] < len(basis):
+                Kxs = np.hstack([Kxs, self.kern.K(Xnew, basis[Kxs.shape[1]:])])
+        else:
+            Kxs, Kdiag = self.kern.K(Xnew, basis), self.kern.Kdiag(Xnew)
+        self._cache[key] = Kxs, Kdiag
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return Kxs[:, :len(basis)], Kdiag
+
+    def predict_noiseless(self, Xnew: np.ndarray, full_cov: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predicts the latent function (without observation noise)
+
+        :param Xnew: 2d array of test inputs
+        :param full_cov: not supported, only present for compatibility with GPy
+        :return: mean and variance, both as arrays with one column
+        """
+        if full_cov:
+            raise NotImplementedError('IncrementalGP only supports the prediction of marginal variances')
+        Xnew = np.atleast_2d(Xnew)
+        Ks, Kdiag = self._cross_cov(Xnew)
+        mean = Ks @ self._alpha
+        if self.is_sparse:
+            v_zz = solve_triangular(self._Lzz, Ks.T, lower=True)
+            v_a = solve_triangular(self._La, Ks.T, lower=True)
+            var = Kdiag - np.sum(v_zz ** 2, axis=0) + self.noise_var * np.sum(v_a ** 2, axis=0)
+        elif len(self._X):
+            v = solve_triangular(self._L, Ks.T, lower=True)
+            var = Kdiag - np.sum(v ** 2, axis=0)
+        else:
+            var = Kdiag
+        return mean[:, None], np.maximum(var, 1e-300)[:, None]
+
+    def _raw_predict(self, Xnew: np.ndarray, full_cov: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        # used by the plotting utilities of safeopt
+        return self.predict_noiseless(Xnew, full_cov)
+
+    def predict(self, Xnew: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predicts noisy observations
+
+        :param Xnew: 2d array of test inputs
+        :return: mean and variance, both as arrays with one column
+        """
+        mean, var = self.predict_noiseless(Xnew)
+        return mean, var + self.noise_var
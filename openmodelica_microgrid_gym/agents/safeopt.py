@@ -1,6 +1,6 @@
-import importlib
 import logging
-from typing import Dict, Union, Any, List, Mapping
+import os
+from typing import Dict, Union, Any, List, Mapping, Sequence, Optional
 
 import GPy
 import matplotlib.pyplot as plt
@@ -10,6 +10,7 @@ from matplotlib.figure import Figure
 from safeopt import SafeOptSwarm
 
 from openmodelica_microgrid_gym.agents.episodic import EpisodicLearnerAgent
+from openmodelica_microgrid_gym.agents.incremental_gp import IncrementalGP
 from openmodelica_microgrid_gym.agents.staticctrl import StaticControlAgent
 from openmodelica_microgrid_gym.agents.util import MutableParams
 from openmodelica_microgrid_gym.aux_ctl import Controller
@@ -22,6 +23,7 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
                  gp_params: Dict[str, Any],
                  ctrls: List[Controller],
                  obs_template: Mapping[str, List[Union[List[str], np.ndarray]]], obs_varnames: List[str] = None,
+                 checkpoint: Optional[str] = None, resume: bool = False, warm_start: Optional[str] = None,
                  **kwargs):
         """
         Agent to execute safeopt algorithm (https://arxiv.org/abs/1509.01066) to control the environment by using
@@ -32,7 +34,13 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
         :param abort_reward: factor to multiply with the initial reward to give back an abort_reward-times higher
                negative reward in case of limit exceeded
         :param kernel: kernel for the Gaussian process unsing GPy
-        :param gp_params: kernel parameters like bounds and lengthscale
+        :param gp_params: kernel parameters like bounds and lengthscale.
+            The optional key "backend" selects the implementation of the Gaussian process:
+
+                - 'gpy' (default): GPy.models.GPRegression, refactorised on every new data point
+                - 'incremental': IncrementalGP, updating its factorisation incrementally.
+                  The optional key "max_active" caps the number of data points handled exactly,
+                  see IncrementalGP for details.
         :param ctrls: Controllers that are feed with the observations and exert actions on the environment
         :param obs_template:
             Template describing how the observation array should be transformed and passed to the internal controllers.
@@ -49,6 +57,13 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
         :param obs_varnames: list of variable names that match the values of the observations
          passed in the act function. Will be automatically set by the Runner class
          :param min_performance: Minial allowed performance to define parameters as safe
+        :param checkpoint: if provided, the tuning state is saved to this file after every update of the
+         Gaussian process (see save_checkpoint())
+        :param resume: if True and the checkpoint file exists, reset() restores the tuning state from it,
+         such that an interrupted campaign continues without repeating any episode
+        :param warm_start: checkpoint file of a previous campaign with a compatible parameter space.
+         On reset() its data and normalisation are used to set up the Gaussian process of the new campaign.
+         Ignored if the campaign is resumed.
         """
         self.params = MutableParams(
             list(mutable_params.values()) if isinstance(mutable_params, dict) else mutable_params)
@@ -58,6 +73,10 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
         self.prior_mean = gp_params['prior_mean']
         self.safe_threshold = gp_params['safe_threshold']
         self.explore_threshold = gp_params['explore_threshold']
+        self.gp_backend = gp_params.get('backend', 'gpy')
+        if self.gp_backend not in {'gpy', 'incremental'}:
+            raise ValueError(f'gp_params["backend"] must be one of "gpy" or "incremental" not "{self.gp_backend}"')
+        self.max_active = gp_params.get('max_active')
 
         self.abort_reward = abort_reward
         self.episode_return = None
@@ -72,6 +91,10 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
 
         self._iterations = 0
 
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.warm_start = warm_start
+
         super().__init__(ctrls, obs_template, obs_varnames, **kwargs)
         self.history.cols = ['J', 'Params']
 
@@ -79,19 +102,14 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
         """
         Resets the kernel, episodic reward and the optimizer
         """
-        # reinstantiate kernel
-
-        kernel_params = self.kernel.to_dict()
-        cls_name = kernel_params['class']
-        mod = importlib.import_module('.'.join(cls_name.split('.')[:-1]))
-        cls = getattr(mod, cls_name.split('.')[-1])
-        remaining_params = {k: v for k, v in kernel_params.items() if k not in {'class', 'useGPU'}}
-        self.kernel = cls(**remaining_params)
+        # reinstantiate kernel, a copy is not linked to the Gaussian process of the previous run
+        self.kernel = self.kernel.copy()
 
         self.params.reset()
         self.optimizer = None
         self.episode_return = 0
         self.initial_performance = 1
+        self.reference_performance = None
         self._performance = None
         self.last_best_performance = 0
         self.last_worst_performance = 0
@@ -99,7 +117,12 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
 
         self._iterations = 0
 
-        return super().reset()
+        super().reset()
+
+        if self.resume and self.checkpoint is not None and os.path.isfile(self.checkpoint):
+            self.load_checkpoint(self.checkpoint)
+        elif self.warm_start is not None:
+            self.load_checkpoint(self.warm_start, warm_start=True)
 
     def observe(self, reward, terminated):
         """
@@ -130,43 +153,229 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
         """
         Sets up the Gaussian process in the first episodes, updates the parameters in the following.
         """
+        self._add_observations(np.array([self.params[:]]), np.array([self.performance]))
+        self.params[:] = self.optimizer.optimize()
+        self._save_checkpoint()
+
+    def propose_batch(self, q: int, lie: str = 'mean') -> np.ndarray:
+        """
+        Proposes up to q parameter sets that can be evaluated concurrently.
+        The candidates are selected with the constant liar heuristic: after each call to the optimizer the proposed
+        point is temporarily added to the Gaussian process with a fantasised performance, such that the next call
+        prefers a different region of the safe set. The fantasised data points are removed afterwards and every
+        candidate is checked against the real posterior, hence only candidates classified as safe are returned.
+
+        Before the first observation, only the initial (safe) parameters are proposed,
+        as they are needed to set up the Gaussian process.
+
+        :param q: maximum number of candidates
+        :param lie: fantasised performance of the pending candidates
+
+            - 'mean': posterior mean at the candidate (kriging believer)
+            - 'min': worst performance observed so far
+        :return: 2d array of shape (n, len(params)) with 1 <= n <= q
+        """
+        if lie not in {'mean', 'min'}:
+            raise ValueError(f'lie must be one of "mean" or "min" not "{lie}"')
+
         if self.optimizer is None:
-            # First Iteration
-            self.last_best_performance = self.performance
-            self.last_worst_performance = self.performance
-
-            # Define Mean "Offset": Like BK: Assume Mean = Threshold (BK = 0, now = 20% below first (safe) J: means: if
-            # new Performance is 20 % lower than the inital we assume as unsafe)
-            mf = GPy.core.Mapping(len(self.bounds), 1)
-            mf.f = lambda x: self.prior_mean * self.performance
-            mf.update_gradients = lambda a, b: 0
-            mf.gradients_X = lambda a, b: 0
-
-            gp = GPy.models.GPRegression(np.array([self.params[:]]),  # noqa
-                                         np.array([[self.performance]]), self.kernel,
-                                         noise_var=self.noise_var)
-            self.optimizer = SafeOptSwarm(gp, self.safe_threshold * self.performance, bounds=self.bounds,
-                                          threshold=self.explore_threshold * self.performance)
+            return np.array([self.params[:]])
+
+        safe_set, greedy_point = self.optimizer.S.copy(), self.optimizer.greedy_point.copy()
+        candidates = []
+        try:
+            for i in range(q):
+                x = self.optimizer.optimize()
+                candidates.append(x)
+                if i == q - 1:
+                    # no need to fantasise the result of the last candidate
+                    break
+                if lie == 'mean':
+                    y = self.optimizer.gp.predict_noiseless(x[None, :])[0]
+                else:
+                    y = np.min(self.optimizer.y, keepdims=True)
+                self.optimizer.add_new_data_point(x, y)
+        finally:
+            for _ in range(len(candidates) - 1):
+                self.optimizer.remove_last_data_point()
+            # the fantasised data must not leak into the safe set approximation
+            self.optimizer.S, self.optimizer.greedy_point = safe_set, greedy_point
+
+        candidates = np.array(candidates)
+        _, safe = self.optimizer._compute_particle_fitness('safe_set', candidates)
+        # the first candidate was selected on real data only, so it is always kept
+        safe[0] = True
+        if not np.all(safe):
+            logger.info(f'{np.count_nonzero(~safe)} candidates of the batch are unsafe without fantasised data '
+                        'and will not be evaluated')
+        candidates = candidates[safe]
+
+        self.params[:] = candidates[0]
+        return candidates
+
+    def observe_batch(self, params: np.ndarray, returns: Sequence[float]):
+        """
+        Adds the results of several concurrently evaluated episodes to the Gaussian process in one update.
+        The returns are normalised like in observe(). If no observation was made so far,
+        the first return is used as the initial performance.
+
+        :param params: 2d array of evaluated parameters, e.g. as proposed by propose_batch()
+        :param returns: episode returns in the same order as params
+        """
+        params = np.atleast_2d(params)
+        if len(params) != len(returns):
+            raise ValueError(f'Got {len(returns)} returns for {len(params)} parameter sets')
+
+        if self.optimizer is None:
+            self.initial_performance = returns[0]
+
+        performances = []
+        for episode_return in returns:
+            self.episode_return = episode_return
+            self._performance = None
+            performances.append(self.performance)
+
+        self._add_observations(params, np.array(performances))
+        self.prepare_episode()
+        self._save_checkpoint()
+
+    def _add_observations(self, params: np.ndarray, performances: np.ndarray):
+        """
+        Adds evaluated parameters to the Gaussian process (setting it up if needed)
+        and updates the history as well as the best and worst episodes.
 
+        :param params: 2d array of evaluated parameters
+        :param performances: 1d array of the corresponding performances
+        """
+        if self.optimizer is None:
+            # First Iteration
+            self.last_best_performance = performances[0]
+            self.last_worst_performance = performances[0]
+            self._setup_optimizer(params, performances)
         else:
-            self.optimizer.add_new_data_point(self.params[:], self.performance)
+            # safeopt only supports adding single data points
+            for x, performance in zip(params, performances):
+                self.optimizer.add_new_data_point(x, performance)
 
-        if self.performance < self.safe_threshold:  # Due to nromalization tp 1 safe_threshold directly enough
-            self.unsafe = True
-        self.history.append([self.performance, self.params[:]])
-        self.params[:] = self.optimizer.optimize()
+        for x, performance in zip(params, performances):
+            self.performance = performance
+            if self.performance < self.safe_threshold:  # Due to nromalization tp 1 safe_threshold directly enough
+                self.unsafe = True
+            self.history.append([self.performance, x.tolist()])
+
+            if self.has_improved:
+                # if performance has improved store the current last index of the df
+                self.best_episode = self.history.df.shape[0] - 1
 
-        if self.has_improved:
-            # if performance has improved store the current last index of the df
-            self.best_episode = self.history.df.shape[0] - 1
+                self.last_best_performance = self.performance
 
-            self.last_best_performance = self.performance
+            if self.has_worsened:
+                # if performance has improved store the current last index of the df
+                self.worst_episode = self.history.df.shape[0] - 1
+
+                self.last_worst_performance = self.performance
+
+    def _setup_optimizer(self, params: np.ndarray, performances: np.ndarray, reference: Optional[float] = None):
+        """
+        Sets up the Gaussian process and the SafeOpt optimizer.
+        The performance of the initial parameters is used as reference for the safety and exploration thresholds.
+
+        :param params: 2d array of evaluated parameters
+        :param performances: 1d array of the corresponding performances
+        :param reference: reference performance, defaults to the first performance
+        """
+        self.reference_performance = performances[0] if reference is None else reference
+        # Define Mean "Offset": Like BK: Assume Mean = Threshold (BK = 0, now = 20% below first (safe) J: means: if
+        # new Performance is 20 % lower than the inital we assume as unsafe)
+        mf = GPy.core.Mapping(len(self.bounds), 1)
+        mf.f = lambda x: self.prior_mean * self.performance
+        mf.update_gradients = lambda a, b: 0
+        mf.gradients_X = lambda a, b: 0
+
+        if self.gp_backend == 'incremental':
+            gp = IncrementalGP(params, performances[:, None], self.kernel, noise_var=self.noise_var,
+                               max_active=self.max_active)
+        else:
+            gp = GPy.models.GPRegression(params,  # noqa
+                                         performances[:, None], self.kernel,
+                                         noise_var=self.noise_var)
+        self.optimizer = SafeOptSwarm(gp, self.safe_threshold * self.reference_performance, bounds=self.bounds,
+                                      threshold=self.explore_threshold * self.reference_performance)
 
-        if self.has_worsened:
-            # if performance has improved store the current last index of the df
-            self.worst_episode = self.history.df.shape[0] - 1
+    def save_checkpoint(self, path: str):
+        """
+        Saves the tuning state as compressed numpy archive.
+        It contains the data of the Gaussian process, the normalisation constants of the performance,
+        the best and worst episodes and the parameters to be evaluated next.
+        The file is replaced atomically, hence an interrupted write never destroys the previous checkpoint.
 
-            self.last_worst_performance = self.performance
+        :param path: file name of the checkpoint
+        """
+        if self.optimizer is None:
+            raise RuntimeError('There is no tuning state to save before the first update of the Gaussian process')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, X=self.optimizer.x, J=self.optimizer.y[:, 0], next_params=self.params[:],
+                                bounds=np.array(self.bounds, dtype=float),
+                                initial_performance=self.initial_performance,
+                                reference_performance=self.reference_performance,
+                                min_performance=self.min_performance,
+                                best_episode=self.best_episode, worst_episode=self.worst_episode,
+                                last_best_performance=self.last_best_performance,
+                                last_worst_performance=self.last_worst_performance,
+                                unsafe=self.unsafe)
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path: str, warm_start: bool = False):
+        """
+        Restores the tuning state saved by save_checkpoint().
+        Should be called after reset(), as resetting discards the state again.
+
+        :param path: file name of the checkpoint
+        :param warm_start: If False, the whole state is restored and the evaluated parameters are added to the history.
+            If True, only the data of the Gaussian process and the normalisation constants are used
+            to start a new campaign. Data points outside of the current bounds are discarded.
+            The parameters to evaluate next are selected by the optimizer.
+        """
+        with np.load(path) as data:
+            state = dict(data)
+        X, J = state['X'], state['J']
+        if X.shape[1] != len(self.bounds):
+            raise ValueError(f'The checkpoint "{path}" contains {X.shape[1]} parameters, '
+                             f'but the agent tunes {len(self.bounds)}')
+
+        self.initial_performance = float(state['initial_performance'])
+        self._min_performance = float(state['min_performance'])
+        # the first data point might be discarded by a warm start
+        reference = float(state['reference_performance']) if 'reference_performance' in state else J[0]
+
+        if warm_start:
+            bounds = np.array(self.bounds, dtype=float)
+            inside = np.all((X >= bounds[:, 0]) & (X <= bounds[:, 1]), axis=1)
+            if not np.any(inside):
+                raise ValueError(f'None of the parameters of checkpoint "{path}" are inside of the bounds')
+            X, J = X[inside], J[inside]
+            # the first evaluation of the new campaign is its best and worst episode so far
+            self.last_best_performance, self.last_worst_performance = -np.inf, np.inf
+            self._setup_optimizer(X, J, reference)
+            self.params[:] = self.optimizer.optimize()
+            logger.info(f'Warm started from {len(X)} data points of "{path}"')
+            return
+
+        self._setup_optimizer(X, J, reference)
+        for x, performance in zip(X, J):
+            self.history.append([performance, x.tolist()])
+        self.performance = J[-1]
+        self.best_episode, self.worst_episode = int(state['best_episode']), int(state['worst_episode'])
+        self.last_best_performance = float(state['last_best_performance'])
+        self.last_worst_performance = float(state['last_worst_performance'])
+        self.unsafe = bool(state['unsafe'])
+        self.params[:] = state['next_params']
+        logger.info(f'Resumed tuning from {len(X)} data points of "{path}"')
+
+    def _save_checkpoint(self):
+        if self.checkpoint is not None:
+            self.save_checkpoint(self.checkpoint)
 
     def render(self) -> Figure:
         """
@@ -225,6 +434,16 @@ class SafeOptAgent(StaticControlAgent, EpisodicLearnerAgent):
         """
         return self.performance <= self.last_worst_performance
 
+    @property
+    def return_threshold(self) -> Optional[float]:
+        """
+        Episode return corresponding to a performance of safe_threshold.
+        None during the first episode, as its return defines the normalisation of the performance.
+        """
+        if self.optimizer is None or self.initial_performance <= self.min_performance:
+            return None
+        return self.min_performance + self.safe_threshold * (self.initial_performance - self.min_performance)
+
     @property
     def performance(self):
 
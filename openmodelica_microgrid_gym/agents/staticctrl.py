@@ -46,7 +46,8 @@ class StaticControlAgent(Agent):
         :return:
         """
         if self._obs_template is None:
-            self._obs_template = {ctrl: ObsTempl(self.obs_varnames, tmpl)
+            # the controllers consume the parameters in prepare(), hence the buffers are reused
+            self._obs_template = {ctrl: ObsTempl(self.obs_varnames, tmpl, reuse_buffer=True)
                                   for ctrl, tmpl in self.obs_template_param.items()}
         return self._obs_template
 
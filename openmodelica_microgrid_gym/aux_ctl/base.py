@@ -4,7 +4,7 @@ import numpy as np
 
 from openmodelica_microgrid_gym.aux_ctl.params import PLLParams
 from openmodelica_microgrid_gym.aux_ctl.pi_controllers import PIController
-from openmodelica_microgrid_gym.util import abc_to_alpha_beta, cos_sin, normalise_abc, Fastqueue
+from openmodelica_microgrid_gym.util import abc_to_alpha_beta, cos_sin, normalise_abc, RunningSum
 
 
 class DDS:
@@ -59,7 +59,7 @@ class LimitLoadIntegral:
         """
         self.dt = dt
         # number of samples for a half freq
-        self._buffer = Fastqueue(int(1 / freq / 2 / dt))
+        self._buffer = RunningSum(int(1 / freq / 2 / dt))
         self.integral = 0
         self.lim_integral = len(self._buffer) * self.dt * i_lim ** 2
         if i_nom:
@@ -72,7 +72,8 @@ class LimitLoadIntegral:
         self._buffer.clear()
 
     def step(self, value):
-        self.integral += self.dt * (value ** 2 - self._buffer.shift(value) ** 2)
+        # the window has a single column
+        self.integral = self._buffer.add(self.dt * value ** 2)[0]
 
     def risk(self):
         return np.clip((self.integral - self.nom_integral) / (self.lim_integral - self.nom_integral), 0, 1)
@@ -1,4 +1,9 @@
-from .modelica import ModelicaEnv
-from .plot import PlotTmpl
+from openmodelica_microgrid_gym.util.lazy import lazy_attributes
 
-__all__ = ['ModelicaEnv', 'PlotTmpl']
+__all__ = ['ModelicaEnv', 'PlotTmpl', 'RenderWorker', 'FMUCache', 'NumpyModel']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {'ModelicaEnv': '.modelica',
+                                                  'PlotTmpl': '.plot',
+                                                  'RenderWorker': '.render',
+                                                  'FMUCache': '.fmu_cache',
+                                                  'NumpyModel': '.numpy_model'})
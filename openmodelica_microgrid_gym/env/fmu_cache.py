@@ -0,0 +1,108 @@
+"""
+Cache of extracted FMUs shared by all processes of a host.
+An FMU is extracted once into a folder named after the hash of its content.
+The folder is never modified afterwards (the files are read-only), hence any number of processes can load the model
+from it concurrently without unzipping the FMU again.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import tempfile
+from os.path import abspath, basename, expanduser, isdir, join, splitext
+from typing import Optional
+from zipfile import ZipFile
+
+logger = logging.getLogger(__name__)
+
+_file_hashes = {}  # type: Dict[Tuple[str, int, int], str]
+
+
+def file_hash(path: str) -> str:
+    """
+    SHA-256 hash of the content of a file.
+    The hash is cached for the lifetime of the process as long as size and modification time of the file do not change.
+
+    :param path: file
+    :return: hex digest
+    """
+    st = os.stat(path)
+    ident = (abspath(path), st.st_size, st.st_mtime_ns)
+    if ident not in _file_hashes:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        _file_hashes[ident] = h.hexdigest()
+    return _file_hashes[ident]
+
+
+class FMUCache:
+    def __init__(self, directory: Optional[str] = None, log_dir: Optional[str] = None, log_level: int = 3):
+        """
+        Content addressed cache of extracted FMUs, used by PyFMI_Wrapper.load() and the FMU merge tool
+
+        :param directory: cache folder, created if needed.
+         Defaults to the environment variable OMG_FMU_CACHE or ~/.cache/openmodelica_microgrid_gym/fmu.
+        :param log_dir: folder of the FMU log files. Defaults to the folder "logs" inside of the cache folder.
+         Every process writes its own log file.
+        :param log_level: log level of the FMU (0: nothing, 1: fatal, 2: error, 3: warning, 4: info, 5: verbose,
+         6: debug)
+        """
+        self.directory = directory or os.environ.get('OMG_FMU_CACHE') or expanduser(
+            join('~', '.cache', 'openmodelica_microgrid_gym', 'fmu'))
+        self.log_dir = log_dir or join(self.directory, 'logs')
+        self.log_level = log_level
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, fmu: str) -> str:
+        """
+        Folder the FMU is (or will be) extracted to
+        """
+        return join(self.directory, file_hash(fmu))
+
+    def extract(self, fmu: str) -> str:
+        """
+        Extracts the FMU if it is not contained in the cache yet
+
+        :param fmu: path of the FMU file
+        :return: folder containing the extracted FMU
+        """
+        target = self.path(fmu)
+        if isdir(target):
+            return target
+
+        logger.debug('Extracting "%s" to "%s"', fmu, target)
+        # extract to a private folder that is moved into place at once, such that concurrent processes
+        # never see a partially extracted FMU
+        tmp = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+        try:
+            with ZipFile(fmu) as z:
+                z.extractall(tmp)
+            for folder, _, files in os.walk(tmp):
+                for file in files:
+                    file = join(folder, file)
+                    os.chmod(file, stat.S_IMODE(os.stat(file).st_mode) & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+            os.rename(tmp, target)
+        except OSError:
+            if not isdir(target):
+                raise
+            # another process extracted the FMU in the meantime
+            logger.debug('"%s" was extracted concurrently', fmu)
+        finally:
+            if isdir(tmp):
+                shutil.rmtree(tmp, onerror=_remove_readonly)
+        return target
+
+    def log_file(self, fmu: str) -> str:
+        """
+        Log file of the FMU in this process
+        """
+        os.makedirs(self.log_dir, exist_ok=True)
+        return join(self.log_dir, f'{splitext(basename(fmu))[0]}_{os.getpid()}.txt')
+
+
+def _remove_readonly(func, path, _):
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
@@ -0,0 +1,174 @@
+"""
+Live visualisation of a running episode (viz_mode='step' of the ModelicaEnv).
+The figures and line artists are created once per episode. New samples are appended to the lines in batches with a
+limited frame rate and only the lines are redrawn (blitting), the axes are only redrawn when the visible time window
+moves on or the values leave the y limits.
+"""
+import re
+import time
+from typing import List, Optional
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+
+from openmodelica_microgrid_gym.env.plot import PlotTmpl
+from openmodelica_microgrid_gym.util import FullHistory
+
+
+class _LivePlot:
+    def __init__(self, fig: Figure, lines: list, col_idx: List[int], tmpl: Optional[PlotTmpl] = None):
+        self.fig = fig
+        self.ax = fig.gca()
+        self.lines = lines
+        self.col_idx = col_idx
+        self.tmpl = tmpl
+        self.background = None
+
+
+class LiveView:
+    def __init__(self, history: FullHistory, viz_col_regex: str, viz_col_tmpls: List[PlotTmpl],
+                 time_step_size: float, time_start: float = 0, window: int = 1000, max_fps: float = 10):
+        """
+        Plots the columns of a history while the episode is running
+
+        :param history: history of the environment, the new rows are read on every update
+        :param viz_col_regex: regex selecting the plotted columns, see ModelicaEnv
+        :param viz_col_tmpls: plot templates, see ModelicaEnv
+        :param time_step_size: time step size of the environment
+        :param time_start: time offset of the environment
+        :param window: number of most recent steps that are shown, which bounds the cost of a redraw
+        :param max_fps: maximum number of redraws per second
+        """
+        if not isinstance(history, FullHistory):
+            raise ValueError('The live visualisation reads the new rows of the episode and requires a FullHistory')
+        self.history = history
+        self.time_step_size = time_step_size
+        self.time_start = time_start
+        self.window = window
+        self.min_interval = 1 / max_fps
+        self._last_draw = -np.inf
+        self._n = 0
+
+        idx = {col: i for i, col in enumerate(history.cols)}
+        self.plots = []  # type: List[_LivePlot]
+        selected = []
+
+        def col_idx(cols):
+            for col in cols:
+                if idx[col] not in selected:
+                    selected.append(idx[col])
+            return [selected.index(idx[col]) for col in cols]
+
+        # plot cols by theirs structure filtered by the vis_cols param
+        for group in history.structured_cols():
+            if not isinstance(group, list):
+                group = [group]
+            group = [col for col in group if re.fullmatch(viz_col_regex, col)]
+            if group:
+                fig, ax = plt.subplots()
+                lines = [ax.plot([], [], label=col, animated=True)[0] for col in group]
+                ax.legend()
+                self.plots.append(_LivePlot(fig, lines, col_idx(group)))
+
+        for tmpl in viz_col_tmpls:
+            fig, ax = plt.subplots()
+            lines = []
+            for series, kwargs in tmpl:
+                kwargs = dict(kwargs)
+                # the format string of pd.DataFrame.plot
+                fmt = [kwargs.pop('style')] if 'style' in kwargs else []
+                lines.append(ax.plot([], [], *fmt, label=series, animated=True, **kwargs)[0])
+            self.plots.append(_LivePlot(fig, lines, col_idx(tmpl.vars), tmpl))
+
+        self._cols = selected
+        # the most recent steps are kept in a buffer of twice the window size, that is shifted when it is full
+        self._time = np.empty(2 * window)
+        self._values = np.empty((2 * window, len(selected)))
+        self._len = 0
+
+        for plot in self.plots:
+            plot.ax.set_xlim(time_start, time_start + window * time_step_size)
+        plt.show(block=False)
+
+    @property
+    def figures(self) -> List[Figure]:
+        return [plot.fig for plot in self.plots]
+
+    def _append(self):
+        rows = self.history.data[self._n:]
+        if not rows:
+            return
+        values = np.array(rows, dtype=float)[:, self._cols][-self.window:]
+        t = (np.arange(self._n, self._n + len(rows)) * self.time_step_size + self.time_start)[-self.window:]
+        self._n += len(rows)
+
+        n = len(values)
+        if self._len + n > len(self._time):
+            keep = self.window - n
+            self._time[:keep] = self._time[self._len - keep:self._len]
+            self._values[:keep] = self._values[self._len - keep:self._len]
+            self._len = keep
+        self._time[self._len:self._len + n] = t
+        self._values[self._len:self._len + n] = values
+        self._len += n
+
+    def _draw(self, plot: _LivePlot, t: np.ndarray, values: np.ndarray):
+        canvas = plot.fig.canvas
+        for line, i in zip(plot.lines, plot.col_idx):
+            line.set_data(t, values[:, i])
+
+        x_min, x_max = plot.ax.get_xlim()
+        y_min, y_max = plot.ax.get_ylim()
+        finite = values[:, plot.col_idx][np.isfinite(values[:, plot.col_idx])]
+        v_min, v_max = (finite.min(), finite.max()) if finite.size else (y_min, y_max)
+        rescale = v_min < y_min or v_max > y_max or (plot.background is None and finite.size)
+        if plot.background is None or t[-1] > x_max or rescale:
+            if t[-1] > x_max:
+                # the current time is at 3/4 of the visible window
+                span = self.window * self.time_step_size
+                plot.ax.set_xlim(t[-1] - .75 * span, t[-1] + .25 * span)
+            if rescale:
+                margin = .1 * (v_max - v_min) or 1
+                plot.ax.set_ylim(v_min - margin, v_max + margin)
+            # the animated lines are not part of the background
+            canvas.draw()
+            plot.background = canvas.copy_from_bbox(plot.fig.bbox)
+        else:
+            canvas.restore_region(plot.background)
+        for line in plot.lines:
+            plot.ax.draw_artist(line)
+        canvas.blit(plot.fig.bbox)
+        canvas.flush_events()
+
+    def update(self, force: bool = False):
+        """
+        Reads the new rows of the history and redraws the lines if the last redraw is long enough ago
+
+        :param force: redraw regardless of the frame rate
+        """
+        now = time.monotonic()
+        if not force and now - self._last_draw < self.min_interval:
+            return
+        self._last_draw = now
+        self._append()
+        if self._len == 0:
+            return
+        t, values = self._time[:self._len], self._values[:self._len]
+        for plot in self.plots:
+            self._draw(plot, t, values)
+
+    def close(self) -> List[Figure]:
+        """
+        Draws the remaining data, finishes the figures and executes the callbacks of the templates
+
+        :return: list of figures
+        """
+        self.update(force=True)
+        for plot in self.plots:
+            for line in plot.lines:
+                line.set_animated(False)
+            plot.fig.canvas.draw_idle()
+            if plot.tmpl is not None:
+                plot.tmpl.callback(plot.fig)
+        return self.figures
@@ -1,20 +1,22 @@
 import logging
-import re
 from fnmatch import translate
 from functools import partial
 from typing import Sequence, Callable, List, Union, Tuple, Optional, Mapping, Dict, Any
 
 import gym
-import matplotlib.pyplot as plt
 import numpy as np
 import scipy
 from matplotlib.figure import Figure
 from scipy import integrate
 
+from openmodelica_microgrid_gym.env.fmu_cache import FMUCache
+from openmodelica_microgrid_gym.env.live import LiveView
 from openmodelica_microgrid_gym.env.plot import PlotTmpl
-from openmodelica_microgrid_gym.env.pyfmi import PyFMI_Wrapper
+from openmodelica_microgrid_gym.env.numpy_model import NumpyModel
+from openmodelica_microgrid_gym.env.render import EpisodeSnapshot, RenderWorker
+from openmodelica_microgrid_gym.env.solvers import solvers
 from openmodelica_microgrid_gym.net.base import Network
-from openmodelica_microgrid_gym.util import FullHistory, EmptyHistory, Fastqueue, ObsTempl
+from openmodelica_microgrid_gym.util import FullHistory, EmptyHistory, DelayLine, ObsTempl
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +40,10 @@ class ModelicaEnv(gym.Env):
                  history: EmptyHistory = FullHistory(),
                  action_time_delay: int = 0,
                  on_episode_reset_callback: Optional[Callable[[], None]] = None,
-                 obs_output: List[str] = None):
+                 obs_output: List[str] = None, render_worker: Optional[RenderWorker] = None,
+                 viz_max_points: Optional[int] = None, viz_fps: float = 10, fmu_cache: Optional[FMUCache] = None,
+                 solver_substeps: int = 1, dense_samples: int = 0, dense_history: Optional[EmptyHistory] = None,
+                 handle_events: bool = False):
         """
         Initialize the Environment.
         The environment can only be used after reset() is called.
@@ -54,6 +59,8 @@ class ModelicaEnv(gym.Env):
         :param abort_reward: reward returned on episode abort
         :param log_level: logging granularity. see logging in stdlib
         :param solver_method: solver of the scipy.integrate.solve_ivp function
+            or one of the fixed-step solvers 'RK4', 'Trapezoidal' and 'ExpEuler' (see omg.env.solvers),
+            which are much cheaper for the short intervals of a single time step
         :param max_episode_steps: maximum number of episode steps.
             After one episodes there are max_episode_steps+1 states available (one additionally caused by the reset)
             and max_episode_steps actions, so the env.step() is executed max_episode_steps-times
@@ -74,11 +81,13 @@ class ModelicaEnv(gym.Env):
 
                 model_params={'lc1.capacitor1.v': lambda t: np.random.random()}
         :param net: Path to the network configuration file passed to the net.Network.load() function
-        :param model_path: Path to the FMU
+        :param model_path: Path to the FMU.
+            If it is a network configuration (.yaml), its section "model" is simulated by the NumpyModel instead,
+            which needs no FMU and no PyFMI (see omg.env.numpy_model).
         :param viz_mode: specifies how and if to render
 
             - 'episode': render after the episode is finished
-            - 'step': render after each time step
+            - 'step': live plots updated while the episode is running (requires a FullHistory)
             - None: disable visualization
         :param viz_cols: enables specific columns while plotting
 
@@ -95,22 +104,61 @@ class ModelicaEnv(gym.Env):
             to the env reset
         :param obs_output: List of strings of observations given to the agent. obs_output is compared to history.cols (
             variable names have to fit)
+        :param render_worker: if provided, the plots of the episodes are created and exported by this worker
+            in background processes and render() returns no figures. The callbacks of the templates must be picklable.
+        :param viz_max_points: if provided, the plotted series are decimated to about this number of points
+            (min/max per bucket, see omg.util.decimation), such that spikes are preserved
+            while rendering time and size of exported figures are bounded for long episodes.
+            In the 'step' viz_mode it is the number of most recent steps shown by the live plots (default 1000).
+        :param viz_fps: maximum number of redraws per second of the live plots in the 'step' viz_mode
+        :param fmu_cache: if provided, the FMU is extracted only once into this cache, which can be shared by many
+            processes, and its logging is configured by the cache
+        :param solver_substeps: number of integration steps per time step of the fixed-step solvers
+        :param dense_samples: if larger than 0, the outputs of the model are additionally recorded at this number of
+            equally spaced points inside of every time step (the last one is the end of the step) from the dense output
+            of the solver, e.g. to analyse ripples. The agent and the network still run once per time step.
+            The fixed-step solvers need a multiple of dense_samples substeps.
+        :param dense_history: history of the dense samples of the raw model outputs (self.model_output_names),
+            defaults to a FullHistory. The first row is the initial state after the reset,
+            hence the rows are spaced by net.ts / dense_samples.
+        :param handle_events: if True, the time and state events of the model (e.g. switched loads) are handled:
+            solve_ivp stops at the zero crossings of the event indicators and the next time event, the model updates
+            its discrete states and the integration is resumed. This allows larger steps of the solver between the
+            events. The fixed-step solvers handle the events at the end of the time step.
+            Disabled by default, because it changes the integration of existing FMU models with event indicators.
         """
         if viz_mode not in self.viz_modes:
             raise ValueError(f'Please select one of the following viz_modes: {self.viz_modes}')
 
         self.viz_mode = viz_mode
+        self.viz_max_points = viz_max_points
+        self.viz_fps = viz_fps
+        self._live_view = None  # type: Optional[LiveView]
         self._register_render = False
+        self.render_worker = render_worker
         logger.setLevel(log_level)
         self.solver_method = solver_method
+        self.solver = solvers[solver_method](solver_substeps) if solver_method in solvers else None
+        self.dense_samples = dense_samples
+        self.handle_events = handle_events
+        self._indicator_cache = None  # type: Optional[Tuple[float, np.ndarray, np.ndarray]]
+        if dense_samples and self.solver is not None and solver_substeps % dense_samples:
+            raise ValueError(f'dense_samples={dense_samples} needs a multiple of {dense_samples} solver_substeps')
 
         # load model from fmu
-        self.model = PyFMI_Wrapper.load(model_path)
+        self.model_path = model_path
+        if model_path.endswith(('.yaml', '.yml')):
+            self.model = NumpyModel.load(model_path)
+        else:
+            # PyFMI is only needed for FMUs
+            from openmodelica_microgrid_gym.env.pyfmi import PyFMI_Wrapper
+            self.model = PyFMI_Wrapper.load(model_path, fmu_cache)
 
         # if you reward policy is different from just reward/penalty - implement custom step method
         self.reward = reward_fun
         self.abort_reward = abort_reward
         self._failed = False
+        self._solver_failed = False
 
         # Parameters required by this implementation
         self.max_episode_steps = max_episode_steps
@@ -145,6 +193,8 @@ class ModelicaEnv(gym.Env):
         self.model_input_names = self.net.in_vars()
         # variable names are flattened to a list if they have specified in the nested dict manner)
         self.model_output_names = self.net.out_vars(False, True)
+        self.dense_history = FullHistory() if dense_history is None else dense_history
+        self.dense_history.cols = self.model_output_names
 
         self.viz_col_tmpls = []
         if viz_cols is None:
@@ -182,7 +232,7 @@ class ModelicaEnv(gym.Env):
         if self.action_time_delay == 0:
             self.delay_buffer = None
         else:
-            self.delay_buffer = Fastqueue(self.action_time_delay, self.action_space.shape[0])
+            self.delay_buffer = DelayLine(self.action_time_delay, self.action_space.shape[0])
 
         if on_episode_reset_callback is None:
             self.on_episode_reset_callback = lambda: None
@@ -201,10 +251,12 @@ class ModelicaEnv(gym.Env):
         This function will be called by the scipy.integrate.solve_ivp solver,
         therefore we have to obey the expected signature.
 
-        :param t: time (ignored)
-        :param x: state (ignored)
+        :param t: time
+        :param x: 1d float array of continuous states
         :return: the Jacobian matrix
         """
+        self.model.time = t
+        self.model.states = x.copy(order='C')
         return self.model.jacc()
 
     def _get_deriv(self, t: float, x: np.ndarray) -> np.ndarray:
@@ -232,17 +284,115 @@ class ModelicaEnv(gym.Env):
         logger.debug(f'Simulation started for time interval {self.sim_time_interval[0]}-{self.sim_time_interval[1]}')
 
         # Advance
-        x_0 = self.model.states
-
-        # Get the output from a step of the solver
-        sol_out = scipy.integrate.solve_ivp(
-            self._get_deriv, self.sim_time_interval, x_0, method=self.solver_method, jac=self._calc_jac)
-        # get the last solution of the solver
-        self.model.states = sol_out.y[:, -1]  # noqa
+        t_0, t_end = self.sim_time_interval
+        x = self.model.states
+        t_dense = np.linspace(t_0, t_end, self.dense_samples + 1)[1:] if self.dense_samples else None
+        # samples after a failed integration are not filled by the solver
+        dense = np.full((self.dense_samples, len(x)), np.nan) if self.dense_samples else None
+        handle_events = self.handle_events and self.model.n_event_indicators > 0
+        self._solver_failed = False
+
+        if self.solver is not None:
+            indicators = self.model.event_indicators if handle_events else None
+            x = self.solver.integrate(self._get_deriv, self._calc_jac, self.sim_time_interval, x, dense)
+            if handle_events:
+                # the fixed-step solvers do not locate the events, they are handled at the end of the step
+                next_event = self.model.next_time_event
+                self.model.time, self.model.states = t_end, x
+                if np.any(np.sign(self.model.event_indicators) != np.sign(indicators)) or \
+                        (next_event is not None and next_event <= t_end):
+                    x = self._handle_event(t_end, x)
+        else:
+            t = t_0
+            while True:
+                # integrate until the next time event, state event or the end of the step
+                t_stop = t_end
+                next_event = self.model.next_time_event if self.handle_events else None
+                if next_event is not None and t < next_event < t_end:
+                    t_stop = next_event
+                sol_out = scipy.integrate.solve_ivp(
+                    self._get_deriv, (t, t_stop), x, method=self.solver_method, jac=self._calc_jac,
+                    events=self._event_functions(t, x) if handle_events else None,
+                    dense_output=self.dense_samples > 0)
+                if self.dense_samples:
+                    # evaluate the dense output of the solver between the events
+                    segment = (t_dense > t) & (t_dense <= sol_out.t[-1])
+                    # the solution of scipy<=1.10 can not be evaluated at an empty time array
+                    if segment.any():
+                        dense[segment] = sol_out.sol(t_dense[segment]).T
+                # get the last solution of the solver, the state at the event if the integration was terminated
+                t, x = sol_out.t[-1], sol_out.y[:, -1]  # noqa
+                if sol_out.status == -1:
+                    logger.error('Integration failed at t=%s: %s', t, sol_out.message)
+                    self._solver_failed = True
+                    break
+                if sol_out.status != 1 and t_stop == t_end:
+                    break
+                x = self._handle_event(t, x)
+                if t >= t_end:
+                    break
+
+        if self.dense_samples:
+            # the outputs are calculated by the model from the states
+            for t, x_t in zip(t_dense[:-1], dense[:-1]):
+                if np.isnan(x_t).any():
+                    self.dense_history.append(np.full(len(self.model_output_names), np.nan))
+                    continue
+                self.model.time = t
+                self.model.states = x_t
+                self.dense_history.append(self.model.obs)
+            self.model.time = t_dense[-1]
+        self.model.states = x
+        if handle_events and self.model.completed_step():
+            self._handle_event(t_end, x)
 
         obs = self.model.obs
+        if self.dense_samples:
+            self.dense_history.append(obs)
         return obs
 
+    def _handle_event(self, t: float, x: np.ndarray) -> np.ndarray:
+        """
+        Lets the model handle an event at the given time and states
+
+        :return: states after the event, they might be reinitialized by the model
+        """
+        logger.debug('Handling event at t=%s', t)
+        self.model.time = t
+        self.model.states = x
+        self.model.handle_event()
+        return self.model.states
+
+    def _event_functions(self, t: float, x: np.ndarray) -> List[Callable[[float, np.ndarray], float]]:
+        """
+        Event functions of the solve_ivp function, one per event indicator of the model.
+        The integration is terminated at the first zero crossing.
+        Indicators that are zero at the start (e.g. directly after their event) are ignored in this interval.
+
+        :param t: start time
+        :param x: states at the start time
+        """
+        self._indicator_cache = None
+        indicators = self._event_indicators(t, x)
+        functions = []
+        for i in np.flatnonzero(indicators):
+            function = partial(self._event_indicator, i=i)
+            function.terminal = True
+            functions.append(function)
+        return functions
+
+    def _event_indicators(self, t: float, x: np.ndarray) -> np.ndarray:
+        # all event functions are evaluated with the same time and states, the model is only evaluated once
+        if self._indicator_cache is None or self._indicator_cache[0] != t or \
+                not np.array_equal(self._indicator_cache[1], x):
+            self.model.time = t
+            self.model.states = x.copy(order='C')
+            self._indicator_cache = t, x.copy(), self.model.event_indicators
+        return self._indicator_cache[2]
+
+    def _event_indicator(self, t: float, x: np.ndarray, i: int) -> float:
+        return self._event_indicators(t, x)[i]
+
     @property
     def is_done(self) -> bool:
         """
@@ -256,6 +406,35 @@ class ModelicaEnv(gym.Env):
         logger.debug(f't: {self.sim_time_interval[1]}, ')
         return abs(self.sim_time_interval[1]) > self.time_end
 
+    @property
+    def failed(self) -> bool:
+        """
+        Whether the current episode was aborted, because the risk level was exceeded, the reward was invalid or the
+        integration failed
+
+        :return: True if the episode was aborted
+        """
+        return self._failed
+
+    def seed(self, seed: Optional[int] = None) -> List[Optional[int]]:
+        """
+        OpenAI Gym API. Seeds numpys global random generator and the random processes used by the model parameters
+        (see find_rand_processes()). Every process gets its own seed derived from the passed one,
+        hence the same seed yields the same realisations of the processes, independent of other parameters.
+        The seed is effective for the next episode, it should be called before reset().
+
+        :param seed: seed of the random generators
+        :return: list containing the seed
+        """
+        # stochastic is only imported if it is used
+        from openmodelica_microgrid_gym.util.randproc import find_rand_processes
+
+        np.random.seed(seed)
+        processes = find_rand_processes(*self.model_parameters.values())
+        for process, process_seed in zip(processes, np.random.SeedSequence(seed).spawn(len(processes))):
+            process.reset(seed=process_seed)
+        return [seed]
+
     def reset(self) -> np.ndarray:
         """
         OpenAI Gym API. Restarts environment and sets it ready for experiments.
@@ -280,10 +459,14 @@ class ModelicaEnv(gym.Env):
         self.history.reset()
         self._failed = False
         self._register_render = False
+        self._live_view = None
         self.used_action = np.zeros(self.action_space.shape)
         if self.delay_buffer is not None:
             self.delay_buffer.clear()
         outputs = self._create_state(is_init=True)
+        self.dense_history.reset()
+        if self.dense_samples:
+            self.dense_history.append(self._state)
         return self._out_obs_tmpl.fill(outputs)[0]
 
     def step(self, action: Sequence) -> Tuple[np.ndarray, float, bool, Mapping]:
@@ -356,7 +539,8 @@ class ModelicaEnv(gym.Env):
             logger.debug("Experiment step done, experiment done.")
 
         reward = self.reward(self.history.cols, outputs, risk)
-        self._failed = risk >= 1 or reward is None or np.isnan(reward) or (np.isinf(reward) and reward < 0)
+        self._failed = self._solver_failed or risk >= 1 or reward is None or np.isnan(reward) or (
+                np.isinf(reward) and reward < 0)
 
         if self._failed:
             reward = self.abort_reward
@@ -385,53 +569,38 @@ class ModelicaEnv(gym.Env):
     def render(self, mode: str = 'human', close: bool = False) -> List[Figure]:
         """
         OpenAI Gym API. Determines how current environment state should be rendered.
-        Does nothing at the moment
+        In the 'step' viz_mode the live plots are updated, in the 'episode' viz_mode the plots are created when the
+        rendering is closed.
 
         :param mode: (ignored) rendering mode. Read more in Gym docs.
         :param close: flag if rendering procedure should be finished and resources cleaned. Used, when environment is closed.
+        :return: list of finished figures (only when closing)
         """
         if self.viz_mode is None:
             return []
         elif self.viz_mode == 'step':
+            if self._live_view is None:
+                if close:
+                    return []
+                self._live_view = LiveView(self.history, self.viz_col_regex, self.viz_col_tmpls, self.time_step_size,
+                                           self.time_start, self.viz_max_points or 1000, self.viz_fps)
             if close:
-                # TODO close plot
-                pass
-            pass
+                figs = self._live_view.close()
+                self._live_view = None
+                return figs
+            self._live_view.update()
+            return []
 
         elif self.viz_mode == 'episode':
             # TODO update plot
             if not close:
                 self._register_render = True
             elif self._register_render:
-                figs = []
-
-                # plot cols by theirs structure filtered by the vis_cols param
-                for cols in self.history.structured_cols():
-                    if not isinstance(cols, list):
-                        cols = [cols]
-                    cols = [col for col in cols if re.fullmatch(self.viz_col_regex, col)]
-                    if not cols:
-                        continue
-                    df = self.history.df[cols].copy()
-                    df.index = self.history.df.index * self.time_step_size + self.time_start
-
-                    fig, ax = plt.subplots()
-                    df.plot(legend=True, figure=fig, ax=ax)
-                    plt.show()
-                    figs.append(fig)
-
-                # plot all templates
-                for tmpl in self.viz_col_tmpls:
-                    fig, ax = plt.subplots()
-
-                    for series, kwargs in tmpl:
-                        ser = self.history.df[series].copy()
-                        ser.index = self.history.df.index * self.time_step_size + self.time_start
-                        ser.plot(figure=fig, ax=ax, **kwargs)
-                    tmpl.callback(fig)
-                    figs.append(fig)
-
-                return figs
+                snapshot = EpisodeSnapshot(self.history, self.viz_col_regex, self.viz_col_tmpls,
+                                           self.time_step_size, self.time_start, self.viz_max_points)
+                if self.render_worker is not None and self.render_worker.submit(snapshot):
+                    return []
+                return snapshot.plot()
 
     def close(self) -> Tuple[bool, Any]:
         """
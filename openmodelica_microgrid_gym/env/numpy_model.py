@@ -0,0 +1,302 @@
+"""
+Model backend simulating the standard grid topologies (inverters, LC/LCL filters and R/RL loads) with NumPy.
+The circuit is declared in the section "model" of the network configuration, for example::
+
+    model:
+      inverter1:
+        cls: Inverter
+        u: [i1p1, i1p2, i1p3]
+        v_DC: 1000
+        pins: [bus1]
+      lc1:
+        cls: LC
+        L: 0.002
+        C: 0.00002
+        pins: [bus1, bus2]
+      rl1:
+        cls: RL
+        R: 20
+        L: 0.001
+        pins: [bus2]
+
+Elements are connected by the names of their pins. Parameters are scalars or lists with one value per phase.
+The variables are named like the ones of the Modelica models in omg_grid (e.g. "lc1.capacitor1.v",
+"rl1.resistor1.R"), hence the configuration and the model parameters of the ModelicaEnv can be used unchanged.
+
+All phases are connected to a common ground, the circuit therefore is a linear system
+
+    dx/dt = A x + B u
+
+whose states are the voltages of the capacitor nodes and the currents of the inductors.
+"""
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+PHASES = 3
+
+_Node = Tuple[str, int]
+
+
+class _Circuit:
+    def __init__(self):
+        self.sources = []  # type: List[Tuple[_Node, str, str]]
+        """(node, input, parameter of the DC voltage)"""
+        self.capacitors = []  # type: List[Tuple[_Node, str, str]]
+        """(node, voltage variable, parameter of the capacity)"""
+        self.inductors = []  # type: List[Tuple[_Node, Optional[_Node], str, str, Optional[str]]]
+        """(node p, node n or None for ground, current variable, parameter of the inductance, of the resistance)"""
+        self.resistors = []  # type: List[Tuple[_Node, str]]
+        """(node, parameter of the resistance) of resistors to ground"""
+        self.params = {}  # type: Dict[str, float]
+
+
+def _per_phase(value, n: int = PHASES) -> List[float]:
+    if np.isscalar(value):
+        return [float(value)] * n
+    if len(value) != n:
+        raise ValueError(f'{n} values are needed, one per phase, got {value}')
+    return [float(v) for v in value]
+
+
+def _pins(id: str, pins, n: int) -> List[str]:
+    if isinstance(pins, str):
+        pins = [pins]
+    if pins is None or len(pins) != n:
+        raise ValueError(f'{id} needs {n} pin(s), got {pins}')
+    return pins
+
+
+def _inverter(c: _Circuit, id: str, pins, u: Sequence[str], v_DC: float = 1000):
+    """voltage source per phase, the voltage of the pin is v_DC * u"""
+    pin, = _pins(id, pins, 1)
+    if len(u) != PHASES:
+        raise ValueError(f'{id} needs {PHASES} inputs, got {u}')
+    c.params[f'{id}.v_DC'] = float(v_DC)
+    for k in range(PHASES):
+        c.sources.append(((pin, k), u[k], f'{id}.v_DC'))
+
+
+def _lc(c: _Circuit, id: str, pins, L=0.001, C=0.00001):
+    """series inductor and capacitor to ground at the output"""
+    p, n = _pins(id, pins, 2)
+    for k, (l_, c_) in enumerate(zip(_per_phase(L), _per_phase(C))):
+        c.params[f'{id}.inductor{k + 1}.L'] = l_
+        c.params[f'{id}.capacitor{k + 1}.C'] = c_
+        c.inductors.append(((p, k), (n, k), f'{id}.inductor{k + 1}.i', f'{id}.inductor{k + 1}.L', None))
+        c.capacitors.append(((n, k), f'{id}.capacitor{k + 1}.v', f'{id}.capacitor{k + 1}.C'))
+
+
+def _lcl(c: _Circuit, id: str, pins, L=0.001, C=0.00001):
+    """LC filter followed by a second series inductor, L has one or six values (inductors 1-3 on the input side)"""
+    p, n = _pins(id, pins, 2)
+    L = _per_phase(L, 2 * PHASES)
+    for k, c_ in enumerate(_per_phase(C)):
+        mid = (f'{id}.{k}', k)
+        c.params[f'{id}.capacitor{k + 1}.C'] = c_
+        c.capacitors.append((mid, f'{id}.capacitor{k + 1}.v', f'{id}.capacitor{k + 1}.C'))
+        for j, (a, b) in [(k, ((p, k), mid)), (k + PHASES, (mid, (n, k)))]:
+            c.params[f'{id}.inductor{j + 1}.L'] = L[j]
+            c.inductors.append((a, b, f'{id}.inductor{j + 1}.i', f'{id}.inductor{j + 1}.L', None))
+
+
+def _rl(c: _Circuit, id: str, pins, R=20, L=0.001):
+    """series resistor and inductor to ground"""
+    pin, = _pins(id, pins, 1)
+    for k, (r_, l_) in enumerate(zip(_per_phase(R), _per_phase(L))):
+        c.params[f'{id}.resistor{k + 1}.R'] = r_
+        c.params[f'{id}.inductor{k + 1}.L'] = l_
+        c.inductors.append(((pin, k), None, f'{id}.inductor{k + 1}.i', f'{id}.inductor{k + 1}.L',
+                            f'{id}.resistor{k + 1}.R'))
+
+
+def _r(c: _Circuit, id: str, pins, R=20):
+    """resistor to ground"""
+    pin, = _pins(id, pins, 1)
+    for k, r_ in enumerate(_per_phase(R)):
+        c.params[f'{id}.resistor{k + 1}.R'] = r_
+        c.resistors.append(((pin, k), f'{id}.resistor{k + 1}.R'))
+
+
+elements = {'Inverter': _inverter, 'LC': _lc, 'LCL': _lcl, 'RL': _rl, 'R': _r}  # type: Dict[str, Callable]
+"""Element classes that can be used in the model configuration"""
+
+
+class NumpyModel:
+    # the linear circuit has no events
+    n_event_indicators = 0
+    next_time_event = None
+
+    def __init__(self, config: Dict[str, dict]):
+        """
+        Linear circuit model implementing the interface of the PyFMI_Wrapper
+
+        :param config: elements of the circuit, see the module documentation.
+        """
+        c = _Circuit()
+        for id, element in config.items():
+            element = dict(element)
+            cls = element.pop('cls')
+            if cls not in elements:
+                raise ValueError(f'{id}: unknown element class "{cls}", available are {list(elements)}')
+            try:
+                elements[cls](c, id, **element)
+            except TypeError as e:
+                raise ValueError(f'{id}: {e!s}')
+
+        source_nodes = [node for node, _, _ in c.sources]
+        cap_nodes = list(dict.fromkeys(node for node, _, _ in c.capacitors))
+        shorted = set(source_nodes) & set(cap_nodes)
+        if shorted:
+            raise ValueError(f'the voltage sources at the pins {sorted(shorted)} are shorted by capacitors')
+        for var, nodes in [(var, (p, n)) for p, n, var, _, _ in c.inductors] + \
+                          [(param, (node,)) for node, param in c.resistors]:
+            for node in nodes:
+                if node is not None and node not in cap_nodes and node not in source_nodes:
+                    raise ValueError(f'{var}: the pin {node[0]} needs a capacitor or a voltage source, '
+                                     'inductors in series are not supported')
+
+        self.input_names = [u for _, u, _ in c.sources]
+        self.param_names = list(c.params)
+        self._defaults = np.array([c.params[name] for name in self.param_names])
+        self._param_values = self._defaults.copy()
+        param_idx = {name: i for i, name in enumerate(self.param_names)}
+
+        n_c, n_b = len(cap_nodes), len(c.inductors)
+        node_idx = {node: i for i, node in enumerate(cap_nodes)}
+        source_idx = {node: i for i, node in enumerate(source_nodes)}
+        # incidence matrices of the capacitor and source nodes, the currents flow from p to n
+        self._e_c = np.zeros((n_c, n_b))
+        self._e_s = np.zeros((len(source_nodes), n_b))
+        for b, (p, n, _, _, _) in enumerate(c.inductors):
+            for node, sign in ((p, 1), (n, -1)):
+                if node in node_idx:
+                    self._e_c[node_idx[node], b] = sign
+                elif node in source_idx:
+                    self._e_s[source_idx[node], b] = sign
+
+        # indices of the parameters of the elements, the values are summed up per node if needed
+        self._cap_node, self._cap_param = np.array([[node_idx[node], param_idx[param]]
+                                                    for node, _, param in c.capacitors], dtype=int).reshape(-1, 2).T
+        self._res_node, self._res_param = np.array([[node_idx[node], param_idx[param]]
+                                                    for node, param in c.resistors if node in node_idx],
+                                                   dtype=int).reshape(-1, 2).T
+        self._ind_l = np.array([param_idx[l_] for _, _, _, l_, _ in c.inductors], dtype=int)
+        ind_r = [(b, param_idx[r_]) for b, (_, _, _, _, r_) in enumerate(c.inductors) if r_ is not None]
+        self._ind_r_branch, self._ind_r_param = np.array(ind_r, dtype=int).reshape(-1, 2).T
+        self._source_vdc = np.array([param_idx[param] for _, _, param in c.sources], dtype=int)
+
+        self.state_names = [next(var for node_, var, _ in c.capacitors if node_ == node) for node in cap_nodes] + \
+                           [var for _, _, var, _, _ in c.inductors]
+        # all names of the variables and parameters are mapped to an index of the vector [x, params]
+        self._var_idx = {var: node_idx[node] for node, var, _ in c.capacitors}
+        self._var_idx.update({var: n_c + b for b, (_, _, var, _, _) in enumerate(c.inductors)})
+        self._var_idx.update({name: n_c + n_b + i for i, name in enumerate(self.param_names)})
+        self._input_idx = {u: i for i, u in enumerate(self.input_names)}
+
+        self.x = np.zeros(n_c + n_b)
+        self.u = np.zeros(len(self.input_names))
+        self.time = 0
+        self.model_output_idx = np.empty(0, dtype=int)
+        self._update_matrices()
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyModel':
+        """
+        Loads the model from the section "model" of a network configuration file
+
+        :param path: YAML file, see Network.load()
+        """
+        with open(path) as f:
+            data = yaml.safe_load(f)
+        if 'model' not in data:
+            raise ValueError(f'{path} does not declare a "model" section')
+        return cls(data['model'])
+
+    def _update_matrices(self):
+        n_c = len(self._e_c)
+        p = self._param_values
+        cap = np.bincount(self._cap_node, p[self._cap_param], minlength=n_c)
+        cond = np.bincount(self._res_node, 1 / p[self._res_param], minlength=n_c)
+        ind = p[self._ind_l]
+        res = np.zeros(len(ind))
+        res[self._ind_r_branch] = p[self._ind_r_param]
+
+        # C dv/dt = -E_c i - G v
+        # L di/dt = E_c^T v + E_s^T v_s - R i,  v_s = v_DC * u
+        self._a = np.block([[-np.diag(cond / cap), -self._e_c / cap[:, None]],
+                            [self._e_c.T / ind[:, None], -np.diag(res / ind)]])
+        self._b = np.vstack([np.zeros((n_c, len(self.u))), self._e_s.T * p[self._source_vdc] / ind[:, None]])
+
+    def setup(self, time_start, output_names, model_params: Dict[str, Callable]):
+        self.time = time_start
+        self.x = np.zeros(len(self.x))
+        self.u = np.zeros(len(self.u))
+        self._param_values = self._defaults.copy()
+        self._update_matrices()
+        if model_params:
+            # set to -1 for initial evaluation of params. See documentation of ModelicaEnv.__init__().
+            self.set_params(**{var: f(-1) for var, f in model_params.items()})
+
+        try:
+            self.model_output_idx = np.array([self._var_idx[k] for k in output_names], dtype=int)
+        except KeyError as e:
+            raise KeyError(f'the output variable {e!s} is not provided by the model')
+
+    @property
+    def obs(self):
+        return np.concatenate([self.x, self._param_values])[self.model_output_idx]
+
+    @property
+    def states(self):
+        return self.x.copy()
+
+    @states.setter
+    def states(self, val):
+        self.x = np.array(val, dtype=float)
+
+    @property
+    def deriv(self):
+        return self._a @ self.x + self._b @ self.u
+
+    def jacc(self):
+        return self._a.copy()
+
+    @property
+    def event_indicators(self) -> np.ndarray:
+        return np.empty(0)
+
+    def handle_event(self):
+        pass
+
+    def completed_step(self) -> bool:
+        return False
+
+    def set(self, **kwargs):
+        params = {}
+        for var, val in kwargs.items():
+            if var in self._input_idx:
+                self.u[self._input_idx[var]] = val
+            else:
+                params[var] = val
+        if params:
+            self.set_params(**params)
+
+    def set_params(self, **kwargs):
+        n_x = len(self.x)
+        changed = False
+        for var, val in kwargs.items():
+            if val is None:
+                continue
+            if var not in self._var_idx:
+                raise KeyError(f'the model has no variable "{var}"')
+            i = self._var_idx[var]
+            if i < n_x:
+                # initial values of the states
+                self.x[i] = val
+            elif self._param_values[i - n_x] != val:
+                self._param_values[i - n_x] = val
+                changed = True
+        if changed:
+            self._update_matrices()
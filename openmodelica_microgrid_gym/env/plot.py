@@ -5,11 +5,12 @@ import matplotlib.pyplot as plt
 from more_itertools import collapse
 
 from openmodelica_microgrid_gym.util import flatten_together
+from openmodelica_microgrid_gym.util.decimation import decimation_methods
 
 
 class PlotTmpl:
     def __init__(self, variables: List[Union[List, str]], callback: Optional[Callable[[Figure], None]] = None,
-                 **kwargs):
+                 max_points: Optional[int] = None, decimation: str = 'minmax', **kwargs):
         """
         Provides an iterable of variables and plot parameters like ('induction1', {'color':'green', 'style': '--'}).
         It contains logic to automatically match up the variables and provided kwargs to allow for a simple syntax.
@@ -21,12 +22,20 @@ class PlotTmpl:
          Each string represents a variable of the FMU or a measurement that should be plotted by the environment.
         :param callback: if provided, it is executed after the plot is finished.
          Will get the generated figure as parameter to allow further modifications.
+        :param max_points: if provided, long series are decimated to about this number of points per variable,
+         which bounds the rendering time and the size of exported figures.
+         Defaults to viz_max_points of the environment.
+        :param decimation: decimation method, 'minmax' or 'lttb' (see omg.util.decimation)
         :param kwargs: those arguments are merged (see omg.util.flatten_together) with the variables
          and than provided to the pd.DataFrame.plot(·) function
         """
 
         self.vars = list(collapse(variables))
         self._callback = callback
+        if decimation not in decimation_methods:
+            raise ValueError(f'Please select one of the following decimation methods: {decimation_methods}')
+        self.max_points = max_points
+        self.decimation = decimation
 
         # set colors None if not provided
         colorkey = ({'c', 'color'} & set(kwargs.keys()))
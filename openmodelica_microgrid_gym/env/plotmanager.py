@@ -21,29 +21,46 @@ class PlotManager:
         self.save_results = save_results
         self.save_folder = save_folder
         self.show_plots = show_plots
+        self._prefix = None
+
+    @property
+    def prefix(self) -> str:
+        """
+        Prefix of the file names containing the number of the episode and the performance of the agent
+        """
+        if self.agent is None:
+            return self._prefix
+        return f'{self.agent.history.df.shape[0]}_J_{self.agent.performance}'
+
+    def __getstate__(self):
+        # a render worker only needs the file name prefix at the time the episode was submitted, not the whole agent
+        state = self.__dict__.copy()
+        state['agent'] = None
+        state['_prefix'] = self.prefix
+        return state
 
     def xylables_v_abc(self, fig):
         self.update_axes(fig,
                          ylabel='$v_{\mathrm{abc}}\,/\,\mathrm{V}$',
-                         filename=f'{self.agent.history.df.shape[0]}_J_{self.agent.performance}_v_abc0',
+                         filename=f'{self.prefix}_v_abc0',
                          legend=dict(handle_slice=slice(None, None, 3), labels=('Measurement', 'Setpoint'), loc='best'))
 
     def xylables_v_dq0(self, fig):
         self.update_axes(fig,
                          ylabel='$v_{\mathrm{dq0}}\,/\,\mathrm{V}$',
-                         filename=f'{self.agent.history.df.shape[0]}_J_{self.agent.performance}_v_dq0',
+                         filename=f'{self.prefix}_v_dq0',
                          legend=dict(handle_slice=slice(None, None, 3), labels=('Measurement', 'Setpoint'), loc='best'))
 
     def xylables_i_abc(self, fig):
         self.update_axes(fig,
                          ylabel='$i_{\mathrm{abc}}\,/\,\mathrm{A}$',
-                         filename=f'{self.agent.history.df.shape[0]}_J_{self.agent.performance}_i_abc',
+                         filename=f'{self.prefix}_i_abc',
                          legend=dict(handle_slice=slice(None, None, 3), labels=('Measurement', 'Setpoint'), loc='best'))
 
     def xylables_i_dq0(self, fig):
         self.update_axes(fig,
                          ylabel='$i_{\mathrm{dq0}}\,/\,\mathrm{A}$',
-                         filename=f'{self.agent.history.df.shape[0]}_J_{self.agent.performance}_i_dq0',
+                         filename=f'{self.prefix}_i_dq0',
                          legend=dict(handle_slice=slice(None, None, 3), labels=('Measurement', 'Setpoint'), loc='best'))
 
     def update_axes(self, fig, title=None, xlabel=r'$t\,/\,\mathrm{s}$', ylabel=None, legend=None, filename=None):
@@ -1,11 +1,13 @@
 import logging
 from datetime import datetime
 from os.path import basename
-from typing import Dict, Callable
+from typing import Dict, Callable, Optional
 
 import numpy as np
 from pyfmi import load_fmu
 
+from openmodelica_microgrid_gym.env.fmu_cache import FMUCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,10 +18,23 @@ class PyFMI_Wrapper:
         self.model = model
 
     @classmethod
-    def load(cls, path):
+    def load(cls, path: str, cache: Optional[FMUCache] = None):
+        """
+        Loads an FMU
+
+        :param path: path of the FMU file
+        :param cache: if provided, the FMU is extracted only once into the cache and loaded from there.
+         The log file and log level of the FMU are defined by the cache.
+         Otherwise the FMU is unzipped on every load and logs to a file named after the date in the working directory.
+        """
         model_name = basename(path)
         logger.debug('Loading model "%s"', model_name)
-        model = cls(load_fmu(path, log_file_name=datetime.now().strftime(f'%Y-%m-%d_{model_name}.txt')))
+        if cache is None:
+            fmu = load_fmu(path, log_file_name=datetime.now().strftime(f'%Y-%m-%d_{model_name}.txt'))
+        else:
+            fmu = load_fmu(cache.extract(path), allow_unzipped_fmu=True, log_file_name=cache.log_file(path),
+                           log_level=cache.log_level)
+        model = cls(fmu)
         logger.debug('Successfully loaded model "%s"', model_name)
         return model
 
@@ -45,6 +60,8 @@ class PyFMI_Wrapper:
             e_info = self.model.get_event_info()
 
         self.model.enter_continuous_time_mode()
+        self._event_info = e_info
+        self.n_event_indicators = self.model.get_ode_sizes()[1]
 
         # precalculating indices for more efficient lookup
         self.model_output_idx = np.array([self.model.get_variable_valueref(k) for k in output_names])
@@ -73,13 +90,68 @@ class PyFMI_Wrapper:
     def time(self, val):
         self.model.time = val
 
-    def jacc(self):
-        # get state and derivative value reference lists
-        refs = [[s.value_reference for s in getattr(self.model, attr)().values()]
-                for attr in
-                ['get_states_list', 'get_derivatives_list']]
-        jacobian = np.identity(len(refs[1]))
-        np.apply_along_axis(lambda col: self.model.get_directional_derivative(*refs, col), 0, jacobian)
+    @property
+    def event_indicators(self) -> np.ndarray:
+        """
+        Event indicators of the model at the current time and states, a state event occurs if one changes its sign
+        """
+        return self.model.get_event_indicators()
+
+    @property
+    def next_time_event(self) -> Optional[float]:
+        """
+        Time of the next time event or None
+        """
+        if self._event_info.nextEventTimeDefined:
+            return self._event_info.nextEventTime
+        return None
+
+    def handle_event(self):
+        """
+        Handles an event at the current time and states by the event iteration of the FMU.
+        The states might be reinitialized.
+        """
+        self.model.enter_event_mode()
+        e_info = self.model.get_event_info()
+        e_info.newDiscreteStatesNeeded = True
+        while e_info.newDiscreteStatesNeeded:
+            self.model.event_update()
+            e_info = self.model.get_event_info()
+        self.model.enter_continuous_time_mode()
+        self._event_info = e_info
+
+    def completed_step(self) -> bool:
+        """
+        Informs the FMU about a completed integration step
+
+        :return: whether the FMU requests to handle a step event
+        """
+        enter_event_mode, _ = self.model.completed_integrator_step()
+        return enter_event_mode
+
+    def jacc(self) -> np.ndarray:
+        """
+        Jacobian of the derivatives with respect to the states at the current time and states.
+        The columns are the directional derivatives of the FMU in the directions of the unit vectors,
+        if the FMU does not provide directional derivatives, they are approximated by forward differences.
+        """
+        states = np.array(self.states, dtype=float)
+        n = len(states)
+        if self.model.get_capability_flags().get('providesDirectionalDerivatives', False):
+            # get state and derivative value reference lists
+            refs = [[s.value_reference for s in getattr(self.model, attr)().values()]
+                    for attr in ['get_states_list', 'get_derivatives_list']]
+            return np.column_stack([self.model.get_directional_derivative(*refs, col) for col in np.identity(n)])
+
+        deriv = np.array(self.deriv, dtype=float)
+        jacobian = np.empty((n, n))
+        for i in range(n):
+            h = 1e-8 * max(1., abs(states[i]))
+            perturbed = states.copy()
+            perturbed[i] += h
+            self.states = perturbed
+            jacobian[:, i] = (self.deriv - deriv) / h
+        self.states = states
         return jacobian
 
     def set(self, **kwargs):
@@ -0,0 +1,170 @@
+"""
+Rendering of the episodes of the ModelicaEnv.
+At the end of an episode the plotted columns are copied into a compact EpisodeSnapshot.
+It is either plotted directly or handed to a RenderWorker, which plots and exports the figures in background processes
+while the next episode is simulated.
+"""
+import logging
+import multiprocessing as mp
+import pickle
+import re
+from typing import List, Optional
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from openmodelica_microgrid_gym.env.plot import PlotTmpl
+from openmodelica_microgrid_gym.util import EmptyHistory
+from openmodelica_microgrid_gym.util.decimation import decimate
+
+logger = logging.getLogger(__name__)
+
+
+class EpisodeSnapshot:
+    def __init__(self, history: EmptyHistory, viz_col_regex: str, viz_col_tmpls: List[PlotTmpl],
+                 time_step_size: float, time_start: float = 0, max_points: Optional[int] = None,
+                 decimation: str = 'minmax'):
+        """
+        Copy of the data of an episode needed to create its plots
+
+        :param history: history of the environment
+        :param viz_col_regex: regex selecting the plotted columns, see ModelicaEnv
+        :param viz_col_tmpls: plot templates, see ModelicaEnv
+        :param time_step_size: time step size of the environment
+        :param time_start: time offset of the environment
+        :param max_points: if provided, the column groups are decimated to about this number of points per column.
+         Templates use their own max_points if set.
+        :param decimation: decimation method of the column groups, see omg.util.decimation
+        """
+        cols = history.cols
+        data = np.array(history.data, dtype=float).reshape(-1, len(cols))
+        idx = {col: i for i, col in enumerate(cols)}
+        time = np.arange(data.shape[0]) * time_step_size + time_start
+
+        def select(cols, max_points_, decimation_):
+            values = data[:, [idx[col] for col in cols]]
+            if max_points_ is None:
+                return time, values
+            samples = decimate(time, values, max_points_, decimation_)
+            return time[samples], values[samples]
+
+        # plot cols by theirs structure filtered by the vis_cols param
+        self.groups = []  # type: List[Tuple[List[str], np.ndarray, np.ndarray]]
+        for group in history.structured_cols():
+            if not isinstance(group, list):
+                group = [group]
+            group = [col for col in group if re.fullmatch(viz_col_regex, col)]
+            if group:
+                self.groups.append((group, *select(group, max_points, decimation)))
+
+        self.templates = []  # type: List[Tuple[PlotTmpl, np.ndarray, np.ndarray]]
+        for tmpl in viz_col_tmpls:
+            if tmpl.max_points is None:
+                self.templates.append((tmpl, *select(tmpl.vars, max_points, decimation)))
+            else:
+                self.templates.append((tmpl, *select(tmpl.vars, tmpl.max_points, tmpl.decimation)))
+
+    def plot(self) -> List[Figure]:
+        """
+        Creates the figures of the episode: one per column group and one per template
+
+        :return: list of figures
+        """
+        figs = []
+        for cols, time, values in self.groups:
+            fig, ax = plt.subplots()
+            pd.DataFrame(values, index=time, columns=cols).plot(legend=True, figure=fig, ax=ax)
+            plt.show()
+            figs.append(fig)
+
+        for tmpl, time, values in self.templates:
+            fig, ax = plt.subplots()
+            for i, (series, kwargs) in enumerate(tmpl):
+                pd.Series(values[:, i], index=time, name=series).plot(figure=fig, ax=ax, **kwargs)
+            tmpl.callback(fig)
+            figs.append(fig)
+        return figs
+
+
+def _render_loop(queue: mp.JoinableQueue, backend: str):
+    matplotlib.use(backend, force=True)
+    while True:
+        payload = queue.get()
+        try:
+            if payload is None:
+                return
+            try:
+                figs = pickle.loads(payload).plot()
+            except Exception:
+                logger.exception('Rendering of an episode failed')
+            else:
+                for fig in figs:
+                    plt.close(fig)
+        finally:
+            queue.task_done()
+
+
+class RenderWorker:
+    def __init__(self, n_workers: int = 1, max_pending: int = 2, backend: str = 'Agg'):
+        """
+        Plots episode snapshots in background processes.
+        The figures are not shown (non-interactive backend) and closed after the callbacks of the templates were
+        executed, hence the callbacks should export them (e.g. PlotManager with save_results=True).
+        Several workers export the figures of different episodes in parallel.
+
+        :param n_workers: number of render processes
+        :param max_pending: maximum number of snapshots waiting to be rendered.
+         If the workers fall behind, submit() blocks until a snapshot was taken, which limits the memory usage.
+        :param backend: matplotlib backend of the render processes
+        """
+        self._queue = mp.JoinableQueue(max_pending)
+        self._processes = [mp.Process(target=_render_loop, args=(self._queue, backend), daemon=True)
+                           for _ in range(n_workers)]
+        for process in self._processes:
+            process.start()
+
+    def submit(self, snapshot: EpisodeSnapshot) -> bool:
+        """
+        Hands a snapshot to the render processes
+
+        :param snapshot: episode to render
+        :return: False if the snapshot can not be pickled (e.g. a template callback is a lambda).
+         It has to be rendered by the caller in that case.
+        """
+        if not self._processes:
+            raise RuntimeError('The render worker is closed')
+        # pickling in the calling thread fixes the state of the callbacks (e.g. agent performance in the file names)
+        try:
+            payload = pickle.dumps(snapshot)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            logger.warning(f'The episode is rendered in the calling process, as it can not be pickled: {e}')
+            return False
+        self._queue.put(payload)
+        return True
+
+    def join(self):
+        """
+        Waits until all submitted snapshots are rendered
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Renders the pending snapshots and stops the render processes
+        """
+        if not self._processes:
+            return
+        for _ in self._processes:
+            self._queue.put(None)
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,148 @@
+"""
+Fixed-step integrators for the ModelicaEnv (ModelicaEnv(solver_method=...)).
+Every environment step integrates a single short interval of length ts with a constant input.
+The adaptive solvers of scipy.integrate.solve_ivp spend most of their time with step size control and setup in this
+case, while these solvers execute a fixed number of substeps with preallocated work arrays.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+from scipy.linalg import expm, lu_factor, lu_solve
+
+Fun = Callable[[float, np.ndarray], np.ndarray]
+
+
+class FixedStepSolver:
+    def __init__(self, substeps: int = 1):
+        """
+        :param substeps: number of integration steps per integrated interval
+        """
+        if substeps < 1:
+            raise ValueError('at least one substep is needed')
+        self.substeps = substeps
+        self._n = None  # type: Optional[int]
+
+    def _allocate(self, n: int):
+        """
+        Allocates the work arrays for states of dimension n
+        """
+        self._n = n
+        self._x = np.empty(n)
+
+    def integrate(self, fun: Fun, jac: Fun, t_span, x0: np.ndarray,
+                  samples: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Integrates the system over the interval
+
+        :param fun: derivatives of the system, called like fun(t, x)
+        :param jac: Jacobian of the system, called like jac(t, x)
+        :param t_span: start and end time
+        :param x0: initial state
+        :param samples: if provided, array of shape (m, len(x0)) that is filled with the states at the m equally spaced
+            times t0 + (t1 - t0) * j / m for j = 1..m. The number of substeps must be a multiple of m.
+        :return: state at the end time. The array is reused by the next call.
+        """
+        if self._n != len(x0):
+            self._allocate(len(x0))
+        stride = self.substeps
+        if samples is not None:
+            if self.substeps % len(samples):
+                raise ValueError(f'{len(samples)} samples need a multiple of {len(samples)} substeps, '
+                                 f'got {self.substeps}')
+            stride = self.substeps // len(samples)
+        t0, t1 = t_span
+        h = (t1 - t0) / self.substeps
+        self._x[:] = x0
+        self._prepare(fun, jac, t0, h)
+        for k in range(self.substeps):
+            self._step(fun, t0 + k * h, h)
+            if samples is not None and (k + 1) % stride == 0:
+                samples[(k + 1) // stride - 1] = self._x
+        return self._x
+
+    def _prepare(self, fun: Fun, jac: Fun, t: float, h: float):
+        """
+        Called once per integrated interval before the substeps
+        """
+        pass
+
+    def _step(self, fun: Fun, t: float, h: float):
+        """
+        Advances self._x by one substep
+        """
+        raise NotImplementedError()
+
+
+class RK4(FixedStepSolver):
+    """Classical explicit Runge-Kutta method of order 4"""
+
+    def _allocate(self, n: int):
+        super()._allocate(n)
+        self._k = np.empty((4, n))
+        self._tmp = np.empty(n)
+
+    def _step(self, fun: Fun, t: float, h: float):
+        x, k, tmp = self._x, self._k, self._tmp
+        k[0] = fun(t, x)
+        np.multiply(k[0], h / 2, out=tmp)
+        tmp += x
+        k[1] = fun(t + h / 2, tmp)
+        np.multiply(k[1], h / 2, out=tmp)
+        tmp += x
+        k[2] = fun(t + h / 2, tmp)
+        np.multiply(k[2], h, out=tmp)
+        tmp += x
+        k[3] = fun(t + h, tmp)
+        k[1] += k[2]
+        k[1] *= 2
+        k[0] += k[1]
+        k[0] += k[3]
+        k[0] *= h / 6
+        x += k[0]
+
+
+class Trapezoidal(FixedStepSolver):
+    """
+    Implicit trapezoidal rule (A-stable, order 2), the implicit equation is solved by one Newton step
+    with the Jacobian at the start of the interval, which is exact for linear models.
+    """
+
+    def _prepare(self, fun: Fun, jac: Fun, t: float, h: float):
+        jacobian = jac(t, self._x)
+        self._lu = lu_factor(np.identity(self._n) - h / 2 * jacobian)
+
+    def _step(self, fun: Fun, t: float, h: float):
+        # (I - h/2 J) dx = h f(x)
+        self._x += lu_solve(self._lu, h * fun(t, self._x))
+
+
+class ExpEuler(FixedStepSolver):
+    """
+    Exponential Euler method, x <- x + h phi_1(h J) f(x).
+    It is exact for linear models with constant input, the matrix function is only recomputed if the Jacobian changes.
+    """
+
+    def _allocate(self, n: int):
+        super()._allocate(n)
+        self._jac = None
+        self._h = None
+        self._phi = np.empty((n, n))
+        self._aug = np.zeros((2 * n, 2 * n))
+
+    def _prepare(self, fun: Fun, jac: Fun, t: float, h: float):
+        jacobian = jac(t, self._x)
+        # the length of the intervals varies by rounding errors of the time
+        if self._h is None or abs(h - self._h) > 1e-9 * h or not np.array_equal(jacobian, self._jac):
+            n = self._n
+            # the upper right block of exp([[J, I], [0, 0]] h) is h phi_1(h J)
+            self._aug[:n, :n] = jacobian
+            self._aug[:n, n:] = np.identity(n)
+            self._phi[:] = expm(self._aug * h)[:n, n:]
+            self._jac, self._h = np.array(jacobian), h
+
+    def _step(self, fun: Fun, t: float, h: float):
+        self._x += self._phi @ fun(t, self._x)
+
+
+solvers = {'RK4': RK4, 'Trapezoidal': Trapezoidal, 'ExpEuler': ExpEuler}  # type: Dict[str, Type[FixedStepSolver]]
+"""Fixed-step solvers selectable by the solver_method of the ModelicaEnv"""
@@ -1,4 +1,13 @@
-from openmodelica_microgrid_gym.execution.callbacks import Callback
-from openmodelica_microgrid_gym.execution.runner import Runner
+from openmodelica_microgrid_gym.util.lazy import lazy_attributes
 
-__all__ = ['Runner', 'Callback']
+__all__ = ['Runner', 'BatchRunner', 'MonteCarloRunner', 'Callback', 'BatchCallback', 'EpisodeRecorder',
+           'EvaluationCache', 'Sweep']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {'BatchRunner': '.batch_runner',
+                                                  'EvaluationCache': '.cache',
+                                                  'Callback': '.callbacks',
+                                                  'BatchCallback': '.callbacks',
+                                                  'EpisodeRecorder': '.callbacks',
+                                                  'MonteCarloRunner': '.monte_carlo_runner',
+                                                  'Runner': '.runner',
+                                                  'Sweep': '.sweep'})
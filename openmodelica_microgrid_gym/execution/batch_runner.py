@@ -0,0 +1,78 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Any, Optional
+
+from tqdm import tqdm
+
+from openmodelica_microgrid_gym.agents import SafeOptAgent
+from openmodelica_microgrid_gym.execution.cache import EvaluationCache
+from openmodelica_microgrid_gym.execution.pool import ExperimentFactory, init_worker, evaluate
+
+
+class BatchRunner:
+    """
+    This class tunes the parameters of a SafeOptAgent by evaluating several candidates concurrently.
+    In each iteration the agent proposes a batch of safe parameter sets, which are evaluated in worker processes.
+    Each worker owns its own environment (and FMU) that is reused for all its episodes.
+    Once the whole batch is finished, all results are added to the Gaussian process of the agent in one update.
+    """
+
+    def __init__(self, agent: SafeOptAgent, experiment_factory: ExperimentFactory, batch_size: Optional[int] = None,
+                 n_workers: Optional[int] = None, lie: str = 'mean', cache: Optional[EvaluationCache] = None,
+                 prune: bool = False):
+        """
+
+        :param agent: Agent whose parameters are tuned. It is only used in the main process.
+        :param experiment_factory: Picklable callable returning a fresh agent and environment.
+         The agent must use the same controllers and mutable parameters as the tuned agent.
+         The factory is called once in every worker process.
+        :param batch_size: number of candidates evaluated per iteration. Defaults to the number of workers.
+        :param n_workers: number of worker processes. Defaults to the number of CPUs.
+        :param lie: fantasised performance used to select the candidates of a batch, see SafeOptAgent.propose_batch()
+        :param cache: if provided, the workers look up already evaluated candidates
+         (e.g. from a previous run) instead of simulating them again
+        :param prune: if True, episodes are stopped early once they can not reach the return threshold of the agent
+         anymore, see Runner
+        """
+        self.agent = agent
+        self.experiment_factory = experiment_factory
+        self.n_workers = n_workers or os.cpu_count()
+        self.batch_size = batch_size or self.n_workers
+        self.lie = lie
+        self.cache = cache
+        self.prune = prune
+        self.run_data = dict()  # type: Dict[str,Any]
+        """
+        Dictionary storing information about the experiment.
+
+        - "best_episode_idx": index of best episode in the agent history
+        - "worst_episode_idx": index of worst episode in the agent history
+        - "agent_plt": last agent plot
+        """
+
+    def run(self, n_iterations: int = 10, visualise: bool = False):
+        """
+        Tunes the agent for a number of iterations.
+        The first iteration only evaluates the initial parameters, as they are needed to set up the Gaussian process.
+
+        :param n_iterations: number of batches to evaluate
+        :param visualise: turns on visualization of the agent
+        """
+        self.agent.reset()
+        agent_fig = None
+
+        with ProcessPoolExecutor(self.n_workers, initializer=init_worker,
+                                 initargs=(self.experiment_factory, self.cache)) as pool:
+            for _ in tqdm(range(n_iterations), desc='iterations', unit='batch'):
+                candidates = self.agent.propose_batch(self.batch_size, self.lie)
+                threshold = self.agent.return_threshold if self.prune else None
+                results = list(pool.map(evaluate, candidates, repeat(None), repeat(threshold)))
+                self.agent.observe_batch(candidates, [result['episode_return'] for result in results])
+
+                if visualise:
+                    agent_fig = self.agent.render()
+                self.run_data['last_agent_plt'] = agent_fig
+
+        self.run_data['best_episode_idx'] = self.agent.best_episode
+        self.run_data['worst_episode_idx'] = self.agent.worst_episode
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import os
+from functools import partial
+from typing import Optional, Sequence, Dict, Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from openmodelica_microgrid_gym.env import ModelicaEnv
+from openmodelica_microgrid_gym.env.fmu_cache import file_hash
+
+logger = logging.getLogger(__name__)
+
+
+def describe_callable(fun: Callable) -> Any:
+    """
+    JSON serializable description of a callable used to identify it across processes.
+    Functions are described by their qualified name, code (including constants and nested code objects), default
+    arguments and the values of their closure, partial objects additionally by their arguments.
+    Bound methods are additionally described by the public attributes of their instance, private attributes
+    (starting with '_') are considered caches.
+    The state of other objects (like a random process used in the model_params) is not part of the description,
+    it has to be determined by the seed of the experiment (see ModelicaEnv.seed()).
+
+    :param fun: callable
+    :return: nested structure of strings and numbers
+    """
+    return _describe_callable(fun, set())
+
+
+def _describe_callable(fun: Callable, seen: set) -> Any:
+    if isinstance(fun, partial):
+        return ['partial', _describe_callable(fun.func, seen), _describe_value(fun.args, seen),
+                _describe_value(dict(fun.keywords), seen)]
+    if hasattr(fun, '__func__'):
+        # bound method
+        return ['method', _describe_object(fun.__self__, seen), _describe_callable(fun.__func__, seen)]
+    code = getattr(fun, '__code__', None)
+    if code is None:
+        return ['object', type(fun).__module__, type(fun).__qualname__]
+    if id(fun) in seen:
+        # recursive closures
+        return ['cycle', fun.__qualname__]
+    seen.add(id(fun))
+    closure = [cell.cell_contents for cell in fun.__closure__ or ()]
+    return ['function', fun.__module__, fun.__qualname__, _describe_code(code),
+            _describe_value(fun.__defaults__, seen), _describe_value(closure, seen)]
+
+
+def _describe_code(code) -> Any:
+    # the repr of nested code objects contains their memory address
+    return [code.co_code.hex(), list(code.co_names),
+            [_describe_code(c) if hasattr(c, 'co_code') else _describe_value(c) for c in code.co_consts]]
+
+
+def _describe_value(value, seen: Optional[set] = None) -> Any:
+    """
+    Stable description of a value, independent of memory addresses and hash randomization
+    """
+    seen = set() if seen is None else seen
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return ['array', str(value.dtype), list(value.shape), hashlib.sha256(value.tobytes()).hexdigest()]
+    if isinstance(value, (list, tuple)):
+        return [_describe_value(v, seen) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return ['set', sorted(json.dumps(_describe_value(v, seen), default=repr) for v in value)]
+    if isinstance(value, dict):
+        return ['dict', sorted(([str(k), _describe_value(v, seen)] for k, v in value.items()), key=lambda kv: kv[0])]
+    if callable(value) and (hasattr(value, '__code__') or hasattr(value, '__func__') or isinstance(value, partial)):
+        return _describe_callable(value, seen)
+    if hasattr(value, '__dict__'):
+        return _describe_object(value, seen)
+    description = repr(value)
+    # the default representation contains the memory address
+    return type(value).__qualname__ if ' at 0x' in description else description
+
+
+def _describe_object(obj, seen: set) -> Any:
+    if id(obj) in seen:
+        return ['cycle', type(obj).__qualname__]
+    seen.add(id(obj))
+    attributes = {k: v for k, v in vars(obj).items() if not k.startswith('_')}
+    return ['object', type(obj).__module__, type(obj).__qualname__, _describe_value(attributes, seen)]
+
+
+class EvaluationCache:
+    def __init__(self, directory: str, max_size: float = 1e9, store_trajectory: bool = False, tag: str = ''):
+        """
+        Disk cache of episode results to avoid simulating the same experiment twice.
+        Each result is stored in its own file, hence the cache can be shared by several processes.
+        If the files exceed max_size bytes, the least recently used results are evicted.
+
+        The results are identified by a hash of the mutable parameters, the random seed and the configuration of
+        the environment (network configuration, model_params, FMU file, reward function and simulation settings).
+        Configuration not visible to the environment (e.g. fixed controller parameters) must be included in the tag.
+
+        :param directory: folder containing the cached results, created if needed
+        :param max_size: maximum size of all cached results in bytes
+        :param store_trajectory: if True, the history of the environment is stored with the result
+        :param tag: additional string identifying the experiment
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.store_trajectory = store_trajectory
+        self.tag = tag
+        self._warned = False
+        os.makedirs(directory, exist_ok=True)
+
+    def cacheable(self, env: ModelicaEnv, seed: Optional[int] = None) -> bool:
+        """
+        Whether the episodes are reproducible and can be cached.
+        Episodes using random processes in the model_params are only reproducible if the environment is seeded.
+
+        :param env: environment the episode is executed on
+        :param seed: seed of the random generators, passed to env.seed() before the episode
+        :return: False if the environment uses random processes, but no seed is given
+        """
+        if seed is not None:
+            return True
+        # stochastic is only imported if it is used
+        from openmodelica_microgrid_gym.util.randproc import find_rand_processes
+
+        if not find_rand_processes(*env.model_parameters.values()):
+            return True
+        if not self._warned:
+            logger.warning('The model_params use random processes, but no seed is given. The episodes are not cached.')
+            self._warned = True
+        return False
+
+    def key(self, env: ModelicaEnv, params: Optional[Sequence[float]] = None, seed: Optional[int] = None) -> str:
+        """
+        Calculates the key of an episode
+
+        :param env: environment the episode is executed on
+        :param params: values of the mutable parameters of the agent
+        :param seed: seed of the random generators. None means the experiment is deterministic, see cacheable().
+        :return: hex digest identifying the episode
+        """
+        fmu = file_hash(env.model_path) if isinstance(env.model_path, str) and os.path.isfile(
+            env.model_path) else repr(env.model_path)
+        description = dict(
+            params=None if params is None else [float(p) for p in params],
+            seed=seed,
+            net=env.net.config if env.net.config is not None else repr(
+                (env.net.ts, float(env.net.v_nom), env.net.freq_nom, [type(c).__name__ for c in env.net.components])),
+            model_params={var: describe_callable(f) for var, f in env.model_parameters.items()},
+            fmu=fmu,
+            reward=describe_callable(env.reward),
+            settings=[env.time_start, env.time_step_size, env.max_episode_steps, env.solver_method,
+                      env.action_time_delay, env.is_normalized, env.abort_reward],
+            tag=self.tag)
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=repr).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a result
+
+        :param key: key of the episode
+        :return: the result or None if the episode is not cached. If trajectories are stored, the result contains
+         the history of the environment as DataFrame under the key 'trajectory'.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                data = dict(data)
+            # mark as recently used
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        result = {k: v.item() for k, v in data.items() if not k.startswith('trajectory')}
+        if 'trajectory' in data:
+            result['trajectory'] = pd.DataFrame(data['trajectory'], columns=data['trajectory_cols'])
+        return result
+
+    def put(self, key: str, result: Dict[str, Any], trajectory: Optional[pd.DataFrame] = None):
+        """
+        Stores a result and evicts the least recently used results if the cache is too large
+
+        :param key: key of the episode
+        :param result: flat dictionary of scalars like the episode return and risk flags
+        :param trajectory: history of the environment, only stored if store_trajectory is set
+        """
+        data = {k: np.array(v) for k, v in result.items() if k != 'trajectory'}
+        if self.store_trajectory and trajectory is not None:
+            data['trajectory'] = trajectory.to_numpy(dtype=float)
+            data['trajectory_cols'] = np.array(trajectory.columns, dtype=str)
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **data)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes the least recently used results until the cache is smaller than max_size
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        size = sum(e[1] for e in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+    def __len__(self):
+        return sum(1 for entry in os.scandir(self.directory) if entry.name.endswith('.npz'))
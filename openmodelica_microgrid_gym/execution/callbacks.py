@@ -1,4 +1,7 @@
-from abc import ABC
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import numpy as np
 
 
 class Callback(ABC):
@@ -8,5 +11,108 @@ class Callback(ABC):
     def __call__(self, *args, **kwargs):
         pass
 
+    def on_batch(self, cols, data: np.ndarray):
+        """
+        Receives the data of several steps at once, used by the headless mode of the Runner.
+        By default the callback is called for every step.
+
+        :param cols: names of the columns
+        :param data: 2d array with one row per step. The array is reused for the next chunk, copy it to keep the data.
+        """
+        for row in data:
+            self(cols, row)
+
+    def on_episode_end(self):
+        """
+        Called by the Runner after the last step of an episode
+        """
+        pass
+
+
+class BatchCallback(Callback):
+    def __init__(self, columns: Optional[List[str]] = None, chunk_size: Optional[int] = None):
+        """
+        Callback receiving the values of the subscribed columns as arrays of several steps via on_chunk(),
+        e.g. to evaluate an episode vectorised instead of step by step.
+        The values are buffered, regardless of whether the Runner delivers them per step or in batches.
+
+        :param columns: names of the subscribed columns. If None, all columns are delivered.
+        :param chunk_size: number of steps delivered at once. If None, the whole episode is delivered at its end.
+        """
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self._cols = None
+        self._idx = None
+        self._buffer = None
+        self._n = 0
+
+    @abstractmethod
+    def on_chunk(self, data: np.ndarray):
+        """
+        Receives the buffered steps. Must be implemented by subclasses.
+
+        :param data: 2d array with one row per step and one column per subscribed column.
+         The array is reused for the next chunk, copy it to keep the data.
+        """
+        pass
+
+    def reset(self):
+        self._n = 0
+
+    def _select(self, cols: List[str]):
+        # the indices are only resolved if the columns changed
+        if cols is not self._cols:
+            self._cols = cols
+            self._idx = np.arange(len(cols)) if self.columns is None else np.array(
+                [cols.index(col) for col in self.columns], dtype=int)
+            self._buffer = np.empty((self.chunk_size or 1024, len(self._idx)))
+            self._n = 0
+
+    def __call__(self, cols, data):
+        self._select(cols)
+        self._append(np.asarray(data)[None, self._idx])
+
+    def on_batch(self, cols, data: np.ndarray):
+        self._select(cols)
+        self._append(data[:, self._idx])
+
+    def on_episode_end(self):
+        self.flush()
+
+    def flush(self):
+        """
+        Delivers the buffered steps
+        """
+        if self._n:
+            self.on_chunk(self._buffer[:self._n])
+            self._n = 0
+
+    def _append(self, data: np.ndarray):
+        while len(data):
+            free = len(self._buffer) - self._n
+            if free == 0:
+                if self.chunk_size is None:
+                    # collecting the whole episode
+                    self._buffer = np.concatenate([self._buffer, np.empty_like(self._buffer)])
+                    continue
+                self.flush()
+                free = len(self._buffer)
+            n = min(free, len(data))
+            self._buffer[self._n:self._n + n] = data[:n]
+            self._n += n
+            data = data[n:]
+
+
+class EpisodeRecorder(BatchCallback):
+    def __init__(self, columns: Optional[List[str]] = None):
+        """
+        Records the subscribed columns of every episode, e.g. to calculate control metrics afterwards
 
+        :param columns: names of the subscribed columns. If None, all columns are recorded.
+        """
+        super().__init__(columns)
+        self.episodes = []  # type: List[np.ndarray]
+        """list of 2d arrays with the recorded steps of each episode"""
 
+    def on_chunk(self, data: np.ndarray):
+        self.episodes.append(data.copy())
@@ -0,0 +1,125 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+from tqdm import tqdm
+
+from openmodelica_microgrid_gym.agents.episodic import EpisodicLearnerAgent
+from openmodelica_microgrid_gym.execution.cache import EvaluationCache
+from openmodelica_microgrid_gym.execution.pool import ExperimentFactory, init_worker, evaluate, return_bound
+
+logger = logging.getLogger(__name__)
+
+
+def replicate_seeds(seed: int, n_mc: int) -> List[int]:
+    """
+    Independent seeds of the Monte-Carlo replicates.
+    The seeds only depend on the base seed, hence every parameter set is evaluated on the same realisations of the
+    stochastic components (common random numbers), which reduces the variance of the comparison.
+    The seeds are passed to ModelicaEnv.seed(), which reseeds the random processes of the model_params.
+
+    :param seed: base seed
+    :param n_mc: number of replicates
+    :return: list of seeds
+    """
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_mc)]
+
+
+class MonteCarloRunner:
+    """
+    This class will execute an episodic learning agent on a stochastic environment.
+    Every parameter set of the agent is evaluated by n_mc Monte-Carlo replicates, which are executed concurrently
+    in worker processes. Each worker owns its own environment (and FMU) that is reused for all its episodes.
+    The mean return of the replicates is observed by the agent as return of one episode.
+
+    Returns depending on the whole trajectory (like penalties of the gradients) have to be included
+    in the reward function of the environment, as the episodes are executed in the worker processes.
+    """
+
+    def __init__(self, agent: EpisodicLearnerAgent, experiment_factory: ExperimentFactory, n_mc: int = 5,
+                 n_workers: Optional[int] = None, seed: int = 0, cache: Optional[EvaluationCache] = None,
+                 prune: bool = False):
+        """
+
+        :param agent: Agent whose parameters (agent.params) are tuned. It is only used in the main process.
+        :param experiment_factory: Picklable callable returning a fresh agent and environment.
+         The agent must use the same controllers and mutable parameters as the tuned agent.
+         The factory is called once in every worker process.
+        :param n_mc: number of Monte-Carlo replicates per parameter set
+        :param n_workers: number of worker processes. Defaults to the number of CPUs, but at most n_mc.
+        :param seed: base seed of the replicates, see replicate_seeds()
+        :param cache: if provided, the workers look up already evaluated replicates instead of simulating them again
+        :param prune: if True, the pending replicates of a parameter set are cancelled as soon as the mean return can
+         not reach the return threshold of the agent anymore, see Runner.
+         The agent observes the optimistic bound of the mean return in that case.
+        """
+        self.agent = agent
+        self.experiment_factory = experiment_factory
+        self.n_mc = n_mc
+        self.n_workers = n_workers or min(os.cpu_count(), n_mc)
+        self.seeds = replicate_seeds(seed, n_mc)
+        self.cache = cache
+        self.prune = prune
+        self.run_data = dict()  # type: Dict[str,Any]
+        """
+        Dictionary storing information about the experiment.
+
+        - "returns": list of arrays with the returns of the replicates of each episode (NaN if cancelled)
+        - "best_episode_idx": index of best episode
+        - "worst_episode_idx": index of worst episode
+        - "agent_plt": last agent plot
+        """
+
+    def run(self, n_episodes: int = 10, visualise: bool = False):
+        """
+        Trains the agent for a number of episodes, each consisting of n_mc replicates
+
+        :param n_episodes: number of parameter sets to evaluate
+        :param visualise: turns on visualization of the agent
+        """
+        self.agent.reset()
+        self.run_data['returns'] = []
+        agent_fig = None
+
+        with ProcessPoolExecutor(self.n_workers, initializer=init_worker,
+                                 initargs=(self.experiment_factory, self.cache)) as pool:
+            max_return = pool.submit(return_bound).result() if self.prune else None
+            if self.prune and max_return is None:
+                logger.warning('The reward function does not declare "max_reward", episodes are not pruned')
+
+            for i in tqdm(range(n_episodes), desc='episodes', unit='epoch'):
+                params = self.agent.params[:]
+                futures = {pool.submit(evaluate, params, seed): m for m, seed in enumerate(self.seeds)}
+                threshold = self.agent.return_threshold if max_return is not None else None
+
+                returns = np.full(self.n_mc, np.nan)
+                mean_return = None
+                for n_done, future in enumerate(as_completed(futures), start=1):
+                    returns[futures[future]] = future.result()['episode_return']
+                    if threshold is not None and n_done < self.n_mc:
+                        bound = (np.nansum(returns) + (self.n_mc - n_done) * max_return) / self.n_mc
+                        if bound < threshold:
+                            logger.info(f'Episode {i} pruned after {n_done} replicates with a mean return bound of '
+                                        f'{bound}')
+                            for f in futures:
+                                f.cancel()
+                            mean_return = bound
+                            break
+                if mean_return is None:
+                    mean_return = returns.mean()
+                self.run_data['returns'].append(returns)
+
+                # the agent observes the whole episode at once
+                self.agent.observe(mean_return, True)
+
+                if visualise:
+                    agent_fig = self.agent.render()
+                self.run_data['last_agent_plt'] = agent_fig
+
+                if i == 0 or self.agent.has_improved:
+                    self.run_data['best_episode_idx'] = i
+
+                if i == 0 or self.agent.has_worsened:
+                    self.run_data['worst_episode_idx'] = i
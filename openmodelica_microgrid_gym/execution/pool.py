@@ -0,0 +1,150 @@
+import logging
+from typing import Callable, Tuple, Optional, Sequence, Dict, Any
+
+from openmodelica_microgrid_gym.agents import Agent
+from openmodelica_microgrid_gym.env import ModelicaEnv
+from openmodelica_microgrid_gym.execution.cache import EvaluationCache
+from openmodelica_microgrid_gym.execution.pruning import max_step_reward, optimistic_return
+from openmodelica_microgrid_gym.execution.runner import Runner
+
+logger = logging.getLogger(__name__)
+
+ExperimentFactory = Callable[[], Tuple[Agent, ModelicaEnv]]
+"""
+Callable building a fresh agent and environment.
+It is executed in the worker processes, hence it must be picklable (e.g. a function defined on module level).
+"""
+
+
+class EpisodeWorker:
+    def __init__(self, experiment_factory: ExperimentFactory, cache: Optional[EvaluationCache] = None):
+        """
+        Evaluates single episodes of a fixed experiment with varying parameters.
+        The agent and the environment (including the loaded FMU) are only built once and reused for all episodes.
+        The agent does not learn during the evaluation, it is only used to act on the environment.
+
+        :param experiment_factory: builds the agent and the environment on the first evaluation
+        :param cache: if provided, results of already evaluated episodes are taken from the cache
+        """
+        self.experiment_factory = experiment_factory
+        self.cache = cache
+        self.agent = None  # type: Optional[Agent]
+        self.env = None  # type: Optional[ModelicaEnv]
+
+    def setup(self):
+        """
+        Builds the experiment and connects agent and environment like the Runner does.
+        Rendering is disabled, as nobody would look at the figures of a worker.
+        """
+        self.agent, self.env = self.experiment_factory()
+        self.env.viz_mode = None
+        Runner(self.agent, self.env).setup()
+
+    def evaluate(self, params: Optional[Sequence[float]] = None, seed: Optional[int] = None,
+                 return_threshold: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Executes one episode
+
+        :param params: if provided, the mutable parameters of the agent (agent.params) are set to these values
+        :param seed: if provided, the environment is seeded before it is reset (see ModelicaEnv.seed()),
+         hence the random processes of the model_params have the same realisations for all parameters
+        :param return_threshold: if provided and the reward function declares its maximum reward,
+         the episode is stopped as soon as its return can not reach the threshold anymore.
+         The optimistic bound of the return is reported in that case.
+        :return: dictionary with the episode return, the number of steps, the peak risk, whether the episode was
+         aborted by the environment and whether it was pruned.
+         Results taken from the cache additionally contain "cached": True.
+        """
+        if self.agent is None:
+            self.setup()
+        if params is not None:
+            self.agent.params[:] = params
+
+        key = None
+        if self.cache is not None and self.cache.cacheable(self.env, seed):
+            key = self.cache.key(self.env, self.agent.params[:], seed)
+            result = self.cache.get(key)
+            if result is not None:
+                result['cached'] = True
+                return result
+
+        if seed is not None:
+            self.env.seed(seed)
+
+        max_reward = max_step_reward(self.env.reward) if return_threshold is not None else None
+
+        self.agent.prepare_episode()
+        obs = self.env.reset()
+        episode_return, risk, steps, done, pruned = 0, 0, 0, False, False
+        for steps in range(1, self.env.max_episode_steps + 1):
+            act = self.agent.act(obs)
+            obs, r, done, info = self.env.step(act)
+            episode_return += r or 0
+            risk = max(risk, info.get('risk', 0))
+            if done:
+                break
+            if max_reward is not None:
+                bound = optimistic_return(episode_return, self.env.max_episode_steps - steps, max_reward)
+                if bound < return_threshold:
+                    episode_return, pruned = bound, True
+                    break
+        self.agent.prepare_episode()
+
+        result = dict(episode_return=episode_return, steps=steps, risk=risk, aborted=self.env.failed, pruned=pruned)
+        if key is not None and not pruned:
+            self.cache.put(key, result, self.env.history.df)
+        return result
+
+    def return_bound(self) -> Optional[float]:
+        """
+        Upper bound of the return of a whole episode
+
+        :return: the bound or None if the reward function does not declare its maximum reward
+        """
+        if self.agent is None:
+            self.setup()
+        max_reward = max_step_reward(self.env.reward)
+        if max_reward is None:
+            return None
+        return optimistic_return(0, self.env.max_episode_steps, max_reward)
+
+
+_worker = None  # type: Optional[EpisodeWorker]
+"""Worker local episode evaluator, set by init_worker() in every process of the pool"""
+
+
+def init_worker(experiment_factory: ExperimentFactory, cache: Optional[EvaluationCache] = None):
+    """
+    Initializer of the worker processes
+
+    :param experiment_factory: see EpisodeWorker
+    :param cache: see EpisodeWorker
+    """
+    global _worker
+    _worker = EpisodeWorker(experiment_factory, cache)
+
+
+def evaluate(params: Optional[Sequence[float]] = None, seed: Optional[int] = None,
+             return_threshold: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Evaluates an episode using the worker local EpisodeWorker. Must only be called inside of a worker process.
+
+    :param params: see EpisodeWorker.evaluate()
+    :param seed: see EpisodeWorker.evaluate()
+    :param return_threshold: see EpisodeWorker.evaluate()
+    :return: see EpisodeWorker.evaluate()
+    """
+    if _worker is None:
+        raise RuntimeError('the worker was not initialized, please pass init_worker as initializer to the pool')
+    return _worker.evaluate(params, seed, return_threshold)
+
+
+def return_bound() -> Optional[float]:
+    """
+    Upper bound of the episode return of the worker local EpisodeWorker. Must only be called inside of a worker process.
+
+    :return: see EpisodeWorker.return_bound()
+    """
+    if _worker is None:
+        raise RuntimeError('the worker was not initialized, please pass init_worker as initializer to the pool')
+    return _worker.return_bound()
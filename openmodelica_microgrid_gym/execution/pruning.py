@@ -0,0 +1,36 @@
+from typing import Callable, Optional
+
+
+def max_step_reward(reward_fun: Callable) -> Optional[float]:
+    """
+    Upper bound of the reward of a single step.
+    Reward functions declare it by an attribute "max_reward" of the function or,
+    in case of a bound method, of the reward object. For example a reward defined as negative control error:
+
+    .. code-block:: python
+
+        class Reward:
+            max_reward = 0
+
+            def rew_fun(self, cols, data, risk):
+                return -error
+
+    :param reward_fun: reward function of the environment
+    :return: the bound or None if the reward function does not provide one
+    """
+    bound = getattr(reward_fun, 'max_reward', None)
+    if bound is None:
+        bound = getattr(getattr(reward_fun, '__self__', None), 'max_reward', None)
+    return bound
+
+
+def optimistic_return(episode_return: float, remaining_steps: int, max_reward: float) -> float:
+    """
+    Best return an episode can still achieve
+
+    :param episode_return: return of the steps so far
+    :param remaining_steps: number of steps left in the episode
+    :param max_reward: upper bound of the reward of a single step, see max_step_reward()
+    :return: upper bound of the episode return
+    """
+    return episode_return + remaining_steps * max_reward
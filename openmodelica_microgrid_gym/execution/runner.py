@@ -1,10 +1,21 @@
+import logging
+import time
 from typing import Dict, Any, Optional
 
+import numpy as np
 from tqdm import tqdm
 
 from openmodelica_microgrid_gym.agents import Agent
 from openmodelica_microgrid_gym.env import ModelicaEnv
+from openmodelica_microgrid_gym.execution.cache import EvaluationCache
 from openmodelica_microgrid_gym.execution.callbacks import Callback
+from openmodelica_microgrid_gym.execution.pruning import max_step_reward, optimistic_return
+from openmodelica_microgrid_gym.util import SingleHistory
+
+logger = logging.getLogger(__name__)
+
+EPISODE_SUMMARY = np.dtype([('return', float), ('length', int), ('risk', float), ('duration', float)])
+"""Data type of the episode summaries of Runner.run_headless(), the duration is the wall time in seconds"""
 
 
 class Runner:
@@ -13,17 +24,30 @@ class Runner:
     It handles communication between agent and environment and handles the execution of multiple epochs
     """
 
-    def __init__(self, agent: Agent, env: ModelicaEnv, callback: Optional[Callback] = None):
+    def __init__(self, agent: Agent, env: ModelicaEnv, callback: Optional[Callback] = None,
+                 cache: Optional[EvaluationCache] = None, seed: Optional[int] = None, prune: bool = False):
         """
 
         :param agent: Agent that acts on the environment
         :param env: Environment tha Agent acts on
+        :param cache: if provided, episodes already evaluated with the same parameters of the agent are not simulated
+         again. The agent observes the cached return instead.
+         Only sensible for agents with mutable parameters (agent.params) that do not change during an episode.
+        :param seed: if provided, the environment is seeded with it before every episode (see ModelicaEnv.seed()).
+         Otherwise the episodes are expected to be deterministic when using a cache.
+        :param prune: if True, episodes are stopped as soon as they can not reach the return threshold of the agent
+         (Agent.return_threshold) anymore, even if all remaining steps were rewarded with the maximum reward
+         declared by the reward function (see max_step_reward()).
+         The agent observes this optimistic bound as return of the episode.
         """
         self.env = env
         self.agent = agent
         self.agent.env = env
-        self.run_data = dict()  # type: Dict[str,Any]
         self.callback = callback
+        self.cache = cache
+        self.seed = seed
+        self.prune = prune
+        self.run_data = dict()  # type: Dict[str,Any]
         """
         Dictionary storing information about the experiment.
         
@@ -32,6 +56,16 @@ class Runner:
         - "agent_plt": last agent plot
         """
 
+    def setup(self):
+        """
+        Resets the agent and connects it to the environment:
+        the agent gets to know the observation names and the environment records the measurements of the agent.
+        """
+        self.agent.reset()
+        self.agent.obs_varnames = self.env.history.cols
+        self.env.history.cols = self.env.history.structured_cols(None) + self.agent.measurement_cols
+        self.env.measure = self.agent.measure
+
     def run(self, n_episodes: int = 10, visualise: bool = False):
         """
         Trains/executes the agent on the environment for a number of epochs
@@ -39,41 +73,145 @@ class Runner:
         :param n_episodes: number of epochs to play
         :param visualise: turns on visualization of the environment
         """
-        self.agent.reset()
-        self.agent.obs_varnames = self.env.history.cols
-        self.env.history.cols = self.env.history.structured_cols(None) + self.agent.measurement_cols
-        self.env.measure=self.agent.measure
-
-        agent_fig = None
+        self.setup()
+        max_reward = max_step_reward(self.env.reward) if self.prune else None
+        if self.prune and max_reward is None:
+            logger.warning('The reward function does not declare "max_reward", episodes are not pruned')
 
         for i in tqdm(range(n_episodes), desc='episodes', unit='epoch'):
+            key = None
+            if self.cache is not None and self.cache.cacheable(self.env, self.seed):
+                key = self.cache.key(self.env, self.agent.params[:], self.seed)
+                result = self.cache.get(key)
+                if result is not None:
+                    self.agent.observe(result['episode_return'], True)
+                    self._record_episode(i, None, visualise)
+                    continue
+
+            if self.seed is not None:
+                self.env.seed(self.seed)
             obs = self.env.reset()
             if self.callback is not None:
                 self.callback.reset()
-            done, r = False, None
-            for _ in tqdm(range(self.env.max_episode_steps), desc='steps', unit='step', leave=False):
+            done, r, episode_return, risk, steps = False, None, 0, 0, 0
+            threshold = self.agent.return_threshold if max_reward is not None else None
+            pruned = False
+            for steps in tqdm(range(self.env.max_episode_steps), desc='steps', unit='step', leave=False):
                 self.agent.observe(r, done)
                 act = self.agent.act(obs)
                 obs, r, done, info = self.env.step(act)
+                episode_return += r or 0
+                risk = max(risk, info.get('risk', 0))
                 if self.callback is not None:
                     self.callback(self.env.history.cols, self.env.history.last())
                 if visualise:
                     self.env.render()
                 if done:
                     break
+                if threshold is not None:
+                    remaining_steps = self.env.max_episode_steps - steps - 1
+                    bound = optimistic_return(episode_return, remaining_steps, max_reward)
+                    if bound < threshold:
+                        logger.info(f'Episode {i} pruned after {steps + 1} steps with a return bound of {bound}')
+                        # the agent observes the best return the episode could have reached
+                        r += bound - episode_return
+                        done = pruned = True
+                        break
+            if self.callback is not None:
+                self.callback.on_episode_end()
             # close env before calling final agent observe to see plots even if agent crashes
             _, env_fig = self.env.close()
             self.agent.observe(r, done)
 
-            if visualise:
-                agent_fig = self.agent.render()
+            if key is not None and not pruned:
+                self.cache.put(key, dict(episode_return=episode_return, steps=steps + 1, risk=risk,
+                                         aborted=self.env.failed), self.env.history.df)
+            self._record_episode(i, env_fig, visualise)
+
+    def _record_episode(self, i: int, env_fig, visualise: bool):
+        """
+        Stores the figures of the episode in the run_data
+        """
+        agent_fig = None
+        if visualise:
+            agent_fig = self.agent.render()
+
+        self.run_data['last_agent_plt'] = agent_fig
+
+        if i == 0 or self.agent.has_improved:
+            self.run_data['best_env_plt'] = env_fig
+            self.run_data['best_episode_idx'] = i
+
+        if i == 0 or self.agent.has_worsened:
+            self.run_data['worst_env_plt'] = env_fig
+            self.run_data['worst_episode_idx'] = i
 
-            self.run_data['last_agent_plt'] = agent_fig
+    def run_headless(self, n_episodes: int = 10, callback_chunk: int = 1000) -> np.ndarray:
+        """
+        Executes the agent on the environment for a number of episodes with as little overhead as possible:
+
+        - the history of the environment only keeps the last step
+        - no figures are generated and no progress of the steps is shown
+        - the callback receives the data in chunks of steps (see Callback.on_batch())
+
+        Seeding and pruning are applied like in run(), the cache is not used.
+        The history of the environment is restored afterwards.
+
+        :param n_episodes: number of episodes to play
+        :param callback_chunk: maximum number of steps passed to the callback at once
+        :return: summaries of the episodes, see EPISODE_SUMMARY. Also stored in run_data["summary"].
+        """
+        history, viz_mode = self.env.history, self.env.viz_mode
+        self.env.history = SingleHistory(history.structured_cols(None))
+        self.env.viz_mode = None
+        try:
+            self.setup()
+            summary = np.zeros(n_episodes, dtype=EPISODE_SUMMARY)
+            self.run_data['summary'] = summary
+            max_reward = max_step_reward(self.env.reward) if self.prune else None
+            n_cols = len(self.env.history.cols)
+            chunk = np.empty((callback_chunk, n_cols)) if self.callback is not None else None
 
-            if i == 0 or self.agent.has_improved:
-                self.run_data['best_env_plt'] = env_fig
-                self.run_data['best_episode_idx'] = i
+            for i in tqdm(range(n_episodes), desc='episodes', unit='epoch'):
+                start = time.perf_counter()
+                if self.seed is not None:
+                    self.env.seed(self.seed)
+                obs = self.env.reset()
+                if self.callback is not None:
+                    self.callback.reset()
+                threshold = self.agent.return_threshold if max_reward is not None else None
+                done, r, episode_return, risk, steps, n_chunk = False, None, 0, 0, 0, 0
+                for steps in range(1, self.env.max_episode_steps + 1):
+                    self.agent.observe(r, done)
+                    act = self.agent.act(obs)
+                    obs, r, done, info = self.env.step(act)
+                    episode_return += r or 0
+                    risk = max(risk, info.get('risk', 0))
+                    if chunk is not None:
+                        chunk[n_chunk] = self.env.history.last()
+                        n_chunk += 1
+                        if n_chunk == callback_chunk:
+                            self.callback.on_batch(self.env.history.cols, chunk)
+                            n_chunk = 0
+                    if done:
+                        break
+                    if threshold is not None:
+                        bound = optimistic_return(episode_return, self.env.max_episode_steps - steps, max_reward)
+                        if bound < threshold:
+                            r += bound - episode_return
+                            episode_return, done = bound, True
+                            break
+                if n_chunk:
+                    self.callback.on_batch(self.env.history.cols, chunk[:n_chunk])
+                if self.callback is not None:
+                    self.callback.on_episode_end()
+                self.agent.observe(r, done)
 
-            if i == 0 or self.agent.has_worsened:
-                self.run_data['worst_env_plt'] = env_fig
-                self.run_data['worst_episode_idx'] = i
+                summary[i] = episode_return, steps, risk, time.perf_counter() - start
+                if i == 0 or self.agent.has_improved:
+                    self.run_data['best_episode_idx'] = i
+                if i == 0 or self.agent.has_worsened:
+                    self.run_data['worst_episode_idx'] = i
+        finally:
+            self.env.history, self.env.viz_mode = history, viz_mode
+        return summary
@@ -0,0 +1,304 @@
+"""
+Distributes the points of a sweep over several hosts.
+All hosts share a work queue stored in a SQLite database (e.g. on a shared filesystem),
+no additional service is required:
+
+- submit the points once: :code:`WorkQueue('queue.db').submit(grid(...))`
+- start workers on every host:
+  :code:`python -m openmodelica_microgrid_gym.execution.scheduler worker queue.db mymodule:experiment
+  --setup mymodule:setup`
+- collect the results in the format of Sweep:
+  :code:`python -m openmodelica_microgrid_gym.execution.scheduler export queue.db results.h5`
+
+Workers lease a task for a limited time and extend the lease by heartbeats while the experiment is running.
+Tasks of crashed workers are handed out again once their lease expired, failing tasks are retried up to max_attempts.
+Leases are compared to the clock of the hosts, which therefore should be synchronized.
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from importlib import import_module
+from multiprocessing import Process
+from typing import Iterable, Dict, Any, Optional, Tuple, Callable, List
+
+from openmodelica_microgrid_gym.execution.sweep import SweepExperiment, point_id, append_result, \
+    completed_points
+
+logger = logging.getLogger(__name__)
+
+
+def _jsonable(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v.item() if hasattr(v, 'item') else v for k, v in values.items()}
+
+
+class WorkQueue:
+    def __init__(self, path: str, lease_time: float = 600, max_attempts: int = 3):
+        """
+        Work queue stored in a SQLite database. Each process should use its own instance.
+
+        :param path: database file, created if needed
+        :param lease_time: seconds a task is reserved for a worker without heartbeat
+        :param max_attempts: number of executions of a task before it is marked as failed
+        """
+        self.path = path
+        self.lease_time = lease_time
+        self.max_attempts = max_attempts
+        with self._connect() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS tasks ('
+                        'id TEXT PRIMARY KEY, point TEXT NOT NULL, status TEXT NOT NULL, worker TEXT, '
+                        'lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, error TEXT, result TEXT, '
+                        'seq INTEGER)')
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            # exclusive write lock, released by COMMIT or ROLLBACK
+            con.execute('BEGIN IMMEDIATE')
+            try:
+                yield con
+            except BaseException:
+                con.execute('ROLLBACK')
+                raise
+            con.execute('COMMIT')
+        finally:
+            con.close()
+
+    def submit(self, points: Iterable[Dict[str, Any]]) -> int:
+        """
+        Adds tasks to the queue. Points already in the queue are ignored.
+
+        :param points: parameter sets, see Sweep
+        :return: number of added tasks
+        """
+        with self._connect() as con:
+            seq = con.execute('SELECT COALESCE(MAX(seq), 0) FROM tasks').fetchone()[0]
+            added = 0
+            for i, point in enumerate(points, start=seq + 1):
+                added += con.execute('INSERT OR IGNORE INTO tasks (id, point, status, seq) VALUES (?, ?, ?, ?)',
+                                     (point_id(point), json.dumps(_jsonable(point)), 'pending', i)).rowcount
+        return added
+
+    def acquire(self, worker: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Leases the next pending task or a task whose lease expired
+
+        :param worker: name of the worker
+        :return: task id and point, or None if there is no task left
+        """
+        now = time.time()
+        with self._connect() as con:
+            # tasks of crashed workers that already had all their attempts
+            con.execute("UPDATE tasks SET status = 'failed', error = 'lease expired' "
+                        "WHERE status = 'running' AND lease_until < ? AND attempts >= ?", (now, self.max_attempts))
+            row = con.execute("SELECT id, point FROM tasks WHERE status = 'pending' "
+                              "OR (status = 'running' AND lease_until < ?) ORDER BY seq LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE tasks SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                        "WHERE id = ?", (worker, now + self.lease_time, row[0]))
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, task_id: str, worker: str) -> bool:
+        """
+        Extends the lease of a task
+
+        :return: False if the worker does not hold the lease anymore
+        """
+        with self._connect() as con:
+            return con.execute("UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                               (time.time() + self.lease_time, task_id, worker)).rowcount == 1
+
+    def complete(self, task_id: str, result: Dict[str, Any]):
+        """
+        Stores the result of a task. If the task was executed twice (due to an expired lease), the first result is kept.
+        """
+        with self._connect() as con:
+            con.execute("UPDATE tasks SET status = 'done', result = ?, lease_until = NULL "
+                        "WHERE id = ? AND status != 'done'", (json.dumps(result), task_id))
+
+    def fail(self, task_id: str, worker: str, error: str):
+        """
+        Releases a failed task. It is handed out again unless it reached max_attempts.
+        """
+        with self._connect() as con:
+            con.execute("UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                        "error = ?, lease_until = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+                        (self.max_attempts, error, task_id, worker))
+
+    def status(self) -> Dict[str, int]:
+        """
+        Number of tasks by status (pending, running, done, failed)
+        """
+        with self._connect() as con:
+            counts = dict(con.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+        return {status: counts.get(status, 0) for status in ('pending', 'running', 'done', 'failed')}
+
+    def results(self) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Points and results of all completed tasks in the order of submission
+        """
+        with self._connect() as con:
+            rows = con.execute("SELECT point, result FROM tasks WHERE status = 'done' ORDER BY seq").fetchall()
+        return [(json.loads(point), json.loads(result)) for point, result in rows]
+
+    def export(self, results_file: str, key: str = 'results') -> int:
+        """
+        Appends the results of all completed tasks not yet contained in the results file, in the format of Sweep.
+        Results that do not match the table are logged and skipped.
+
+        :return: number of exported results
+        """
+        exported = completed_points(results_file, key)
+        n = 0
+        for point, result in self.results():
+            if point_id(point) not in exported:
+                try:
+                    append_result(results_file, key, point, result)
+                except ValueError:
+                    logger.exception(f'Exporting the result of {point} failed')
+                    continue
+                n += 1
+        return n
+
+
+class QueueWorker:
+    def __init__(self, queue: WorkQueue, experiment: SweepExperiment, setup: Optional[Callable[[], Any]] = None,
+                 name: Optional[str] = None, heartbeat_interval: Optional[float] = None):
+        """
+        Executes tasks of a work queue.
+        The resources (e.g. the environment including the loaded FMU) are built once and reused for all tasks.
+
+        :param queue: work queue
+        :param experiment: see SweepExperiment
+        :param setup: builds the resources passed to the experiment
+        :param name: name of the worker, defaults to host and process id
+        :param heartbeat_interval: seconds between two heartbeats, defaults to a third of the lease time
+        """
+        self.queue = queue
+        self.experiment = experiment
+        self.setup = setup
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.heartbeat_interval = heartbeat_interval or queue.lease_time / 3
+        self.resources = None
+        self._initialized = False
+
+    def _heartbeat(self, task_id: str, stop: threading.Event):
+        while not stop.wait(self.heartbeat_interval):
+            if not self.queue.heartbeat(task_id, self.name):
+                logger.warning(f'{self.name} lost the lease of task {task_id}')
+                return
+
+    def run_task(self, task_id: str, point: Dict[str, Any]):
+        """
+        Executes a single leased task and reports the result to the queue
+        """
+        if not self._initialized:
+            self.resources = self.setup() if self.setup is not None else None
+            self._initialized = True
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task_id, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.experiment(self.resources, **point)
+        except Exception as e:
+            logger.exception(f'Evaluation of {point} failed')
+            self.queue.fail(task_id, self.name, repr(e))
+        else:
+            self.queue.complete(task_id, _jsonable(result))
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    def run(self, max_tasks: Optional[int] = None, wait: bool = False, poll_interval: float = 10) -> int:
+        """
+        Executes tasks until the queue is empty
+
+        :param max_tasks: maximum number of tasks to execute
+        :param wait: if True, the worker waits for leases of other workers to expire or new tasks to be submitted
+         as long as not all tasks are done or failed
+        :param poll_interval: seconds between two attempts to acquire a task while waiting
+        :return: number of executed tasks
+        """
+        n = 0
+        while max_tasks is None or n < max_tasks:
+            task = self.queue.acquire(self.name)
+            if task is None:
+                status = self.queue.status()
+                if wait and status['pending'] + status['running'] > 0:
+                    time.sleep(poll_interval)
+                    continue
+                break
+            self.run_task(*task)
+            n += 1
+        return n
+
+
+def _run_queue_worker(path: str, experiment: SweepExperiment, setup: Optional[Callable[[], Any]], lease_time: float,
+                      max_attempts: int):
+    QueueWorker(WorkQueue(path, lease_time, max_attempts), experiment, setup).run()
+
+
+def run_local(queue: WorkQueue, experiment: SweepExperiment, setup: Optional[Callable[[], Any]] = None,
+              n_workers: Optional[int] = None):
+    """
+    Executes the tasks of a queue with several worker processes on this host
+
+    :param queue: work queue
+    :param experiment: picklable experiment, see SweepExperiment
+    :param setup: picklable function building the resources of a worker
+    :param n_workers: number of worker processes. Defaults to the number of CPUs.
+    """
+    processes = [Process(target=_run_queue_worker,
+                         args=(queue.path, experiment, setup, queue.lease_time, queue.max_attempts))
+                 for _ in range(n_workers or os.cpu_count())]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+
+def _resolve(name: str) -> Any:
+    module, attr = name.split(':')
+    return getattr(import_module(module), attr)
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Workers and maintenance of a sweep work queue')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    worker = commands.add_parser('worker', help='execute tasks of the queue')
+    worker.add_argument('queue', help='SQLite database of the queue')
+    worker.add_argument('experiment', help='experiment to execute as module:function')
+    worker.add_argument('--setup', help='function building the resources of the worker as module:function')
+    worker.add_argument('--processes', type=int, default=1, help='number of worker processes')
+    worker.add_argument('--lease-time', type=float, default=600, help='lease time of a task in seconds')
+    worker.add_argument('--max-attempts', type=int, default=3, help='number of executions of a failing task')
+
+    status = commands.add_parser('status', help='show the number of tasks by status')
+    status.add_argument('queue', help='SQLite database of the queue')
+
+    export = commands.add_parser('export', help='append the results to a HDF5 results file')
+    export.add_argument('queue', help='SQLite database of the queue')
+    export.add_argument('results_file', help='HDF5 results file')
+    export.add_argument('--key', default='results', help='key of the table in the results file')
+
+    args = parser.parse_args(args)
+    if args.command == 'worker':
+        run_local(WorkQueue(args.queue, args.lease_time, args.max_attempts), _resolve(args.experiment),
+                  _resolve(args.setup) if args.setup else None, args.processes)
+    elif args.command == 'status':
+        print(WorkQueue(args.queue).status())
+    else:
+        print(f'exported {WorkQueue(args.queue).export(args.results_file, args.key)} results')
+
+
+if __name__ == '__main__':
+    main()
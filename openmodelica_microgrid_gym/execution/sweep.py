@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+logger = logging.getLogger(__name__)
+
+SweepExperiment = Callable[..., Dict[str, Any]]
+"""
+Callable executing the experiment of one point of a sweep: experiment(resources, \\*\\*point) -> results.
+The resources are built once per worker process by the setup function of the sweep (None if there is none).
+The results must be a flat dictionary of scalars.
+It is executed in the worker processes, hence it must be picklable (e.g. a function defined on module level).
+"""
+
+
+def grid(**axes: Iterable) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of the values of all axes
+
+    >>> grid(a=[1, 2], b=['x'])
+    [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]
+
+    :param axes: mapping of parameter names to their values
+    :return: list of points
+    """
+    names = list(axes.keys())
+    return [dict(zip(names, values)) for values in product(*axes.values())]
+
+
+def random_points(n: int, seed: int = 0, **samplers: Callable[[np.random.Generator], Any]) -> List[Dict[str, Any]]:
+    """
+    Randomly sampled points, e.g. random_points(10, len_kp=lambda rng: rng.uniform(1e-3, 1e-2))
+
+    :param n: number of points
+    :param seed: seed of the random generator, the same seed yields the same points
+    :param samplers: mapping of parameter names to functions drawing a value from the passed random generator
+    :return: list of points
+    """
+    rng = np.random.default_rng(seed)
+    return [{name: sampler(rng) for name, sampler in samplers.items()} for _ in range(n)]
+
+
+def point_id(point: Dict[str, Any]) -> str:
+    """
+    Identifier of a point, used to recognize completed points when resuming a sweep
+    """
+
+    def default(v):
+        # numpy scalars are identified by their value
+        return v.item() if isinstance(v, np.generic) else repr(v)
+
+    return hashlib.sha1(json.dumps(point, sort_keys=True, default=default).encode()).hexdigest()[:16]
+
+
+def _column_value(value: Any) -> Any:
+    # the column types of the results table must not change between the appends
+    if isinstance(value, (bool, np.bool_, str)):
+        return value
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    return repr(value)
+
+
+def completed_points(results_file: str, key: str) -> Set[str]:
+    """
+    Ids of the points contained in a HDF5 results table
+
+    :param results_file: HDF5 file
+    :param key: key of the table
+    :return: set of point ids
+    """
+    if not os.path.isfile(results_file):
+        return set()
+    try:
+        return set(pd.read_hdf(results_file, key, columns=['point_id'])['point_id'])
+    except KeyError:
+        return set()
+
+
+def append_result(results_file: str, key: str, point: Dict[str, Any], result: Dict[str, Any],
+                  string_size: int = 256):
+    """
+    Appends the result of a point to a HDF5 table.
+    Each row contains the parameters of the point, the results of the experiment and the point id.
+    The columns of the table are fixed by the first appended row.
+
+    :param results_file: HDF5 file
+    :param key: key of the table
+    :param point: parameters of the point
+    :param result: flat dictionary of scalar results
+    :param string_size: maximum length of the string values, fixed when the table is created
+    :raises ValueError: if the columns do not match the table or a string is longer than string_size
+    """
+    row = {k: _column_value(v) for k, v in {**point, **result, 'point_id': point_id(point)}.items()}
+    if os.path.isfile(results_file):
+        with pd.HDFStore(results_file, mode='r') as store:
+            columns = list(store.select(key, stop=0).columns) if key in store else None
+        if columns is not None and set(columns) != set(row):
+            raise ValueError(f'The columns {sorted(row)} do not match the columns {sorted(columns)} of the table '
+                             f'"{key}" in {results_file}')
+    min_itemsize = {k: string_size for k, v in row.items() if isinstance(v, str)}
+    pd.DataFrame([row]).to_hdf(results_file, key=key, format='table', append=True, min_itemsize=min_itemsize,
+                               index=False)
+
+
+_resources = None
+"""Worker local resources, set by _init_worker() in every process of the pool"""
+
+
+def _init_worker(setup: Optional[Callable[[], Any]]):
+    global _resources
+    _resources = setup() if setup is not None else None
+
+
+def _run_point(experiment: SweepExperiment, point: Dict[str, Any]) -> Dict[str, Any]:
+    return experiment(_resources, **point)
+
+
+class Sweep:
+    def __init__(self, experiment: SweepExperiment, points: Iterable[Dict[str, Any]], results_file: str,
+                 setup: Optional[Callable[[], Any]] = None, n_workers: Optional[int] = None, key: str = 'results',
+                 string_size: int = 256):
+        """
+        Executes an experiment for many points of a parameter space in worker processes.
+        Expensive objects like the environment (including the loaded FMU) or the network can be built once per worker
+        by the setup function and are passed to every experiment executed by this worker.
+
+        The results are appended to a HDF5 table as soon as a point is finished.
+        Each row contains the parameters of the point, the results of the experiment and the point id.
+        Points already contained in the results file are skipped, hence an interrupted sweep can simply be restarted.
+
+        :param experiment: see SweepExperiment
+        :param points: parameter sets to evaluate, e.g. created by grid() or random_points()
+        :param results_file: HDF5 file the results are stored in
+        :param setup: picklable callable building the resources of a worker process
+        :param n_workers: number of worker processes. Defaults to the number of CPUs.
+        :param key: key of the table in the results file
+        :param string_size: maximum length of the string values in the results file, see append_result()
+        """
+        self.experiment = experiment
+        self.points = list(points)
+        self.results_file = results_file
+        self.setup = setup
+        self.n_workers = n_workers or os.cpu_count()
+        self.key = key
+        self.string_size = string_size
+
+    def completed(self) -> Set[str]:
+        """
+        Ids of the points already contained in the results file
+        """
+        return completed_points(self.results_file, self.key)
+
+    def results(self) -> pd.DataFrame:
+        """
+        All results stored in the results file
+        """
+        if not os.path.isfile(self.results_file):
+            return pd.DataFrame()
+        return pd.read_hdf(self.results_file, self.key)
+
+    def append(self, point: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Appends the result of a point to the results file
+        """
+        append_result(self.results_file, self.key, point, result, self.string_size)
+
+    def run(self) -> pd.DataFrame:
+        """
+        Evaluates all points that are not completed yet.
+        Failing points and results that can not be stored are logged and skipped,
+        they are retried when the sweep is run again.
+
+        :return: all results, see results()
+        """
+        completed = self.completed()
+        pending = [point for point in self.points if point_id(point) not in completed]
+        logger.info(f'{len(self.points) - len(pending)} of {len(self.points)} points are already completed')
+
+        failed = 0
+        if pending:
+            with ProcessPoolExecutor(self.n_workers, initializer=_init_worker, initargs=(self.setup,)) as pool:
+                futures = {pool.submit(_run_point, self.experiment, point): point for point in pending}
+                for future in tqdm(as_completed(futures), total=len(futures), desc='sweep', unit='point'):
+                    point = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception:
+                        logger.exception(f'Evaluation of {point} failed')
+                        failed += 1
+                        continue
+                    try:
+                        self.append(point, result)
+                    except Exception:
+                        logger.exception(f'Storing the result of {point} failed')
+                        failed += 1
+        if failed:
+            logger.warning(f'{failed} points failed, run the sweep again to retry them')
+
+        return self.results()
@@ -1,3 +1,4 @@
+from copy import deepcopy
 from importlib import import_module
 from typing import List, Dict, Optional, Union, Tuple
 
@@ -172,6 +173,8 @@ class Network:
         self.ts = float(ts)
         self.v_nom = ne.evaluate(str(v_nom))
         self.freq_nom = freq_nom
+        self.config = None  # type: Optional[dict]
+        """configuration the network was loaded from, see load()"""
 
     @staticmethod
     def _validate_load_data(data):
@@ -193,8 +196,9 @@ class Network:
 
         .. code-block:: text
 
-            conf::             *net_params* *components*
+            conf::             *net_params* *components* [*model*]
             net_params::       <parameters passed to Network.__init__()>
+            model::            <optional circuit simulated by the NumpyModel, see omg.env.numpy_model>
             components::       components:
                                  *component*
                                  ...
@@ -217,8 +221,11 @@ class Network:
         data = yaml.safe_load(open(configurl))
         if not cls._validate_load_data(data):
             raise ValueError(f'loading {configurl} failed due to validation')
+        config = deepcopy(data)
         components = data['components']
         del data['components']
+        # circuit of the NumpyModel, see omg.env.numpy_model
+        data.pop('model', None)
         self = cls(**data)
 
         components_obj = []
@@ -240,6 +247,7 @@ class Network:
             except AttributeError as e:
                 raise AttributeError(f'{e!s}, please validate {configurl}')
         self.components = components_obj
+        self.config = config
 
         return self
 
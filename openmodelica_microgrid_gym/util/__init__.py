@@ -1,12 +1,19 @@
-from .fastqueue import Fastqueue
-from .itertools_ import nested_map, fill_params, nested_depth, flatten, flatten_together
-from .obs_template import ObsTempl
-from .randproc import RandProcess
-from .recorder import EmptyHistory, SingleHistory, FullHistory
-from .transforms import abc_to_alpha_beta, normalise_abc, abc_to_dq0_cos_sin, dq0_to_abc_cos_sin, abc_to_dq0, cos_sin, \
-    dq0_to_abc, inst_power, inst_reactive, inst_rms, dq0_to_abc_cos_sin_power_inv
+from .lazy import lazy_attributes
 
 __all__ = ['abc_to_alpha_beta', 'normalise_abc', 'abc_to_dq0_cos_sin', 'dq0_to_abc_cos_sin', 'abc_to_dq0',
            'cos_sin', 'dq0_to_abc', 'inst_power', 'inst_reactive', 'inst_rms', 'dq0_to_abc_cos_sin_power_inv',
            'nested_map', 'fill_params', 'nested_depth', 'flatten', 'flatten_together',
-           'EmptyHistory', 'SingleHistory', 'FullHistory', 'Fastqueue', 'RandProcess', 'ObsTempl']
+           'EmptyHistory', 'SingleHistory', 'FullHistory', 'Fastqueue', 'DelayLine', 'RunningSum',
+           'RandProcess', 'ObsTempl']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    **{name: '.transforms' for name in ['abc_to_alpha_beta', 'normalise_abc', 'abc_to_dq0_cos_sin',
+                                        'dq0_to_abc_cos_sin', 'abc_to_dq0', 'cos_sin', 'dq0_to_abc', 'inst_power',
+                                        'inst_reactive', 'inst_rms', 'dq0_to_abc_cos_sin_power_inv']},
+    **{name: '.itertools_' for name in ['nested_map', 'fill_params', 'nested_depth', 'flatten', 'flatten_together']},
+    **{name: '.recorder' for name in ['EmptyHistory', 'SingleHistory', 'FullHistory']},
+    'Fastqueue': '.fastqueue',
+    'DelayLine': '.delay_line',
+    'RunningSum': '.delay_line',
+    'RandProcess': '.randproc',
+    'ObsTempl': '.obs_template'})
@@ -0,0 +1,72 @@
+"""
+Decimation of long time series for plotting.
+Both methods keep the first and last sample and select a subset of the samples, such that the plot looks the same
+while the number of drawn points is bounded:
+
+- 'minmax': the minimum and maximum of each bucket (per pixel), which preserves all spikes
+- 'lttb': largest triangle three buckets, which preserves the visual shape with a single point per bucket
+"""
+import numpy as np
+
+decimation_methods = {'minmax', 'lttb'}
+"""Set of all valid decimation methods"""
+
+
+def _minmax(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    size = int(np.ceil(len(y) / n_buckets))
+    n_buckets = int(np.ceil(len(y) / size))
+    # the last bucket is padded with its last value
+    buckets = np.pad(y, (0, n_buckets * size - len(y)), mode='edge').reshape(n_buckets, size)
+    offset = np.arange(n_buckets) * size
+    idx = np.concatenate([offset + np.argmin(buckets, axis=1), offset + np.argmax(buckets, axis=1)])
+    return np.minimum(idx, len(y) - 1)
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    # the first and last sample form their own buckets
+    edges = np.linspace(1, len(y) - 1, n_buckets + 1).astype(int)
+    idx = np.empty(n_buckets, dtype=int)
+    prev = 0
+    for b in range(n_buckets):
+        start, stop = edges[b], edges[b + 1]
+        # the third vertex is the average of the next bucket
+        if b + 1 < n_buckets:
+            next_x, next_y = x[stop:edges[b + 2]].mean(), y[stop:edges[b + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[prev] - next_x) * (y[start:stop] - y[prev]) - (x[prev] - x[start:stop]) * (next_y - y[prev]))
+        prev = start + np.argmax(area)
+        idx[b] = prev
+    return idx
+
+
+def decimate(x: np.ndarray, y: np.ndarray, max_points: int, method: str = 'minmax') -> np.ndarray:
+    """
+    Selects the samples to plot from one or several time series with common x values
+
+    :param x: x values (e.g. time) of shape (T,)
+    :param y: values of shape (T,) or (T, series). For several series the union of the selected samples is returned,
+     hence they can still be plotted over a common x axis.
+    :param max_points: number of points per series
+    :param method: 'minmax' or 'lttb'
+    :return: sorted indices of the selected samples
+    """
+    if method not in decimation_methods:
+        raise ValueError(f'Please select one of the following decimation methods: {decimation_methods}')
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    selected = [np.array([0, n - 1])]
+    for series in y.T:
+        # NaN values (e.g. of aborted episodes) are not plotted anyway
+        series = np.nan_to_num(series, nan=0, posinf=0, neginf=0)
+        if method == 'minmax':
+            selected.append(_minmax(series, max(1, (max_points - 2) // 2)))
+        else:
+            selected.append(_lttb(x, series, max_points - 2))
+    return np.unique(np.concatenate(selected))
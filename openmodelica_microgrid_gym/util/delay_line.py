@@ -0,0 +1,131 @@
+from typing import Optional
+
+import numpy as np
+
+
+class DelayLine:
+    def __init__(self, delay: int, dim: int = 1):
+        """
+        Ring buffer delaying a signal by a fixed number of samples.
+        The buffer is initialized with zeros, the first delay samples that are shifted out are zeros.
+
+        :param delay: number of samples a value stays in the buffer
+        :param dim: dimension of the samples
+        """
+        if delay < 0:
+            raise ValueError('the delay must not be negative')
+        self._delay, self._dim = delay, dim
+        # one additional slot, the popped sample stays valid until the next push
+        self._buffer = np.zeros((delay + 1, dim))
+        self._head = 0
+
+    def __len__(self):
+        return self._delay
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def clear(self):
+        self._buffer[:] = 0
+        self._head = 0
+
+    def shift(self, val, copy: bool = True) -> np.ndarray:
+        """
+        Pushes val into the buffer and returns the sample pushed delay samples before
+
+        :param val: sample of dimension dim
+        :param copy: if False, a view into the buffer is returned that is only valid until the next push
+        :return: delayed sample
+        """
+        buffer = self._buffer
+        buffer[self._head] = val
+        self._head += 1
+        if self._head == len(buffer):
+            self._head = 0
+        # the oldest sample is stored in the next slot
+        return buffer[self._head].copy() if copy else buffer[self._head]
+
+    def shift_batch(self, values, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Pushes k samples at once, equivalent to calling shift() for every sample
+
+        :param values: array of shape (k, dim)
+        :param out: optional array of shape (k, dim) the delayed samples are written to
+        :return: delayed samples of shape (k, dim)
+        """
+        values = np.asarray(values).reshape(-1, self._dim)
+        k, size = len(values), len(self._buffer)
+        if out is None:
+            out = np.empty((k, self._dim))
+        # the first samples are still in the buffer, the rest is taken from the values
+        m = min(k, self._delay)
+        out[:m] = self._buffer[(self._head + 1 + np.arange(m)) % size]
+        out[m:] = values[:k - m]
+        # only the last samples fit into the buffer
+        n = min(k, size)
+        self._buffer[(self._head + np.arange(k - n, k)) % size] = values[k - n:]
+        self._head = (self._head + k) % size
+        return out
+
+    @property
+    def samples(self) -> np.ndarray:
+        """
+        Samples in the buffer from the oldest to the latest
+        """
+        return np.roll(self._buffer, -self._head - 1, axis=0)[:self._delay]
+
+
+class RunningSum:
+    def __init__(self, window: int, dim: int = 1):
+        """
+        Sum of the last window samples, updated by adding the pushed and subtracting the popped sample.
+        The sum is recalculated from the buffer once per window to avoid the accumulation of rounding errors.
+
+        :param window: number of summed samples
+        :param dim: dimension of the samples
+        """
+        self._line = DelayLine(window, dim)
+        self.sum = np.zeros(dim)
+        self._count = 0
+
+    def __len__(self):
+        return len(self._line)
+
+    def clear(self):
+        self._line.clear()
+        self.sum[:] = 0
+        self._count = 0
+
+    def add(self, val) -> np.ndarray:
+        """
+        Adds a sample to the window
+
+        :return: sum of the window, the array is updated in place by the next call
+        """
+        self.sum += val
+        self.sum -= self._line.shift(val, copy=False)
+        self._count += 1
+        if self._count >= len(self._line):
+            self._resync()
+        return self.sum
+
+    def add_batch(self, values) -> np.ndarray:
+        """
+        Adds k samples at once
+
+        :param values: array of shape (k, dim)
+        :return: sums of the window after every sample, array of shape (k, dim)
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, self._line.dim)
+        sums = np.cumsum(values - self._line.shift_batch(values), axis=0)
+        sums += self.sum
+        self.sum[:] = sums[-1]
+        self._count += len(values)
+        if self._count >= len(self._line):
+            self._resync()
+        return sums
+
+    def _resync(self):
+        self.sum[:] = self._line.samples.sum(axis=0)
+        self._count = 0
@@ -0,0 +1,33 @@
+"""
+Lazy attributes of packages (PEP 562).
+The public classes of a package are imported from their submodules on first access, hence importing the package does
+not import heavy dependencies (GPy, safeopt, matplotlib, scipy, pandas) that are not used.
+"""
+from importlib import import_module
+from typing import Dict, Callable, Any, List, Tuple
+
+
+def lazy_attributes(package: str, attributes: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Creates the module level __getattr__ and __dir__ of a package:
+
+    >>> __getattr__, __dir__ = lazy_attributes(__name__, {'Runner': '.runner'})
+
+    :param package: name of the package
+    :param attributes: mapping of the attribute names to the (relative) names of the modules defining them
+    :return: __getattr__ and __dir__ functions
+    """
+    namespace = import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        value = getattr(import_module(attributes[name], package), name)
+        # later accesses do not call __getattr__ anymore
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
@@ -0,0 +1,155 @@
+"""
+Control performance metrics evaluated for many episodes at once.
+
+All metrics take the trajectories of a quantity as array of shape (episodes, T) or (episodes, T, channels)
+and the reference values as scalar or array broadcastable to (episodes,) or (episodes, channels) respectively.
+The results have the shape (episodes,) or (episodes, channels).
+Overshoot and rise time are evaluated in the direction of the reference, hence they also work for negative references.
+"""
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+
+def _prepare(y: np.ndarray, ref: ArrayLike) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    :return: y of shape (episodes, T, channels), ref of shape (episodes, 1, channels) and whether channels were given
+    """
+    y = np.asarray(y, dtype=float)
+    if y.ndim not in (2, 3):
+        raise ValueError(f'The trajectories must have the shape (episodes, T) or (episodes, T, channels), '
+                         f'not {y.shape}')
+    has_channels = y.ndim == 3
+    if not has_channels:
+        y = y[:, :, None]
+    ref = np.asarray(ref, dtype=float)
+    if not has_channels:
+        ref = ref[..., None]
+    ref = np.broadcast_to(ref, (y.shape[0], y.shape[2]))[:, None, :]
+    return y, ref, has_channels
+
+
+def _result(values: np.ndarray, has_channels: bool) -> np.ndarray:
+    return values if has_channels else values[:, 0]
+
+
+def _first_index(mask: np.ndarray) -> np.ndarray:
+    """
+    Index of the first True value along the time axis, NaN if there is none
+    """
+    idx = np.argmax(mask, axis=1).astype(float)
+    idx[~mask.any(axis=1)] = np.nan
+    return idx
+
+
+def overshoot(y: np.ndarray, ref: ArrayLike, end: Optional[int] = None) -> np.ndarray:
+    """
+    Relative overshoot of the peak beyond the reference. 0 if the reference is not exceeded, NaN for a zero reference.
+
+    :param y: trajectories
+    :param ref: reference values
+    :param end: only the steps before this index are considered, e.g. the step of a load change
+    :return: overshoot
+    """
+    y, ref, has_channels = _prepare(y, ref)
+    sign = np.where(ref < 0, -1., 1.)
+    peak = np.nanmax(sign * y[:, :end], axis=1)
+    ref = np.abs(ref[:, 0])
+    # the overshoot relative to a zero reference (e.g. the q component) is not defined
+    defined = ref != 0
+    relative = np.divide(peak, ref, out=np.full(peak.shape, np.nan), where=defined)
+    return _result(np.maximum(relative - 1, 0, out=relative, where=defined), has_channels)
+
+
+def rise_time(y: np.ndarray, ref: ArrayLike, ts: float, low: float = .1, high: float = .9) -> np.ndarray:
+    """
+    Time between the first crossing of low * ref and the first crossing of high * ref.
+    NaN if high * ref is never reached.
+
+    :param y: trajectories
+    :param ref: reference values
+    :param ts: time step size
+    :param low: lower fraction of the reference
+    :param high: upper fraction of the reference
+    :return: rise time in seconds
+    """
+    y, ref, has_channels = _prepare(y, ref)
+    sign = np.where(ref < 0, -1., 1.)
+    y, ref = sign * y, np.abs(ref)
+    return _result((_first_index(y >= high * ref) - _first_index(y >= low * ref)) * ts, has_channels)
+
+
+def settling_time(y: np.ndarray, ref: ArrayLike, ts: float, tolerance: float = .02,
+                  end: Optional[int] = None) -> np.ndarray:
+    """
+    Time after which the trajectory stays within the tolerance band around the reference.
+    NaN if the trajectory is outside of the band at the last considered step.
+
+    :param y: trajectories
+    :param ref: reference values
+    :param ts: time step size
+    :param tolerance: relative half width of the tolerance band
+    :param end: only the steps before this index are considered, e.g. the step of a load change
+    :return: settling time in seconds
+    """
+    y, ref, has_channels = _prepare(y, ref)
+    outside = ~(np.abs(y[:, :end] - ref) <= tolerance * np.abs(ref))
+    n = outside.shape[1]
+    # index of the last step outside of the band, searched from the end
+    last_outside = n - 1 - np.argmax(outside[:, ::-1], axis=1)
+    settled = np.where(outside.any(axis=1), last_outside + 1, 0).astype(float)
+    settled[outside[:, -1]] = np.nan
+    return _result(settled * ts, has_channels)
+
+
+def rmse(y: np.ndarray, ref: ArrayLike) -> np.ndarray:
+    """
+    Root mean squared error between trajectory and reference, NaN values are ignored
+
+    :param y: trajectories
+    :param ref: reference values
+    :return: RMSE
+    """
+    y, ref, has_channels = _prepare(y, ref)
+    return _result(np.sqrt(np.nanmean((y - ref) ** 2, axis=1)), has_channels)
+
+
+def steady_state_error(y: np.ndarray, ref: ArrayLike) -> np.ndarray:
+    """
+    Absolute deviation from the reference at the last step
+
+    :param y: trajectories
+    :param ref: reference values
+    :return: steady state error
+    """
+    y, ref, has_channels = _prepare(y, ref)
+    return _result(np.abs(ref[:, 0] - y[:, -1]), has_channels)
+
+
+def absolute_peak(y: np.ndarray) -> np.ndarray:
+    """
+    Maximum absolute value of the trajectory, NaN values are ignored
+
+    :param y: trajectories
+    :return: absolute peak
+    """
+    return np.nanmax(np.abs(np.asarray(y, dtype=float)), axis=1)
+
+
+def control_metrics(y: np.ndarray, ref: ArrayLike, ts: float, tolerance: float = .02,
+                    end: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Calculates all metrics
+
+    :param y: trajectories
+    :param ref: reference values
+    :param ts: time step size
+    :param tolerance: relative half width of the tolerance band of the settling time
+    :param end: only the steps before this index are considered for overshoot and settling time
+    :return: mapping of the metric names to their values
+    """
+    return dict(overshoot=overshoot(y, ref, end), rise_time=rise_time(y, ref, ts),
+                settling_time=settling_time(y, ref, ts, tolerance, end), rmse=rmse(y, ref),
+                steady_state_error=steady_state_error(y, ref), absolute_peak=absolute_peak(y))
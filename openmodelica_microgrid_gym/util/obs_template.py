@@ -4,10 +4,14 @@ from openmodelica_microgrid_gym.agents.util import MutableParams
 
 
 class ObsTempl:
-    def __init__(self, varnames: List[str], simple_tmpl: Optional[List[Union[List[str], np.ndarray]]]):
+    def __init__(self, varnames: List[str], simple_tmpl: Optional[List[Union[List[str], np.ndarray]]],
+                 reuse_buffer: bool = False):
         """
         Internal dataclass to handle the conversion of dynamic observation templates for the StaticControlAgent
 
+        The indices of all dynamic values are compiled into a single index array, hence fill() gathers all values at
+        once and splits them into views.
+
         :param varnames: list of variable names
         :param simple_tmpl: list of:
                 - list of strings
@@ -18,21 +22,39 @@ class ObsTempl:
                 - np.array of floats (to be passed statically to the controller)
                 - a mixture of static and dynamic values in one parameter is not supported for performance reasons.
                 If None: self.fill() will not filter and return its input wrapped into a list
+        :param reuse_buffer: if True, fill() gathers the values into a preallocated buffer and always returns the same
+            list of views into it. The returned values are only valid until the next call.
         """
         idx = {v: i for i, v in enumerate(varnames)}
-        self._static_params = set()
-        self._data = []
         self.is_tmpl_empty = simple_tmpl is None
+        self.reuse_buffer = reuse_buffer
+        indices = []
+        # every entry is either a slice of the gathered values or a static parameter
+        self._entries = []  # type: List[Union[slice, np.ndarray, MutableParams]]
+        self._dynamic = []  # type: List[int]
 
         if not self.is_tmpl_empty:
             for i, tmpl in enumerate(simple_tmpl):
                 if isinstance(tmpl, np.ndarray) or isinstance(tmpl, MutableParams):
                     # all np.ndarrays are considered static parameters
-                    self._static_params.add(i)
-                    self._data.append(tmpl)
+                    self._entries.append(tmpl)
                 else:
-                    # else we save the indices of the variables into an indexarray
-                    self._data.append(np.array([idx[varname] for varname in tmpl]))
+                    # else we save the indices of the variables into the index array
+                    start = len(indices)
+                    indices.extend(idx[varname] for varname in tmpl)
+                    self._entries.append(slice(start, len(indices)))
+                    self._dynamic.append(i)
+        self._idx = np.array(indices, dtype=np.intp)
+        # a template with a single dynamic entry needs no splitting
+        self._single = self._dynamic == [0] and len(self._entries) == 1
+        self._buffer = None  # type: Optional[np.ndarray]
+        self._params = None  # type: Optional[List]
+
+    def _split(self, values: np.ndarray) -> List:
+        params = self._entries.copy()
+        for i in self._dynamic:
+            params[i] = values[..., params[i]]
+        return params
 
     def fill(self, obs: np.ndarray) -> List[np.ndarray]:
         """
@@ -43,8 +65,23 @@ class ObsTempl:
         """
         if self.is_tmpl_empty:
             return [obs]
-        params = []
-        for i, arr in enumerate(self._data):
-            # append static data or use dynamic data with indexing
-            params.append(arr if i in self._static_params else obs[arr])
-        return params
+        # for the small observations, indexing has less overhead than np.take()
+        if not self.reuse_buffer:
+            values = obs[self._idx]
+            return [values] if self._single else self._split(values)
+        if self._buffer is None or self._buffer.dtype != obs.dtype:
+            self._buffer = np.empty(len(self._idx), dtype=obs.dtype)
+            self._params = self._split(self._buffer)
+        self._buffer[...] = obs[self._idx]
+        return self._params
+
+    def fill_batch(self, obs: np.ndarray) -> List[np.ndarray]:
+        """
+        generates the parameters for a batch of observations, e.g. of vectorised environments
+
+        :param obs: np.ndarray of shape (N, n)
+        :return: list of parameters, the dynamic values have the shape (N, m), the static values are not repeated
+        """
+        if self.is_tmpl_empty:
+            return [obs]
+        return self._split(obs[..., self._idx])
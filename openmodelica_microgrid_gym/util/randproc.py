@@ -1,56 +1,156 @@
-from typing import Type
+from functools import partial
+from types import ModuleType
+from typing import Optional, Type, List, Any
 
 import numpy as np
+from scipy.signal import lfilter
 from stochastic.processes import DiffusionProcess
 from stochastic.processes.base import BaseProcess
 
 
 class RandProcess:
-    def __init__(self, process_cls: Type[BaseProcess], proc_kwargs=None, bounds=None, initial=0):
+    def __init__(self, process_cls: Type[BaseProcess], proc_kwargs=None, bounds=None, initial=0,
+                 ts: Optional[float] = None, horizon: int = 1000, seed=None):
         """
         wrapper around stochastic processes to allow easier integration
 
+        The path of an episode is drawn at once on the time grid k * ts and sample() only looks up the values.
+        Changes of the parameters of the process (e.g. self.proc.mean) take effect with the next reserve or reset.
+
         :param process_cls: class of the stochastic process
         :param proc_kwargs: arguments passed to the class on initialization
         :param bounds: boundaries of admissible values
         :param initial: starting value of the process
-        :param gain: scale of the process output (of not set, results are between the clipped bounds)
+        :param ts: sampling time of the path, if not set the time of the first sample after the start is used
+        :param horizon: number of steps drawn at once, the path is extended by this number of steps if needed
+        :param seed: seed of the random number generator, the same seed results in the same sequence of paths
         """
         self.proc = process_cls(**(proc_kwargs or {}))
         if bounds is None:
             self.bounds = (-np.inf, np.inf)
         else:
             self.bounds = bounds
+        self.ts = ts
+        # sampling time of the path, inferred by the first sample() if ts is not set
+        self._ts = ts
+        self.horizon = horizon
+        self._rng = np.random.default_rng(seed)
+        self.proc.rng = self._rng
 
-        # will contain the previous value, hence initialized accordingly
-        self._last = initial
+        self._initial = initial
         self._last_t = 0
         self._reserve = None
+        # unclipped path of the process, the noise it is calculated from and the clipped values returned by sample()
+        self._path = None  # type: Optional[np.ndarray]
+        self._noise = None  # type: Optional[np.ndarray]
+        self._values = None  # type: Optional[np.ndarray]
+
+    def reset(self, initial=None, seed=None):
+        """
+        Starts a new path
 
-    def reset(self, initial):
-        self._last = initial
+        :param initial: starting value of the process, if not set the previous starting value is used
+        :param seed: reseeds the random number generator, e.g. to draw the same path in several workers
+        """
+        if initial is not None:
+            self._initial = initial
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+            self.proc.rng = self._rng
         self._last_t = 0
         self._reserve = None
+        self._path = self._noise = self._values = None
 
     def sample(self, t):
         """
-        calculates time differential and calculates the change in the outputs of the process
+        looks up the value of the process at the timestep
         :param t: timestep
         :return: value at the timestep
         """
-        # if not initial actually sample from processes otherwise return initial value
-        if t != self._last_t and t >= 0:
-            if self.reserve is not None:
-                self._last = self.reserve
-                self.reserve = None
-            self.proc.t = t - self._last_t
-            self._last_t = t
-            if isinstance(self.proc, DiffusionProcess):
-                self._last = np.clip(self.proc.sample(1, initial=self._last)[-1], *self.bounds).squeeze()
-            else:
-                self._last = np.clip(self._last + self.proc.sample(1)[-1], *self.bounds).squeeze()
+        # the initial value is returned before the start
+        if t <= 0:
+            return self._initial
+        if self._ts is None:
+            self._ts = t - self._last_t
+        self._last_t = t
+        k = int(round(t / self._ts))
+        if self._path is None:
+            self._path = np.array([self._initial], dtype=float)
+            self._noise = np.empty(0)
+        if k >= len(self._path):
+            self._extend(max(self.horizon, k + 1 - len(self._path)))
+        if self.reserve is not None:
+            # the process continues from the reserve in the previous step
+            self._redraw(k, self.reserve)
+            self.reserve = None
+        return self._values[k]
 
-        return self._last
+    def _linear(self) -> bool:
+        """
+        Diffusion processes with volatility exponent 0 (e.g. Vasicek, Ornstein-Uhlenbeck) are linear in the state
+        and are calculated from the stored noise
+        """
+        return isinstance(self.proc, DiffusionProcess) and self.proc.volexp(0) == 0 and self.proc.volexp(1) == 0
+
+    def _draw(self, x0: float, start: int, stop: int, noise: Optional[np.ndarray] = None):
+        """
+        Calculates the path from step start to step stop
+
+        :param x0: value at step start
+        :param noise: noise of the steps, drawn if not provided
+        :return: values at the steps start + 1 ... stop and the noise
+        """
+        n = stop - start
+        if isinstance(self.proc, DiffusionProcess):
+            if not self._linear():
+                self.proc.t = n * self._ts
+                return self.proc.sample(n, initial=x0)[1:], np.empty(n)
+            # Euler-Maruyama: x[k+1] = (1 - speed dt) x[k] + speed mean dt + vol dW
+            if noise is None:
+                noise = self._rng.normal(scale=np.sqrt(self._ts), size=n)
+            t = self._ts * np.arange(start + 1, stop + 1)
+            speed, mean, vol = (np.array([f(t_) for t_ in t], dtype=float)
+                                for f in (self.proc.speed, self.proc.mean, self.proc.vol))
+            a = 1 - speed * self._ts
+            b = speed * mean * self._ts + vol * noise
+            if np.all(a == a[0]):
+                return lfilter([1], [1, -a[0]], b, zi=[a[0] * x0])[0], noise
+            x = np.empty(n)
+            for k in range(n):
+                x0 = x[k] = a[k] * x0 + b[k]
+            return x, noise
+
+        # the process is accumulated from its increments
+        if noise is None:
+            self.proc.t = n * self._ts
+            increments = self.proc.sample(n)
+            noise = np.diff(increments) if len(increments) > n else increments
+        return x0 + np.cumsum(noise), noise
+
+    def _extend(self, n: int):
+        stop = len(self._path) - 1 + n
+        x, noise = self._draw(self._path[-1], len(self._path) - 1, stop)
+        self._path = np.concatenate([self._path, x])
+        self._noise = np.concatenate([self._noise, noise])
+        self._values = np.clip(self._path, *self.bounds)
+
+    def _redraw(self, k: int, x0: float):
+        """
+        Replaces the value at step k - 1 and recalculates the following steps with the current parameters.
+        Linear processes reuse the drawn noise, hence the jump is overlaid on the path.
+        """
+        stop = len(self._path) - 1
+        noise = self._noise[k - 1:] if self._linear() or not isinstance(self.proc, DiffusionProcess) else None
+        self._path[k:], self._noise[k - 1:] = self._draw(x0, k - 1, stop, noise)
+        self._path[k - 1] = x0
+        self._values[k - 1:] = np.clip(self._path[k - 1:], *self.bounds)
+
+    @property
+    def sampling_time(self) -> Optional[float]:
+        """
+        Sampling time of the path, ts or the time inferred by the first sample if ts is not set
+        """
+        return self._ts
 
     @property
     def reserve(self):
@@ -62,3 +162,52 @@ class RandProcess:
     @reserve.setter
     def reserve(self, v):
         self._reserve = v
+
+
+def find_rand_processes(*objs: Any, max_depth: int = 4) -> List[RandProcess]:
+    """
+    Random processes referenced by callables like the model parameters of the environment.
+    The bound objects of methods, the arguments of partials, the closures, defaults and used global names of functions
+    and the attributes of objects are searched. The processes are returned in the order they are found.
+
+    :param objs: objects to search
+    :param max_depth: maximum number of references followed from the passed objects
+    :return: list of processes without duplicates
+    """
+    found, seen = [], set()
+
+    def names(code) -> List[str]:
+        # global names used by the function and the functions defined inside of it
+        return list(code.co_names) + [n for c in code.co_consts if hasattr(c, 'co_names') for n in names(c)]
+
+    def visit(obj, depth: int):
+        if id(obj) in seen or depth > max_depth or isinstance(obj, (type, ModuleType, str, bytes, np.ndarray)):
+            return
+        seen.add(id(obj))
+        if isinstance(obj, RandProcess):
+            found.append(obj)
+        elif isinstance(obj, partial):
+            for o in (obj.func, *obj.args, *obj.keywords.values()):
+                visit(o, depth + 1)
+        elif hasattr(obj, '__self__') and hasattr(obj, '__func__'):
+            visit(obj.__self__, depth + 1)
+            visit(obj.__func__, depth + 1)
+        elif hasattr(obj, '__code__'):
+            refs = [cell.cell_contents for cell in obj.__closure__ or () if cell.cell_contents is not obj]
+            refs += [*(obj.__defaults__ or ()), *(obj.__kwdefaults__ or {}).values()]
+            refs += [obj.__globals__[n] for n in names(obj.__code__) if n in obj.__globals__]
+            for o in refs:
+                visit(o, depth + 1)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            for o in obj:
+                visit(o, depth + 1)
+        elif isinstance(obj, dict):
+            for o in obj.values():
+                visit(o, depth + 1)
+        elif hasattr(obj, '__dict__'):
+            for o in vars(obj).values():
+                visit(o, depth + 1)
+
+    for obj in objs:
+        visit(obj, 0)
+    return found
@@ -0,0 +1,85 @@
+import GPy
+import numpy as np
+import pytest
+from pytest import approx
+
+from openmodelica_microgrid_gym.agents.incremental_gp import IncrementalGP, chol_update
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 1, (30, 2))
+    Y = np.sin(5 * X[:, [0]]) + X[:, [1]]
+    Xs = rng.uniform(0, 1, (50, 2))
+    kernel = GPy.kern.Matern32(input_dim=2, variance=2, lengthscale=[.3, .5], ARD=True)
+    return X, Y, Xs, kernel
+
+
+def test_chol_update():
+    rng = np.random.default_rng(1)
+    A = rng.normal(size=(5, 5))
+    A = A @ A.T + 5 * np.eye(5)
+    x = rng.normal(size=5)
+    L = np.linalg.cholesky(A)
+    chol_update(L, x)
+    assert L @ L.T == approx(A + np.outer(x, x))
+    chol_update(L, x, downdate=True)
+    assert L @ L.T == approx(A)
+
+
+def test_build_from_scratch(data):
+    # the factor of the first point is not appended to an empty one (fails in LAPACK of scipy<=1.10)
+    X, Y, Xs, kernel = data
+    gp = IncrementalGP(X[:1], Y[:1], kernel, noise_var=1e-3)
+    ref = GPy.models.GPRegression(X[:1], Y[:1], kernel.copy(), noise_var=1e-3)
+    assert gp.predict_noiseless(Xs)[0] == approx(ref.predict_noiseless(Xs)[0], rel=1e-5, abs=1e-6)
+
+
+def test_exact_matches_gpy(data):
+    X, Y, Xs, kernel = data
+    gp = IncrementalGP(X[:5], Y[:5], kernel, noise_var=1e-3)
+    for i in range(5, len(X)):
+        gp.set_XY(X[:i + 1], Y[:i + 1])
+    ref = GPy.models.GPRegression(X, Y, kernel.copy(), noise_var=1e-3)
+
+    mean, var = gp.predict_noiseless(Xs)
+    mean_ref, var_ref = ref.predict_noiseless(Xs)
+    assert mean == approx(mean_ref, rel=1e-5, abs=1e-6)
+    assert var == approx(var_ref, rel=1e-5, abs=1e-6)
+
+
+def test_truncate(data):
+    X, Y, Xs, kernel = data
+    gp = IncrementalGP(X[:10], Y[:10], kernel, noise_var=1e-3)
+    mean, var = gp.predict_noiseless(Xs)
+    gp.set_XY(X[:12], Y[:12])
+    gp.predict_noiseless(Xs)
+    gp.set_XY(X[:10], Y[:10])
+    assert gp.predict_noiseless(Xs)[0] == approx(mean)
+
+    # different points appended at the position of the removed ones
+    gp.set_XY(np.vstack([X[:10], X[20:22]]), np.vstack([Y[:10], Y[20:22]]))
+    ref = IncrementalGP(np.vstack([X[:10], X[20:22]]), np.vstack([Y[:10], Y[20:22]]), kernel, noise_var=1e-3)
+    assert gp.predict_noiseless(Xs)[0] == approx(ref.predict_noiseless(Xs)[0])
+
+
+def test_sparse(data):
+    X, Y, Xs, kernel = data
+    gp = IncrementalGP(X[:10], Y[:10], kernel, noise_var=1e-3, max_active=20)
+    for i in range(10, len(X)):
+        gp.set_XY(X[:i + 1], Y[:i + 1])
+    assert gp.is_sparse
+
+    exact = IncrementalGP(X, Y, kernel, noise_var=1e-3)
+    mean, var = gp.predict_noiseless(Xs)
+    assert mean == approx(exact.predict_noiseless(Xs)[0], abs=.1)
+    assert np.all(var > 0)
+
+    # removing and adding points again is consistent with the incremental construction
+    gp.set_XY(X[:25], Y[:25])
+    gp.set_XY(X, Y)
+    assert gp.predict_noiseless(Xs)[0] == approx(mean)
+
+    gp.set_XY(X[:15], Y[:15])
+    assert not gp.is_sparse
@@ -0,0 +1,137 @@
+import GPy
+import numpy as np
+import pytest
+from pytest import approx
+
+from openmodelica_microgrid_gym.agents import SafeOptAgent
+from openmodelica_microgrid_gym.agents.util import MutableFloat
+from openmodelica_microgrid_gym.util import FullHistory
+
+
+@pytest.fixture
+def agent():
+    np.random.seed(1)
+    bounds = [(0.0, 0.07), (0, 300)]
+    kernel = GPy.kern.Matern32(input_dim=len(bounds), variance=2, lengthscale=[.02, 50.], ARD=True)
+    agent = SafeOptAgent([MutableFloat(40e-3), MutableFloat(10)], -20, -2, kernel,
+                         dict(bounds=bounds, noise_var=.001, prior_mean=0, safe_threshold=0, explore_threshold=0),
+                         [], {}, history=FullHistory())
+    agent.reset()
+    return agent
+
+
+def test_propose_batch_initial(agent):
+    assert agent.propose_batch(4) == approx(np.array([[40e-3, 10]]))
+
+
+def test_observe_batch(agent):
+    agent.observe_batch(np.array([[40e-3, 10]]), [-1])
+    assert agent.initial_performance == -1
+    assert agent.performance == approx(1)
+
+    agent.observe_batch(np.array([[41e-3, 11], [39e-3, 12]]), [-.5, -1.5])
+    assert agent.optimizer.x.shape == (3, 2)
+    assert agent.history.df['J'].to_numpy() == approx([1, 1.5, .5])
+    assert agent.best_episode == 1
+    assert agent.worst_episode == 2
+
+
+def test_observe_batch_mismatch(agent):
+    with pytest.raises(ValueError):
+        agent.observe_batch(np.array([[40e-3, 10]]), [-1, -2])
+
+
+def test_return_threshold(agent):
+    assert agent.return_threshold is None
+    agent.observe_batch(np.array([[40e-3, 10]]), [-1])
+    # safe_threshold = 0 corresponds to min_performance
+    assert agent.return_threshold == approx(-2)
+    agent.safe_threshold = .5
+    assert agent.return_threshold == approx(-1.5)
+
+
+def test_propose_batch(agent):
+    agent.observe_batch(np.array([[40e-3, 10]]), [-1])
+    candidates = agent.propose_batch(3)
+
+    assert 1 <= len(candidates) <= 3
+    assert candidates.shape[1] == 2
+    assert np.all((candidates >= [0, 0]) & (candidates <= [0.07, 300]))
+    # fantasised data points are removed again
+    assert agent.optimizer.x.shape == (1, 2)
+    assert agent.optimizer.gp.X.shape == (1, 2)
+    assert agent.params[:] == approx(candidates[0])
+
+
+def test_checkpoint_resume(agent, tmp_path):
+    path = str(tmp_path / 'checkpoint.npz')
+    agent.checkpoint = path
+    agent.observe_batch(np.array([[40e-3, 10]]), [-1])
+    agent.observe_batch(np.array([[41e-3, 11], [39e-3, 12]]), [-.5, -1.5])
+    agent.propose_batch(1)
+
+    resumed = SafeOptAgent([MutableFloat(40e-3), MutableFloat(10)], -20, -2, agent.kernel.copy(),
+                           dict(bounds=agent.bounds, noise_var=.001, prior_mean=0, safe_threshold=0,
+                                explore_threshold=0),
+                           [], {}, history=FullHistory(), checkpoint=path, resume=True)
+    resumed.reset()
+    assert resumed.optimizer.x == approx(agent.optimizer.x)
+    assert resumed.optimizer.y == approx(agent.optimizer.y)
+    assert resumed.initial_performance == agent.initial_performance
+    assert resumed.history.df['J'].to_numpy() == approx(agent.history.df['J'].to_numpy())
+    assert resumed.best_episode == 1
+    assert resumed.worst_episode == 2
+
+    # normalisation is kept when continuing the campaign
+    resumed.observe_batch(np.array([[42e-3, 15]]), [-1])
+    assert resumed.performance == approx(1)
+
+
+def test_checkpoint_warm_start(agent, tmp_path):
+    path = str(tmp_path / 'checkpoint.npz')
+    agent.checkpoint = path
+    agent.observe_batch(np.array([[40e-3, 10]]), [-1])
+    agent.observe_batch(np.array([[41e-3, 11], [39e-3, 250]]), [-.5, -1.5])
+
+    warm = SafeOptAgent([MutableFloat(40e-3), MutableFloat(10)], -20, -2, agent.kernel.copy(),
+                        dict(bounds=[(0.0, 0.07), (0, 200)], noise_var=.001, prior_mean=0, safe_threshold=0,
+                             explore_threshold=0),
+                        [], {}, history=FullHistory(), warm_start=path)
+    warm.reset()
+    # the point outside of the new bounds is discarded
+    assert warm.optimizer.x.shape == (2, 2)
+    assert warm.history.df.shape[0] == 0
+
+    warm.observe_batch(np.array([warm.params[:]]), [-.8])
+    assert warm.performance == approx(1.2)
+    assert warm.best_episode == 0
+
+
+def test_checkpoint_warm_start_drops_initial(agent, tmp_path):
+    path = str(tmp_path / 'checkpoint.npz')
+    agent.observe_batch(np.array([[40e-3, 250]]), [-1])
+    agent.observe_batch(np.array([[41e-3, 11], [39e-3, 12]]), [-.5, -1.5])
+    agent.save_checkpoint(path)
+
+    warm = SafeOptAgent([MutableFloat(40e-3), MutableFloat(10)], -20, -2, agent.kernel.copy(),
+                        dict(bounds=[(0.0, 0.07), (0, 200)], noise_var=.001, prior_mean=0, safe_threshold=.5,
+                             explore_threshold=.3),
+                        [], {}, history=FullHistory(), warm_start=path)
+    warm.reset()
+    # the initial point is discarded, the thresholds still refer to its performance
+    assert warm.optimizer.x.shape == (2, 2)
+    assert warm.optimizer.fmin == approx([.5])
+    assert warm.optimizer.threshold == approx(.3)
+
+
+def test_checkpoint_incompatible(agent, tmp_path):
+    path = str(tmp_path / 'checkpoint.npz')
+    agent.observe_batch(np.array([[40e-3, 10]]), [-1])
+    agent.save_checkpoint(path)
+
+    other = SafeOptAgent([MutableFloat(40e-3)], -20, -2, GPy.kern.Matern32(input_dim=1),
+                         dict(bounds=[(0.0, 0.07)], noise_var=.001, prior_mean=0, safe_threshold=0,
+                              explore_threshold=0),
+                         [], {}, history=FullHistory(), warm_start=path)
+    with pytest.raises(ValueError):
+        other.reset()
@@ -0,0 +1,97 @@
+import GPy
+import gym
+import numpy as np
+from pytest import approx
+from stochastic.processes import VasicekProcess
+
+from openmodelica_microgrid_gym.agents import SafeOptAgent
+from openmodelica_microgrid_gym.agents.util import MutableFloat
+from openmodelica_microgrid_gym.aux_ctl import PI_params, DroopParams, MultiPhaseDQ0PIPIController
+from openmodelica_microgrid_gym.execution import BatchRunner
+from openmodelica_microgrid_gym.execution.pool import EpisodeWorker
+from openmodelica_microgrid_gym.util import FullHistory, RandProcess
+
+bounds = [(0, 0.1), (0, 200)]
+
+
+def make_agent():
+    delta_t = 1e-4
+    mutable_params = dict(voltP=MutableFloat(25e-3), voltI=MutableFloat(60))
+    voltage_dqp_iparams = PI_params(kP=mutable_params['voltP'], kI=mutable_params['voltI'], limits=(-30, 30))
+    current_dqp_iparams = PI_params(kP=0.012, kI=90, limits=(-1, 1))
+    droop_param = DroopParams(40000.0, 0.005, 50)
+    qdroop_param = DroopParams(1000.0, 0.002, 230 * 1.414)
+    ctrl = MultiPhaseDQ0PIPIController(voltage_dqp_iparams, current_dqp_iparams, droop_param, qdroop_param,
+                                       ts_sim=delta_t, name='master')
+    kernel = GPy.kern.Matern32(input_dim=len(bounds), variance=2, lengthscale=[.02, 50.], ARD=True)
+    return SafeOptAgent(mutable_params, -20, -2, kernel,
+                        dict(bounds=bounds, noise_var=.001, prior_mean=0, safe_threshold=0, explore_threshold=0),
+                        [ctrl], {'master': [[f'lc1.inductor{i + 1}.i' for i in range(3)],
+                                            [f'lc1.capacitor{i + 1}.v' for i in range(3)]]},
+                        history=FullHistory())
+
+
+def experiment_factory():
+    env = gym.make('openmodelica_microgrid_gym:ModelicaEnv_test-v1',
+                   reward_fun=lambda cols, obs, risk: -np.abs(obs[:3]).sum() / 1000,
+                   viz_mode=None,
+                   model_path='omg_grid/test.fmu',
+                   max_episode_steps=20,
+                   net='net/net_test.yaml')
+    return make_agent(), env
+
+
+def test_episode_worker():
+    worker = EpisodeWorker(experiment_factory)
+    result = worker.evaluate([25e-3, 60], seed=1)
+    assert result['steps'] == 20
+    assert not result['aborted']
+    assert worker.evaluate([25e-3, 60], seed=1)['episode_return'] == approx(result['episode_return'])
+
+
+def test_batch_runner():
+    agent = make_agent()
+    runner = BatchRunner(agent, experiment_factory, batch_size=2, n_workers=2)
+    runner.run(2)
+
+    assert agent.history.df['J'][0] == approx(1)
+    assert 2 <= agent.history.df.shape[0] <= 3
+
+
+class RecordedLoad:
+    """Load resistance drawn from a random process, the drawn values are recorded"""
+
+    def __init__(self):
+        self.gen = RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=20), initial=20,
+                               bounds=(10, 30))
+        self.values = []
+
+    def __call__(self, t):
+        self.values.append(self.gen.sample(t))
+        return self.values[-1]
+
+
+def stochastic_experiment_factory():
+    env = gym.make('openmodelica_microgrid_gym:ModelicaEnv_test-v1',
+                   viz_mode=None,
+                   model_path='net/net_singleinverter.yaml',
+                   model_params={'rl1.resistor1.R': RecordedLoad()},
+                   max_episode_steps=20,
+                   net='net/net_singleinverter.yaml')
+    return make_agent(), env
+
+
+def test_common_random_numbers():
+    worker = EpisodeWorker(stochastic_experiment_factory)
+
+    def load():
+        return worker.env.model_parameters['rl1.resistor1.R'].values[-20:]
+
+    worker.evaluate([25e-3, 60], seed=1)
+    first = load()
+    worker.evaluate([10e-3, 100], seed=2)
+    other = load()
+    # the same replicate of another parameter set sees the same load
+    worker.evaluate([10e-3, 100], seed=1)
+    assert load() == approx(first)
+    assert other != approx(first)
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+from run_benchmarks import compare, run_benchmarks  # noqa: E402
+from standin import StandInModel  # noqa: E402
+
+
+def test_standin_model():
+    data = StandInModel().trajectory(2000)
+    assert data.shape == (2000, 9)
+    # balanced three phase system
+    assert np.abs(data[-500:, :3].sum(axis=1)).max() < 1e-6
+    assert 100 < np.abs(data[-500:, 0]).max() < 1000
+
+
+def test_run_and_compare():
+    results = run_benchmarks(['history.append'], repeat=1)
+    assert results['results']['history.append']['median'] > 0
+    slower = {'results': {'history.append': {'median': results['results']['history.append']['median'] * 2}}}
+    assert compare(results, slower) == ['history.append']
+    assert compare(slower, results) == []
@@ -0,0 +1,132 @@
+import json
+import os
+import subprocess
+import sys
+from functools import partial
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytest import approx
+from stochastic.processes import VasicekProcess
+
+from openmodelica_microgrid_gym.execution import EvaluationCache
+from openmodelica_microgrid_gym.execution.cache import describe_callable
+from openmodelica_microgrid_gym.net import Network
+from openmodelica_microgrid_gym.util import RandProcess
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EvaluationCache(str(tmp_path / 'cache'), store_trajectory=True)
+
+
+def make_env(**model_params):
+    # the cache only needs the configuration of the environment
+    return SimpleNamespace(model_path='omg_grid/does_not_exist.fmu', net=Network.load('net/net_test.yaml'),
+                           model_parameters=model_params, reward=lambda cols, obs, risk: -np.abs(obs).sum(),
+                           time_start=0, time_step_size=1e-4, max_episode_steps=100, solver_method='LSODA',
+                           action_time_delay=0, is_normalized=True, abort_reward=0)
+
+
+def test_put_get(cache):
+    df = pd.DataFrame(np.arange(6.).reshape(3, 2), columns=['a', 'b'])
+    assert cache.get('key') is None
+    cache.put('key', dict(episode_return=-1.5, steps=3, risk=0.2, aborted=False), df)
+
+    result = cache.get('key')
+    assert result['episode_return'] == approx(-1.5)
+    assert result['steps'] == 3
+    assert not result['aborted']
+    pd.testing.assert_frame_equal(result['trajectory'], df)
+
+
+def test_evict(tmp_path):
+    cache = EvaluationCache(str(tmp_path), max_size=0)
+    cache.put('key', dict(episode_return=1))
+    assert len(cache) == 0
+
+    cache.max_size = 1e6
+    for i in range(3):
+        cache.put(str(i), dict(episode_return=i))
+    assert len(cache) == 3
+    cache.max_size = 1
+    cache.evict()
+    assert len(cache) == 0
+
+
+def test_describe_callable():
+    assert describe_callable(partial(lambda t, v: v, v=1)) == describe_callable(partial(lambda t, v: v, v=1))
+    assert describe_callable(partial(lambda t, v: v, v=1)) != describe_callable(partial(lambda t, v: v, v=2))
+    assert describe_callable(lambda t: 2 * t) != describe_callable(lambda t: 3 * t)
+
+
+def test_key(cache):
+    env = make_env(r_load=partial(lambda t, v: v, v=20))
+    key = cache.key(env, [1, 2], seed=1)
+    assert key == cache.key(make_env(r_load=partial(lambda t, v: v, v=20)), [1., 2.], seed=1)
+    assert key != cache.key(env, [1, 2.1], seed=1)
+    assert key != cache.key(env, [1, 2], seed=2)
+    assert key != cache.key(make_env(r_load=partial(lambda t, v: v, v=30)), [1, 2], seed=1)
+    env.net.config['components']['inv1']['L'] = 1
+    assert key != cache.key(env, [1, 2], seed=1)
+
+
+def test_cacheable(cache):
+    gen = RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=28), initial=28)
+    assert cache.cacheable(make_env(r_load=partial(lambda t, v: v, v=20)))
+    # the realisation of the random process is only reproducible if the environment is seeded
+    assert not cache.cacheable(make_env(r_load=gen.sample))
+    assert cache.cacheable(make_env(r_load=gen.sample), seed=1)
+
+
+class Reward:
+    def __init__(self, i_limit):
+        self.i_limit = i_limit
+        self._idx = None
+
+    def rew_fun(self, cols, data, risk):
+        self._idx = [0]
+        return -np.abs(data[self._idx]).sum() / self.i_limit
+
+
+def nested_reward(cols, data, risk):
+    return -sum([abs(x) for x in data]) + len({'a', 'b'})
+
+
+def test_describe_nested_code():
+    description = json.dumps(describe_callable(nested_reward))
+    assert '0x' not in description
+    # the description is the same in other processes, independent of the hash seed
+    script = 'import json; from tests.test_cache import *; print(json.dumps(describe_callable(nested_reward)))'
+    for seed in ['1', '2']:
+        out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                             env={**os.environ, 'PYTHONHASHSEED': seed}).stdout
+        assert out.strip() == description
+
+
+def test_describe_bound_method():
+    assert describe_callable(Reward(15).rew_fun) == describe_callable(Reward(15).rew_fun)
+    assert describe_callable(Reward(15).rew_fun) != describe_callable(Reward(10).rew_fun)
+    # private attributes are caches
+    reward = Reward(15)
+    description = describe_callable(reward.rew_fun)
+    reward.rew_fun([], np.ones(2), 0)
+    assert describe_callable(reward.rew_fun) == description
+
+
+def test_describe_randproc():
+    gen = RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=28), initial=28)
+    description = describe_callable(gen.sample)
+    # the sampling time inferred by the first sample does not change the key
+    gen.sample(1e-4)
+    assert describe_callable(gen.sample) == description
+
+
+def test_describe_closure():
+    def make(limit):
+        return lambda t: t / limit
+
+    assert describe_callable(make(1)) == describe_callable(make(1))
+    assert describe_callable(make(1)) != describe_callable(make(2))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from openmodelica_microgrid_gym.execution import Callback, BatchCallback, EpisodeRecorder
+
+cols = ['a', 'b', 'c']
+data = np.arange(30.).reshape(10, 3)
+
+
+class ChunkCollector(BatchCallback):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunks = []
+
+    def on_chunk(self, data):
+        self.chunks.append(data.copy())
+
+
+def test_callback_on_batch():
+    class StepCallback(Callback):
+        rows = []
+
+        def __call__(self, cols, row):
+            self.rows.append(row.copy())
+
+    callback = StepCallback()
+    callback.on_batch(cols, data)
+    assert np.array_equal(callback.rows, data)
+
+
+def test_batch_callback_abstract():
+    # subclasses without on_chunk() fail on instantiation, not at the first flush
+    class Incomplete(BatchCallback):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize('per_step', [True, False])
+def test_batch_callback_chunks(per_step):
+    callback = ChunkCollector(['c', 'a'], chunk_size=4)
+    callback.reset()
+    if per_step:
+        for row in data:
+            callback(cols, list(row))
+    else:
+        callback.on_batch(cols, data[:3])
+        callback.on_batch(cols, data[3:])
+    callback.on_episode_end()
+
+    assert [len(chunk) for chunk in callback.chunks] == [4, 4, 2]
+    assert np.array_equal(np.vstack(callback.chunks), data[:, [2, 0]])
+
+
+def test_episode_recorder():
+    recorder = EpisodeRecorder(['b'])
+    for _ in range(2):
+        recorder.reset()
+        for i in range(0, 10, 3):
+            recorder.on_batch(cols, data[i:i + 3])
+        recorder.on_episode_end()
+
+    assert len(recorder.episodes) == 2
+    assert np.array_equal(recorder.episodes[1], data[:, [1]])
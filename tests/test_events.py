@@ -0,0 +1,123 @@
+import gym
+import numpy as np
+import pytest
+from pytest import approx
+
+from openmodelica_microgrid_gym.env.numpy_model import NumpyModel
+from openmodelica_microgrid_gym.util import FullHistory
+
+
+class SwitchedLoad(NumpyModel):
+    """The load resistance of the first phase is halved when the first capacitor voltage exceeds 200 V"""
+    n_event_indicators = 1
+
+    def setup(self, time_start, output_names, model_params):
+        super().setup(time_start, output_names, model_params)
+        self.events = []
+
+    @property
+    def event_indicators(self):
+        return np.array([self.x[self.state_names.index('lc1.capacitor1.v')] - 200])
+
+    def handle_event(self):
+        self.events.append((self.time, self.x[self.state_names.index('lc1.capacitor1.v')]))
+        self.set_params(**{'rl1.resistor1.R': 10})
+
+
+class TimedLoad(NumpyModel):
+    """The load resistance of the first phase is halved at a fixed time"""
+    n_event_indicators = 1
+
+    def setup(self, time_start, output_names, model_params):
+        super().setup(time_start, output_names, model_params)
+        self.events = []
+        self.next_time_event = 1.23e-3
+
+    @property
+    def event_indicators(self):
+        return np.ones(1)
+
+    def handle_event(self):
+        self.events.append(self.time)
+        self.next_time_event = None
+        self.set_params(**{'rl1.resistor1.R': 10})
+
+
+def run(model_cls, **kwargs):
+    env = gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', net='net/net_singleinverter.yaml',
+                   model_path='net/net_singleinverter.yaml', viz_mode=None, max_episode_steps=100,
+                   history=FullHistory(), **{'handle_events': True, **kwargs})
+    env.unwrapped.model = model_cls.load('net/net_singleinverter.yaml')
+    env.reset()
+    for _ in range(100):
+        env.step([.5, -.25, -.25])
+    return env.unwrapped
+
+
+def test_state_event():
+    env = run(SwitchedLoad)
+    (t, v), = env.model.events
+    # the event is located inside of a time step
+    assert v == approx(200, abs=1e-3)
+    # crossing of the dense samples without event handling
+    ref = run(SwitchedLoad, handle_events=False, dense_samples=100, dense_history=FullHistory())
+    v_ref, dt = ref.dense_history.df['lc1.capacitor1.v'].values, ref.time_step_size / 100
+    k = np.argmax(v_ref > 200)
+    assert t == approx((k - 1 + (200 - v_ref[k - 1]) / (v_ref[k] - v_ref[k - 1])) * dt, abs=1e-4 * env.time_step_size)
+    assert env.model._param_values[env.model.param_names.index('rl1.resistor1.R')] == 10
+
+    assert run(SwitchedLoad, handle_events=False).model.events == []
+
+
+class BlowUp(TimedLoad):
+    """The states diverge in finite time, the time event is never cleared"""
+
+    def setup(self, time_start, output_names, model_params):
+        super().setup(time_start, output_names, model_params)
+        self.x[:] = 1
+        self.next_time_event = 2.5e-5
+
+    @property
+    def deriv(self):
+        return 1e6 * self.x ** 2
+
+
+def test_integration_failure():
+    env = gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', net='net/net_singleinverter.yaml',
+                   model_path='net/net_singleinverter.yaml', viz_mode=None, max_episode_steps=100,
+                   history=FullHistory(), handle_events=True, solver_method='RK45', dense_samples=10,
+                   dense_history=FullHistory()).unwrapped
+    env.model = BlowUp.load('net/net_singleinverter.yaml')
+    env.reset()
+    _, reward, done, _ = env.step([.5, -.25, -.25])
+    # the episode is aborted instead of integrating the failed interval again
+    assert done and env.failed
+    assert reward == env.abort_reward
+    # the dense samples after the failure are not calculated from uninitialized states
+    dense = env.dense_history.df.values
+    assert len(dense) == 11
+    assert np.isnan(dense[-2]).all()
+
+
+def test_time_event():
+    env = run(TimedLoad)
+    assert env.model.events == [approx(1.23e-3)]
+    expected = run(TimedLoad, handle_events=False).history.df
+    # the load step changes the currents afterwards
+    assert np.abs(env.history.df['rl1.inductor1.i'] - expected['rl1.inductor1.i']).max() > 1
+
+
+@pytest.mark.parametrize('solver_method', ['RK4', 'ExpEuler'])
+def test_fixed_step(solver_method):
+    env = run(SwitchedLoad, solver_method=solver_method)
+    (t, v), = env.model.events
+    # the event is handled at the end of the step
+    assert t / env.time_step_size == approx(round(t / env.time_step_size))
+    assert v > 200
+
+
+def test_dense_samples():
+    env = run(SwitchedLoad, dense_samples=4, dense_history=FullHistory())
+    dense = env.dense_history.df
+    assert len(dense) == 1 + 4 * (len(env.history.df) - 1)
+    assert dense.iloc[::4].values == approx(env.history.df[env.model_output_names].values)
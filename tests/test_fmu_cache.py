@@ -0,0 +1,42 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from openmodelica_microgrid_gym.env.fmu_cache import FMUCache, file_hash
+
+fmu = os.path.join(os.path.dirname(__file__), '..', 'omg_grid', 'omg_grid.Grids.NetworkSingleInverter.fmu')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FMUCache(str(tmp_path / 'cache'))
+
+
+def test_extract(cache, tmp_path):
+    folder = cache.extract(fmu)
+    assert os.path.basename(folder) == file_hash(fmu)
+    description = os.path.join(folder, 'modelDescription.xml')
+    assert os.path.isfile(description)
+    assert not os.access(description, os.W_OK) or os.geteuid() == 0
+
+    # the same content is only extracted once, regardless of the file name
+    copy = str(tmp_path / 'copy.fmu')
+    shutil.copy(fmu, copy)
+    mtime = os.stat(description).st_mtime_ns
+    assert cache.extract(copy) == folder
+    assert os.stat(description).st_mtime_ns == mtime
+
+
+def test_concurrent_extract(cache):
+    with ThreadPoolExecutor(4) as pool:
+        folders = set(pool.map(cache.extract, [fmu] * 8))
+    assert len(folders) == 1
+    # no temporary folders are left behind
+    assert os.listdir(cache.directory) == [os.path.basename(folders.pop())]
+
+
+def test_log_file(cache):
+    assert cache.log_file(fmu).startswith(os.path.join(cache.directory, 'logs'))
+    assert str(os.getpid()) in cache.log_file(fmu)
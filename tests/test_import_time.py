@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['GPy', 'safeopt', 'matplotlib', 'scipy', 'pandas', 'pyfmi', 'stochastic']
+
+
+def run_import(statement: str) -> subprocess.CompletedProcess:
+    # fresh interpreter, the modules of the test session are already imported
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True,
+                          check=True)
+
+
+def import_times(stderr: str) -> dict:
+    """cumulative import time in seconds by module"""
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) * 1e-6
+    return times
+
+
+@pytest.mark.parametrize('package', ['openmodelica_microgrid_gym', 'openmodelica_microgrid_gym.agents',
+                                     'openmodelica_microgrid_gym.env', 'openmodelica_microgrid_gym.execution',
+                                     'openmodelica_microgrid_gym.util'])
+def test_no_heavy_imports(package):
+    result = run_import(f'import sys, {package}; print(" ".join(sys.modules))')
+    loaded = set(result.stdout.split())
+    assert not [module for module in HEAVY_MODULES if module in loaded]
+
+
+def test_import_time():
+    times = import_times(run_import('import openmodelica_microgrid_gym').stderr)
+    # gym is needed to register the environments, everything else should be negligible
+    own = times['openmodelica_microgrid_gym'] - times.get('gym.envs.registration', 0)
+    assert own < .2
+
+
+def test_lazy_attributes():
+    import openmodelica_microgrid_gym.util as util
+    from openmodelica_microgrid_gym.util.recorder import FullHistory
+
+    assert util.FullHistory is FullHistory
+    assert 'FullHistory' in dir(util)
+    with pytest.raises(AttributeError):
+        util.NotExisting
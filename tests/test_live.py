@@ -0,0 +1,52 @@
+import matplotlib
+import numpy as np
+import pytest
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+
+from openmodelica_microgrid_gym.env import PlotTmpl  # noqa: E402
+from openmodelica_microgrid_gym.env.live import LiveView  # noqa: E402
+from openmodelica_microgrid_gym.util import FullHistory, SingleHistory  # noqa: E402
+
+
+@pytest.fixture
+def history():
+    hist = FullHistory([['a', 'b'], 'c'])
+    hist.reset()
+    return hist
+
+
+def test_live_view(history):
+    finished = []
+    tmpl = PlotTmpl([['a', 'c']], callback=finished.append, style=[['--', None]])
+    view = LiveView(history, '[ab]', [tmpl], .1, window=50, max_fps=1e-3)
+    assert len(view.figures) == 2
+
+    for i in range(30):
+        history.append([i, -i, np.sin(i)])
+    view.update(force=True)
+    line_a = view.plots[0].lines[0]
+    assert line_a.get_xdata() == pytest.approx(np.arange(30) * .1)
+    assert view.plots[0].ax.get_ylim()[0] < -29
+
+    # limited frame rate
+    for i in range(30, 500):
+        history.append([i, -i, np.sin(i)])
+    view.update()
+    assert len(line_a.get_xdata()) == 30
+
+    # only the most recent steps are drawn and the time window moved on
+    figs = view.close()
+    assert len(line_a.get_xdata()) <= 100
+    assert line_a.get_xdata()[-1] == pytest.approx(49.9)
+    assert line_a.get_ydata()[-1] == 499
+    assert view.plots[0].ax.get_xlim()[1] > 49.9
+    assert view.plots[1].lines[0].get_linestyle() == '--'
+    assert finished == [figs[1]]
+    plt.close('all')
+
+
+def test_single_history():
+    with pytest.raises(ValueError):
+        LiveView(SingleHistory(['a']), '.*', [], 1)
@@ -0,0 +1,22 @@
+from pytest import approx
+
+from openmodelica_microgrid_gym.execution import MonteCarloRunner
+from openmodelica_microgrid_gym.execution.monte_carlo_runner import replicate_seeds
+from tests.test_batch_runner import make_agent, experiment_factory
+
+
+def test_replicate_seeds():
+    seeds = replicate_seeds(0, 4)
+    assert len(set(seeds)) == 4
+    assert seeds == replicate_seeds(0, 4)
+    assert seeds != replicate_seeds(1, 4)
+
+
+def test_monte_carlo_runner():
+    agent = make_agent()
+    runner = MonteCarloRunner(agent, experiment_factory, n_mc=2, n_workers=2)
+    runner.run(2)
+
+    assert agent.history.df['J'][0] == approx(1)
+    assert agent.history.df.shape[0] == 2
+    assert all(len(returns) == 2 for returns in runner.run_data['returns'])
@@ -0,0 +1,114 @@
+import gym
+import numpy as np
+import pytest
+from pytest import approx
+from scipy.integrate import solve_ivp
+
+from openmodelica_microgrid_gym.env.numpy_model import NumpyModel
+from openmodelica_microgrid_gym.net import Network
+
+OUTPUTS = [f'lc1.capacitor{k}.v' for k in '123'] + [f'lc1.inductor{k}.i' for k in '123'] + \
+          [f'rl1.inductor{k}.i' for k in '123']
+
+
+@pytest.fixture
+def model():
+    model = NumpyModel.load('net/net_singleinverter.yaml')
+    model.setup(0, OUTPUTS, {})
+    return model
+
+
+def simulate(model, t):
+    def deriv(_, x):
+        model.states = x
+        return model.deriv
+
+    model.states = solve_ivp(deriv, (0, t), model.states, method='LSODA', jac=lambda *_: model.jacc()).y[:, -1]
+
+
+def test_dc_steady_state(model):
+    model.set(i1p1=.1, i1p2=-.2, i1p3=0)
+    simulate(model, .1)
+    v = np.array([100, -200, 0])
+    # ideal inductors, the whole load current flows through the filter
+    assert model.obs == approx(np.hstack([v, v / 20, v / 20]), abs=1e-3)
+
+
+def test_jacobian(model):
+    model.states = np.random.default_rng(0).normal(size=len(model.states))
+    x, dx = model.states, model.deriv
+    eps = 1e-6
+    for i in range(len(x)):
+        model.states = x + eps * np.eye(len(x))[i]
+        assert (model.deriv - dx) / eps == approx(model.jacc()[:, i], rel=1e-4, abs=1e-3)
+
+
+def test_params(model):
+    model.setup(0, OUTPUTS + ['rl1.resistor1.R'], {'rl1.resistor1.R': lambda t: 40,
+                                                   'lc1.capacitor1.v': lambda t: 10 if t == -1 else None})
+    assert model.obs[[0, -1]] == approx([10, 40])
+    model.set(i1p1=.1)
+    simulate(model, .1)
+    assert model.obs[[0, 6]] == approx([100, 100 / 40], abs=1e-3)
+
+    # reset restores the configured parameters
+    model.setup(0, OUTPUTS, {})
+    model.set(i1p1=.1)
+    simulate(model, .1)
+    assert model.obs[6] == approx(100 / 20, abs=1e-3)
+
+    with pytest.raises(KeyError):
+        model.set_params(**{'rl1.resistor4.R': 1})
+
+
+def test_two_inverters():
+    model = NumpyModel.load('net/net.yaml')
+    net = Network.load('net/net.yaml')
+    model.setup(0, net.out_vars(False, True), {})
+    assert model.input_names == net.in_vars()
+    model.set(**dict(zip(model.input_names, [.1] * 6)))
+    # the DC operating point: all nodes have the voltage of the inverters, the load current is supplied by lc1
+    model.set_params(**{f'{c}.capacitor{k}.v': 100 for c in ['lc1', 'lcl1', 'lc2'] for k in '123'},
+                     **{f'{c}.inductor{k}.i': 5 for c in ['lc1', 'lc2', 'rl1'] for k in '123'})
+    assert model.deriv == approx(0)
+    assert model.obs[-6:-3] == approx([5] * 3)
+
+
+@pytest.mark.parametrize('config', [
+    # capacitor parallel to the voltage source
+    {'inverter1': dict(cls='Inverter', u=['a', 'b', 'c'], pins=['bus']),
+     'lc1': dict(cls='LC', pins=['x', 'bus'])},
+    # inductors in series
+    {'inverter1': dict(cls='Inverter', u=['a', 'b', 'c'], pins=['inv']),
+     'lcl1': dict(cls='LCL', pins=['inv', 'bus']),
+     'rl1': dict(cls='RL', pins=['bus'])},
+    {'rl1': dict(cls='RLC', pins=['bus'])},
+    {'rl1': dict(cls='RL', pins=['bus'], C=1)},
+])
+def test_invalid_config(config):
+    with pytest.raises(ValueError):
+        NumpyModel(config)
+
+
+def test_env():
+    env = gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', net='net/net_singleinverter.yaml',
+                   model_path='net/net_singleinverter.yaml', viz_mode=None, max_episode_steps=100)
+    env.reset()
+    for _ in range(100):
+        obs, _, _, _ = env.step([.5, -.25, -.25])
+    assert np.all(np.isfinite(obs))
+    assert len(env.history.df) == 101
+    assert env.history.df['lc1.capacitor1.v'].abs().max() > 100
+
+
+def test_fmu_trajectory():
+    pytest.importorskip('pyfmi')
+    kwargs = dict(net='net/net_singleinverter.yaml', viz_mode=None, max_episode_steps=200, is_normalized=False)
+    envs = [gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', model_path=path, **kwargs)
+            for path in ['omg_grid/omg_grid.Grids.NetworkSingleInverter.fmu', 'net/net_singleinverter.yaml']]
+    phases = 2 * np.pi * 50 * np.arange(200)[:, None] * envs[0].time_step_size + np.array([0, -2, 2]) * np.pi / 3
+    obs = []
+    for env in envs:
+        env.reset()
+        obs.append([env.step(.5 * np.sin(phase))[0] for phase in phases])
+    assert obs[1] == approx(np.array(obs[0]), rel=1e-3, abs=1e-2)
@@ -0,0 +1,24 @@
+from openmodelica_microgrid_gym.execution.pruning import max_step_reward, optimistic_return
+
+
+class Reward:
+    max_reward = 0
+
+    def rew_fun(self, cols, data, risk):
+        return -1
+
+
+def test_max_step_reward():
+    assert max_step_reward(Reward().rew_fun) == 0
+    assert max_step_reward(lambda cols, data, risk: -1) is None
+
+    def rew_fun(cols, data, risk):
+        return 1
+
+    rew_fun.max_reward = 1
+    assert max_step_reward(rew_fun) == 1
+
+
+def test_optimistic_return():
+    assert optimistic_return(-3, 10, 0) == -3
+    assert optimistic_return(-3, 10, 0.5) == 2
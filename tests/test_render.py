@@ -0,0 +1,71 @@
+import os
+from functools import partial
+
+import matplotlib
+import numpy as np
+import pytest
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+
+from openmodelica_microgrid_gym.env import PlotTmpl  # noqa: E402
+from openmodelica_microgrid_gym.env.render import EpisodeSnapshot, RenderWorker  # noqa: E402
+from openmodelica_microgrid_gym.util import FullHistory  # noqa: E402
+
+
+@pytest.fixture
+def history():
+    hist = FullHistory([['a', 'b'], 'c'])
+    hist.reset()
+    for i in range(10):
+        hist.append([i, 2 * i, np.sin(i)])
+    return hist
+
+
+def save_fig(path, fig):
+    fig.savefig(path)
+
+
+def lines(fig):
+    return [(line.get_label(), line.get_xdata(), line.get_ydata()) for line in fig.gca().lines]
+
+
+def test_snapshot_plot(history):
+    tmpl = PlotTmpl([['a', 'c']], callback=lambda fig: None, color=[['r', 'b']])
+    figs = EpisodeSnapshot(history, '[ab]', [tmpl], .5, 1).plot()
+    assert len(figs) == 2
+
+    # same plots as created from the data frame of the history
+    df = history.df
+    df.index = df.index * .5 + 1
+    for (label, x, y), col in zip(lines(figs[0]), ['a', 'b']):
+        assert label == col
+        assert x == pytest.approx(df.index.values)
+        assert y == pytest.approx(df[col].values)
+    (label_a, _, y_a), (label_c, _, y_c) = lines(figs[1])
+    assert (label_a, label_c) == ('a', 'c')
+    assert y_c == pytest.approx(df['c'].values)
+    assert figs[1].gca().lines[0].get_color() == 'r'
+    plt.close('all')
+
+
+def test_render_worker(history, tmp_path):
+    path = os.path.join(tmp_path, 'fig.png')
+    tmpl = PlotTmpl(['a'], callback=partial(save_fig, path))
+    with RenderWorker(n_workers=2) as worker:
+        assert worker.submit(EpisodeSnapshot(history, 'c', [tmpl], 1))
+        # lambdas can not be rendered in another process
+        assert not worker.submit(EpisodeSnapshot(history, 'c', [PlotTmpl(['a'], callback=lambda fig: None)], 1))
+    assert os.path.isfile(path)
+    with pytest.raises(RuntimeError):
+        worker.submit(EpisodeSnapshot(history, 'c', [], 1))
+
+
+def test_snapshot_decimation(history):
+    for i in range(10, 1000):
+        history.append([i, 2 * i, np.sin(i)])
+    snapshot = EpisodeSnapshot(history, '.*', [PlotTmpl(['c'], max_points=100, decimation='lttb')], 1, max_points=50)
+    (_, _, ab), (_, _, c) = snapshot.groups
+    assert len(ab) <= 100 and len(c) <= 50
+    tmpl_time, tmpl_values = snapshot.templates[0][1:]
+    assert len(tmpl_time) == len(tmpl_values) == 100
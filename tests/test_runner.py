@@ -14,6 +14,7 @@ from openmodelica_microgrid_gym import Runner, Agent
 from openmodelica_microgrid_gym.agents import StaticControlAgent
 from openmodelica_microgrid_gym.agents.util import MutableFloat
 from openmodelica_microgrid_gym.aux_ctl import *
+from openmodelica_microgrid_gym.execution import Callback
 from openmodelica_microgrid_gym.net import Network
 from openmodelica_microgrid_gym.util import flatten
 
@@ -180,3 +181,29 @@ def test_simpleagent(env):
     df2 = pd.read_hdf('tests/test_main3.hd5', 'hist').head(23)  # noqa
     df2 = df2.reindex(sorted(df2.columns), axis=1)
     assert df[out_params].to_numpy() == approx(df2[out_params].to_numpy(), 5e-4)
+
+
+def test_headless(agent, env):
+    env, _, out_params = env
+    history = env.history
+
+    class Recorder(Callback):
+        def __init__(self):
+            self.chunks = []
+
+        def on_batch(self, cols, data):
+            self.chunks.append(data.copy())
+
+    callback = Recorder()
+    runner = Runner(agent[1], env, callback=callback)
+    summary = runner.run_headless(2, callback_chunk=30)
+
+    assert summary.shape == (2,)
+    assert list(summary['length']) == [100, 100]
+    assert env.history is history
+    # each episode is delivered in chunks of 30, 30, 30 and 10 steps
+    assert [len(chunk) for chunk in callback.chunks] == [30, 30, 30, 10] * 2
+
+    df2 = pd.read_hdf('tests/test_main.hd5', 'hist')  # noqa
+    cols = history.cols
+    assert callback.chunks[0][:, [cols.index(c) for c in out_params]] == approx(df2[out_params].to_numpy()[1:31], 5e-2)
@@ -0,0 +1,76 @@
+import os
+
+import pandas as pd
+import pytest
+
+from openmodelica_microgrid_gym.execution.scheduler import WorkQueue, QueueWorker, run_local, main
+from openmodelica_microgrid_gym.execution.sweep import grid, Sweep
+
+
+def setup():
+    return dict(pid=os.getpid())
+
+
+def experiment(resources, a, b):
+    if a == 3:
+        raise ValueError('the experiment failed')
+    return dict(y=a * 2 + len(b), pid=resources['pid'])
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.db'), lease_time=60, max_attempts=2)
+    queue.submit(grid(a=[1, 2, 3], b=['x', 'yy']))
+    return queue
+
+
+def test_submit(queue):
+    assert queue.submit(grid(a=[1, 4], b=['x'])) == 1
+    assert queue.status() == dict(pending=7, running=0, done=0, failed=0)
+
+
+def test_lease(queue):
+    task_id, point = queue.acquire('w1')
+    assert point == {'a': 1, 'b': 'x'}
+    assert queue.heartbeat(task_id, 'w1')
+    assert not queue.heartbeat(task_id, 'w2')
+
+    # expired leases are handed out again
+    queue.lease_time = -1
+    queue.heartbeat(task_id, 'w1')
+    assert queue.acquire('w2') == (task_id, point)
+    assert not queue.heartbeat(task_id, 'w1')
+
+
+def test_retry(queue):
+    task_id, point = queue.acquire('w1')
+    queue.fail(task_id, 'w1', 'error')
+    assert queue.status()['pending'] == 6
+    assert queue.acquire('w1') == (task_id, point)
+    queue.fail(task_id, 'w1', 'error')
+    assert queue.status()['failed'] == 1
+
+
+def test_queue_worker(queue):
+    worker = QueueWorker(queue, experiment, setup, name='w1')
+    assert worker.run() == 8
+    assert queue.status() == dict(pending=0, running=0, done=4, failed=2)
+    assert [result['y'] for _, result in queue.results()] == [3, 4, 5, 6]
+
+
+def test_run_local(queue, tmp_path):
+    run_local(queue, experiment, setup, n_workers=2)
+    assert queue.status()['done'] == 4
+
+    # same format as a single node sweep
+    path = str(tmp_path / 'results.h5')
+    assert queue.export(path) == 4
+    assert queue.export(path) == 0
+    df = pd.read_hdf(path, 'results')
+    assert df.shape[0] == 4
+    assert Sweep(experiment, grid(a=[1, 2], b=['x', 'yy']), path).completed() == set(df['point_id'])
+
+
+def test_main(queue, capsys):
+    main(['status', queue.path])
+    assert 'pending' in capsys.readouterr().out
@@ -0,0 +1,191 @@
+import os
+from types import SimpleNamespace
+
+import gym
+import numpy as np
+import pytest
+from pytest import approx
+from scipy.integrate import solve_ivp
+
+from openmodelica_microgrid_gym.env.numpy_model import NumpyModel
+from openmodelica_microgrid_gym.env.solvers import solvers, RK4, Trapezoidal
+
+TS = .5e-4
+
+
+def linear_model():
+    model = NumpyModel.load('net/net_singleinverter.yaml')
+    model.setup(0, [], {})
+
+    def fun(_, x):
+        model.states = x
+        return model.deriv
+
+    def jac(_, x):
+        return model.jacc()
+
+    return model, fun, jac
+
+
+def simulate(integrate, model, fun, jac, n=400):
+    phases = 2 * np.pi * 50 * TS * np.arange(n)[:, None] + np.array([0, -2, 2]) * np.pi / 3
+    x = np.zeros(len(model.states))
+    xs = []
+    for k, phase in enumerate(phases):
+        model.set(**dict(zip(model.input_names, .5 * np.sin(phase))))
+        x = np.array(integrate(fun, jac, (k * TS, (k + 1) * TS), x))
+        xs.append(x)
+    return np.array(xs)
+
+
+def lsoda(fun, jac, t_span, x0):
+    return solve_ivp(fun, t_span, x0, method='LSODA', jac=jac, rtol=1e-10, atol=1e-8).y[:, -1]
+
+
+@pytest.mark.parametrize('method,substeps,rel', [('RK4', 1, 1e-3), ('RK4', 4, 1e-5), ('Trapezoidal', 1, 5e-2),
+                                                 ('Trapezoidal', 8, 1e-3), ('ExpEuler', 1, 1e-6)])
+def test_linear(method, substeps, rel):
+    model, fun, jac = linear_model()
+    expected = simulate(lsoda, model, fun, jac)
+    actual = simulate(solvers[method](substeps).integrate, *linear_model())
+    scale = np.abs(expected).max(axis=0)
+    assert np.abs(actual - expected).max(axis=0) == approx(0, abs=rel * scale.max())
+
+
+@pytest.mark.parametrize('solver,rel', [(RK4(10), 1e-6), (Trapezoidal(100), 1e-3)])
+def test_nonlinear(solver, rel):
+    # van der Pol oscillator
+    def fun(_, x):
+        return np.array([x[1], (1 - x[0] ** 2) * x[1] - x[0]])
+
+    def jac(_, x):
+        return np.array([[0, 1], [-2 * x[0] * x[1] - 1, 1 - x[0] ** 2]])
+
+    x_0 = np.array([2., 0])
+    x = x_0
+    for k in range(20):
+        x = np.array(solver.integrate(fun, jac, (k * .1, (k + 1) * .1), x))
+    assert x == approx(lsoda(fun, jac, (0, 2), x_0), rel=rel, abs=rel)
+
+
+class LinearFMU:
+    """FMU interface of the linear model as seen by the PyFMI_Wrapper"""
+
+    def __init__(self, directional_derivatives):
+        self.numpy_model, _, _ = linear_model()
+        self.directional_derivatives = directional_derivatives
+        self.time = 0
+
+    @property
+    def continuous_states(self):
+        return self.numpy_model.states
+
+    @continuous_states.setter
+    def continuous_states(self, val):
+        self.numpy_model.states = val
+
+    def get_derivatives(self):
+        return self.numpy_model.deriv
+
+    def get_capability_flags(self):
+        return {'providesDirectionalDerivatives': self.directional_derivatives}
+
+    def get_states_list(self):
+        return {name: SimpleNamespace(value_reference=i) for i, name in enumerate(self.numpy_model.state_names)}
+
+    def get_derivatives_list(self):
+        return {name: SimpleNamespace(value_reference=i) for i, name in enumerate(self.numpy_model.state_names)}
+
+    def get_directional_derivative(self, var_refs, func_refs, v):
+        return self.numpy_model.jacc()[np.ix_(func_refs, var_refs)] @ v
+
+
+@pytest.mark.parametrize('directional_derivatives', [True, False])
+@pytest.mark.parametrize('method,rel', [('Trapezoidal', 1e-3), ('ExpEuler', 1e-6)])
+def test_fmu_jacobian(directional_derivatives, method, rel):
+    pytest.importorskip('pyfmi')
+    from openmodelica_microgrid_gym.env.pyfmi import PyFMI_Wrapper
+    fmu = LinearFMU(directional_derivatives)
+    model = PyFMI_Wrapper(fmu)
+    model.states = np.random.default_rng(0).normal(size=len(model.states))
+    assert model.jacc() == approx(fmu.numpy_model.jacc(), rel=1e-5, abs=1e-3)
+
+    def fun(_, x):
+        model.states = x
+        return model.deriv
+
+    def jac(_, x):
+        model.states = x
+        return model.jacc()
+
+    # the solvers use the Jacobian of the FMU
+    expected = simulate(lsoda, *linear_model())
+    model.states = np.zeros(len(model.states))
+    actual = simulate(solvers[method](8).integrate, fmu.numpy_model, fun, jac)
+    scale = np.abs(expected).max(axis=0)
+    assert np.abs(actual - expected).max(axis=0) == approx(0, abs=rel * scale.max())
+
+
+@pytest.mark.parametrize('method', ['Trapezoidal', 'ExpEuler'])
+def test_fmu_env(method):
+    pytest.importorskip('pyfmi')
+    fmu = 'omg_grid/omg_grid.Grids.NetworkSingleInverter.fmu'
+    if not os.path.exists(fmu):
+        pytest.skip('FMU not available')
+    obs = {}
+    for method_ in ['LSODA', method]:
+        env = gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', net='net/net_singleinverter.yaml',
+                       model_path=fmu, viz_mode=None, max_episode_steps=100, is_normalized=False,
+                       solver_method=method_, solver_substeps=8)
+        env.reset()
+        obs[method_] = np.array([env.step([.5, -.25, -.25])[0] for _ in range(100)])
+    # LSODA with the default tolerances of the environment deviates by about 1 %
+    assert np.abs(obs[method] - obs['LSODA']).max() < 2e-2 * np.abs(obs['LSODA']).max()
+
+
+def test_invalid_substeps():
+    with pytest.raises(ValueError):
+        RK4(0)
+
+
+def test_env():
+    obs = {}
+    for method in ['LSODA', 'RK4', 'Trapezoidal', 'ExpEuler']:
+        env = gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', net='net/net_singleinverter.yaml',
+                       model_path='net/net_singleinverter.yaml', viz_mode=None, max_episode_steps=100,
+                       is_normalized=False, solver_method=method, solver_substeps=4)
+        env.reset()
+        obs[method] = np.array([env.step([.5, -.25, -.25])[0] for _ in range(100)])
+    # the exponential Euler method is exact for the linear model
+    expected = obs['ExpEuler']
+    scale = np.abs(expected).max()
+    for method, rel in [('RK4', 1e-5), ('Trapezoidal', 1e-3), ('LSODA', 2e-2)]:
+        assert np.abs(obs[method] - expected).max() < rel * scale
+
+
+def dense_env(**kwargs):
+    env = gym.make('openmodelica_microgrid_gym:ModelicaEnv-v1', net='net/net_singleinverter.yaml',
+                   model_path='net/net_singleinverter.yaml', viz_mode=None, max_episode_steps=50,
+                   is_normalized=False, dense_samples=4, **kwargs)
+    env.reset()
+    for k in range(50):
+        env.step(.5 * np.sin(2 * np.pi * 50 * k * TS + np.array([0, -2, 2]) * np.pi / 3))
+    return env
+
+
+@pytest.mark.parametrize('kwargs', [dict(solver_method='LSODA'), dict(solver_method='RK4', solver_substeps=8)])
+def test_dense_samples(kwargs):
+    env = dense_env(**kwargs)
+    dense = env.dense_history.df
+    assert list(dense.columns) == env.model_output_names
+    assert len(dense) == 1 + 4 * 50
+    # every 4th sample is the observation of a step
+    assert dense.iloc[::4].values == approx(env.history.df[env.model_output_names].values)
+
+    expected = dense_env(solver_method='ExpEuler', solver_substeps=4).dense_history.df.values
+    assert np.abs(dense.values - expected).max() < 1e-2 * np.abs(expected).max()
+
+
+def test_dense_samples_substeps():
+    with pytest.raises(ValueError):
+        dense_env(solver_method='RK4', solver_substeps=6)
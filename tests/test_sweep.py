@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from openmodelica_microgrid_gym.execution.sweep import Sweep, grid, random_points, point_id
+
+
+def setup():
+    return dict(pid=os.getpid())
+
+
+def experiment(resources, a, b):
+    if a == 3:
+        raise ValueError('the experiment failed')
+    return dict(y=a * 2 + len(b), pid=resources['pid'], safe=a < 2)
+
+
+def test_grid():
+    assert grid(a=[1, 2], b=['x']) == [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]
+
+
+def test_random_points():
+    points = random_points(3, seed=1, a=lambda rng: rng.uniform())
+    assert len(points) == 3
+    assert points == random_points(3, seed=1, a=lambda rng: rng.uniform())
+
+
+def test_point_id():
+    assert point_id({'a': 1, 'b': 'x'}) == point_id({'b': 'x', 'a': 1})
+    assert point_id({'a': 1, 'b': 'x'}) != point_id({'a': 2, 'b': 'x'})
+
+
+def test_sweep(tmp_path):
+    path = str(tmp_path / 'results.h5')
+    sweep = Sweep(experiment, grid(a=[1, 2, 3], b=['x', 'yy']), path, setup, n_workers=2)
+    df = sweep.run()
+
+    # the failing points are not stored
+    assert df.shape[0] == 4
+    assert sorted(df['y']) == pytest.approx([3, 4, 5, 6])
+    assert df['pid'].nunique() <= 2
+    assert df['safe'].sum() == 2
+
+    # completed points are skipped, failing ones retried
+    sweep.points.append({'a': 4, 'b': 'x'})
+    assert sweep.run().shape[0] == 5
+
+
+def odd_experiment(resources, a):
+    if a == 1:
+        return dict(y=1., name='x' * 100)
+    if a == 2:
+        return dict(y=2., extra=1.)
+    return dict(y=float(a), name='x')
+
+
+def test_sweep_invalid_results(tmp_path):
+    path = str(tmp_path / 'results.h5')
+    # results that do not fit the table are skipped instead of aborting the sweep
+    df = Sweep(odd_experiment, grid(a=[0, 1, 2, 3]), path, n_workers=1, string_size=16).run()
+    assert sorted(df['a']) == [0, 3]
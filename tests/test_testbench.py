@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+paramiko = pytest.importorskip('paramiko')
+
+from experiments.model_validation.env.physical_testbench import TestbenchEnv  # noqa: E402
+from experiments.model_validation.env.replay_server import ReplayServer  # noqa: E402
+from experiments.model_validation.env.testbench_transport import LineDecoder, TestbenchTransport  # noqa: E402
+
+N = 500
+
+
+@pytest.fixture(scope='module')
+def recording():
+    rng = np.random.default_rng(1)
+    data, obs = rng.normal(size=(N, 31)).round(6), rng.normal(size=(N // 10, 9)).round(6)
+    lines = [b'Starting experiment']
+    for k, row in enumerate(data):
+        lines.append(','.join(map(str, row)).encode())
+        if k % 10 == 0:
+            lines.append(','.join(map(str, obs[k // 10])).encode())
+    return b'\r\n'.join(lines) + b'\r\n', data, obs
+
+
+@pytest.fixture(scope='module')
+def server(recording):
+    with ReplayServer(recording[0], chunk_size=1000) as server:
+        yield server
+
+
+def test_decoder(recording):
+    output, data, obs = recording
+    decoder = LineDecoder(10)
+    # chunks split the lines at arbitrary positions
+    for i in range(0, len(output), 777):
+        decoder.feed(output[i:i + 777])
+    decoded, decoded_obs = decoder.close()
+    assert decoded == pytest.approx(data)
+    assert decoded_obs == pytest.approx(obs)
+
+
+def test_transport(server, recording):
+    _, data, obs = recording
+    connections = server.connections
+    with TestbenchTransport(server.host, port=server.port) as transport:
+        futures = [transport.submit(f'./experiment {k}', N) for k in range(3)]
+        for future in futures:
+            decoded, decoded_obs = future.result()
+            assert decoded == pytest.approx(data)
+            assert decoded_obs == pytest.approx(obs)
+    # a single connection is used and the experiments are executed in order
+    assert server.connections == connections + 1
+    assert server.commands[-3:] == [f'./experiment {k}' for k in range(3)]
+
+
+def test_failed_command(recording):
+    with ReplayServer({'./known': recording[0]}) as server, \
+            TestbenchTransport(server.host, port=server.port) as transport:
+        with pytest.raises(RuntimeError, match='127'):
+            transport.run('./unknown', N)
+        assert len(transport.run('./known', N)[0]) == N
+
+
+def test_connection_error():
+    transport = TestbenchTransport('127.0.0.1', port=1, max_retries=2, retry_delay=0)
+    with pytest.raises(ConnectionError):
+        transport.run('./experiment', N)
+
+
+def test_env(server, recording):
+    env = TestbenchEnv(num_steps=N, transport=TestbenchTransport(server.host, port=server.port))
+    env.prefetch(.1, 10)
+    env.reset(.1, 10)
+    assert env.data == pytest.approx(recording[1])
+    obs, reward, done, _ = env.step()
+    assert obs == pytest.approx(recording[1][0])
+    env.close()
+    assert server.commands[-1] == env._command(.1, 10)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from openmodelica_microgrid_gym.util.decimation import decimate
+
+t = np.arange(20000) * 1e-4
+y = np.sin(2 * np.pi * 50 * t)
+y[12345] = 5  # spike
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_decimate(method):
+    idx = decimate(t, y, 500, method)
+    assert len(idx) <= 500
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == len(t) - 1
+    assert 12345 in idx
+
+
+def test_minmax_bounds():
+    idx = decimate(t, y, 500)
+    # the extremes of every bucket are kept
+    size = int(np.ceil(len(t) / 249))
+    for start in range(0, len(t), size):
+        kept = idx[(idx >= start) & (idx < start + size)]
+        assert y[kept].max() == y[start:start + size].max()
+        assert y[kept].min() == y[start:start + size].min()
+
+
+def test_several_series():
+    idx = decimate(t, np.c_[y, -y, np.cos(t)], 300, 'lttb')
+    assert len(idx) <= 3 * 300
+    assert 12345 in idx
+
+
+def test_short():
+    assert decimate(t[:10], y[:10], 100) == pytest.approx(np.arange(10))
+    with pytest.raises(ValueError):
+        decimate(t, y, 100, 'mean')
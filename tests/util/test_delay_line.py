@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from openmodelica_microgrid_gym.util import DelayLine, RunningSum
+
+
+@pytest.mark.parametrize('delay', [0, 1, 3])
+def test_shift(delay):
+    line = DelayLine(delay, 2)
+    values = np.random.default_rng(1).uniform(size=(10, 2))
+    out = np.array([line.shift(v) for v in values])
+    assert out == approx(np.vstack([np.zeros((delay, 2)), values])[:10])
+    assert line.samples == approx(values[10 - delay:])
+
+
+def test_view():
+    line = DelayLine(2)
+    line.shift(1)
+    line.shift(2)
+    view = line.shift(3, copy=False)
+    assert view[0] == 1
+    line.shift(4)
+    # the view is overwritten by the next push
+    assert view[0] == 4
+
+
+@pytest.mark.parametrize('delay,k', [(0, 3), (3, 1), (3, 2), (3, 3), (3, 7), (5, 13)])
+def test_shift_batch(delay, k):
+    values = np.random.default_rng(1).uniform(size=(30, 2))
+    single, batch = DelayLine(delay, 2), DelayLine(delay, 2)
+    expected = np.array([single.shift(v) for v in values])
+    out = np.vstack([batch.shift_batch(values[i:i + k]) for i in range(0, len(values), k)])
+    assert out == approx(expected)
+    assert batch.samples == approx(single.samples)
+
+
+def test_clear():
+    line = DelayLine(2)
+    line.shift_batch([1, 2])
+    line.clear()
+    assert line.shift(3)[0] == 0
+
+
+def test_invalid_delay():
+    with pytest.raises(ValueError):
+        DelayLine(-1)
+
+
+def test_running_sum():
+    values = np.random.default_rng(1).normal(size=(100, 3))
+    window = 7
+    expected = np.array([values[max(0, i - window + 1):i + 1].sum(axis=0) for i in range(len(values))])
+    s = RunningSum(window, 3)
+    assert np.array([s.add(v).copy() for v in values]) == approx(expected)
+    s.clear()
+    assert np.vstack([s.add_batch(values[i:i + 9]) for i in range(0, 100, 9)]) == approx(expected)
+    assert s.sum == approx(expected[-1])
+
+
+def test_running_sum_rounding():
+    s = RunningSum(10)
+    for v in [1e8] * 10 + [1e-3] * 15:
+        s.add(v)
+    # the large values left the window without leaving rounding errors behind
+    assert s.sum[0] == approx(1e-2, rel=1e-12)
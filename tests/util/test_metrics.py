@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from openmodelica_microgrid_gym.util.metrics import overshoot, rise_time, settling_time, rmse, steady_state_error, \
+    absolute_peak, control_metrics
+
+ts = 1e-4
+t = np.arange(500) * ts
+
+
+def step_response(zeta, omega=2000, ref=10):
+    # step response of a second order system
+    omega_d = omega * np.sqrt(1 - zeta ** 2)
+    return ref * (1 - np.exp(-zeta * omega * t) * (np.cos(omega_d * t) + zeta / np.sqrt(1 - zeta ** 2) * np.sin(
+        omega_d * t)))
+
+
+@pytest.fixture
+def y():
+    return np.array([step_response(.3), step_response(.7), step_response(.3, ref=-5)])
+
+
+ref = np.array([10, 10, -5])
+
+
+def test_overshoot(y):
+    expected = np.exp(-np.pi * np.array([.3, .7]) / np.sqrt(1 - np.array([.3, .7]) ** 2))
+    assert overshoot(y, ref) == approx([*expected, expected[0]], rel=1e-2)
+    assert overshoot(np.zeros((2, 5)), 1) == approx([0, 0])
+
+
+def test_overshoot_zero_reference():
+    with np.errstate(all='raise'):
+        result = overshoot(np.ones((2, 5, 2)), [[1, 0], [0, 2]])
+    assert np.isnan(result[[0, 1], [1, 0]]).all()
+    assert result[[0, 1], [0, 1]] == approx([0, 0])
+
+
+def test_rise_time(y):
+    for i in range(3):
+        s = np.sign(ref[i]) * y[i]
+        expected = (np.argmax(s >= .9 * abs(ref[i])) - np.argmax(s >= .1 * abs(ref[i]))) * ts
+        assert rise_time(y, ref, ts)[i] == approx(expected)
+    assert np.isnan(rise_time(np.zeros((1, 5)), 1, ts)[0])
+
+
+def test_settling_time(y):
+    for i in range(3):
+        inside = np.abs(y[i] - ref[i]) <= .02 * abs(ref[i])
+        # loop based reference implementation
+        expected = 0
+        for k in range(len(t)):
+            if not inside[k]:
+                expected = k + 1
+        assert settling_time(y, ref, ts)[i] == approx(expected * ts)
+    assert np.isnan(settling_time(y, ref, ts, end=10)).all()
+
+
+def test_rmse_and_errors(y):
+    assert rmse(y, ref) == approx(np.sqrt(np.mean((y - ref[:, None]) ** 2, axis=1)))
+    y_nan = y.copy()
+    y_nan[:, 0] = np.nan
+    assert rmse(y_nan, ref) == approx(np.sqrt(np.mean((y[:, 1:] - ref[:, None]) ** 2, axis=1)))
+    assert steady_state_error(y, ref) == approx(np.abs(ref - y[:, -1]))
+    assert absolute_peak(y) == approx(np.abs(y).max(axis=1))
+
+
+def test_channels(y):
+    y3 = np.stack([y, 2 * y], axis=-1)
+    metrics = control_metrics(y3, np.stack([ref, 2 * ref], axis=-1), ts)
+    single = control_metrics(y, ref, ts)
+    for name, values in metrics.items():
+        assert values.shape == (3, 2)
+        assert values[:, 0] == approx(single[name], nan_ok=True)
+
+
+def test_invalid_shape():
+    with pytest.raises(ValueError):
+        rmse(np.zeros(3), 1)
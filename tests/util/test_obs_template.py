@@ -14,3 +14,32 @@ from tests.helpers import nested_arrays_equal
 def test_obs_templ(i, o):
     tmpl = ObsTempl(list('abc'), i)
     assert nested_arrays_equal(o, tmpl.fill(np.array([1, 2, 3])))
+
+
+def test_static_params():
+    static = np.array([4., 5.])
+    tmpl = ObsTempl(list('abc'), [['c', 'a'], static, ['b']])
+    params = tmpl.fill(np.array([1., 2., 3.]))
+    assert nested_arrays_equal([np.array([3., 1.]), static, np.array([2.])], params)
+    # static parameters are passed without copy
+    assert params[1] is static
+
+
+def test_reuse_buffer():
+    tmpl = ObsTempl(list('abc'), [['c', 'a'], np.array([4.]), ['b']], reuse_buffer=True)
+    first = tmpl.fill(np.array([1., 2., 3.]))
+    assert nested_arrays_equal([np.array([3., 1.]), np.array([4.]), np.array([2.])], first)
+    second = tmpl.fill(np.array([6., 7., 8.]))
+    assert second is first
+    assert nested_arrays_equal([np.array([8., 6.]), np.array([4.]), np.array([7.])], second)
+    # integer observations
+    assert nested_arrays_equal([np.array([3, 1]), np.array([4.]), np.array([2])], tmpl.fill(np.array([1, 2, 3])))
+
+
+def test_fill_batch():
+    obs = np.arange(12.).reshape(4, 3)
+    tmpl = ObsTempl(list('abc'), [['c', 'a'], np.array([4.]), ['b']])
+    params = tmpl.fill_batch(obs)
+    assert nested_arrays_equal([obs[:, [2, 0]], np.array([4.]), obs[:, [1]]], params)
+    for i, row in enumerate(obs):
+        assert nested_arrays_equal(tmpl.fill(row), [p[i] if k != 1 else p for k, p in enumerate(params)])
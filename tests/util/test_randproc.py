@@ -0,0 +1,110 @@
+from functools import partial
+
+import numpy as np
+import pytest
+from pytest import approx
+from stochastic.processes import BrownianMotion, CoxIngersollRossProcess, VasicekProcess
+
+from openmodelica_microgrid_gym.util import RandProcess
+from openmodelica_microgrid_gym.util.randproc import find_rand_processes
+
+TS = 1e-4
+GLOBAL_GEN = RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=28), initial=28)
+
+
+def vasicek(**kwargs):
+    return RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=28), initial=28,
+                       **{'ts': TS, 'horizon': 100, 'seed': 1, **kwargs})
+
+
+def euler_maruyama(x, noise, speed=100, mean=28, vol=70):
+    path = []
+    for dw in noise:
+        x = x + speed * (mean - x) * TS + vol * dw
+        path.append(x)
+    return np.array(path)
+
+
+def test_path():
+    gen = vasicek()
+    noise = np.random.default_rng(1).normal(scale=np.sqrt(TS), size=100)
+    assert gen.sample(-1) == 28
+    assert gen.sample(0) == 28
+    assert [gen.sample(k * TS) for k in range(1, 101)] == approx(euler_maruyama(28, noise))
+    # repeated samples of a timestep return the same value
+    assert gen.sample(100 * TS) == gen.sample(100 * TS)
+
+
+def test_horizon():
+    gen = vasicek(horizon=10)
+    values = [gen.sample(k * TS) for k in range(1, 101)]
+    assert len(gen._path) == 101
+    assert values == approx([vasicek().sample(k * TS) for k in range(1, 101)])
+
+
+def test_reproducible():
+    gen = vasicek()
+    first = [gen.sample(k * TS) for k in range(1, 50)]
+    gen.reset()
+    second = [gen.sample(k * TS) for k in range(1, 50)]
+    assert first != approx(second)
+    gen.reset(seed=1)
+    assert [gen.sample(k * TS) for k in range(1, 50)] == approx(first)
+
+
+def test_ts_from_first_sample():
+    gen = vasicek(ts=None)
+    values = [gen.sample(k * TS) for k in range(1, 50)]
+    assert gen.sampling_time == approx(TS)
+    # the configuration is not changed
+    assert gen.ts is None
+    assert values == approx([vasicek().sample(k * TS) for k in range(1, 50)])
+
+
+def test_reserve():
+    noise = np.random.default_rng(1).normal(scale=np.sqrt(TS), size=100)
+    gen = vasicek()
+    values = [gen.sample(k * TS) for k in range(1, 20)]
+    gen.proc.mean = 15
+    gen.reserve = 15
+    values += [gen.sample(k * TS) for k in range(20, 101)]
+    # the jump is overlaid on the drawn noise
+    expected = np.hstack([euler_maruyama(28, noise[:19]), euler_maruyama(15, noise[19:], mean=15)])
+    assert values == approx(expected)
+    assert gen.reserve is None
+
+
+def test_bounds():
+    gen = RandProcess(VasicekProcess, proc_kwargs=dict(speed=10, vol=300, mean=28), initial=28, ts=TS,
+                      bounds=(20, 30), seed=2)
+    values = np.array([gen.sample(k * TS) for k in range(1, 1001)])
+    assert values.min() == 20 and values.max() == 30
+
+
+def test_stationary_distribution():
+    gen = RandProcess(VasicekProcess, proc_kwargs=dict(speed=100, vol=70, mean=28), initial=28, ts=TS, seed=3)
+    values = np.array([gen.sample(k * TS) for k in range(1, 200001)])
+    assert values.mean() == approx(28, abs=.5)
+    assert values.std() == approx(70 / np.sqrt(2 * 100), rel=.1)
+
+
+@pytest.mark.parametrize('process_cls,proc_kwargs', [(BrownianMotion, dict(scale=10)),
+                                                     (CoxIngersollRossProcess, dict(speed=100, vol=1, mean=28))])
+def test_other_processes(process_cls, proc_kwargs):
+    gen = RandProcess(process_cls, proc_kwargs=proc_kwargs, initial=28, ts=TS, horizon=100, seed=1)
+    values = np.array([gen.sample(k * TS) for k in range(1, 201)])
+    assert np.all(np.isfinite(values))
+    assert np.abs(np.diff(values)).max() < 1
+    gen.reserve = 10
+    assert gen.sample(201 * TS) == approx(10, abs=1)
+
+
+def global_load(t):
+    return GLOBAL_GEN.sample(t)
+
+
+def test_find_rand_processes():
+    gen, other = vasicek(), vasicek()
+    params = [gen.sample, lambda t: other.sample(t) * 2, partial(lambda t, g: g.sample(t), g=gen), global_load, 1]
+    assert find_rand_processes(*params) == [gen, other, GLOBAL_GEN]
+    assert find_rand_processes(lambda t: t) == []